@@ -1,21 +1,29 @@
 
-from flask import Flask, render_template, request, redirect, url_for, flash
-
-from flask import Flask, render_template, request, redirect, url_for, flash, session
-
-import os, datetime
-import pymysql
-from resume_parser import parse_resume, calculate_score, recommend_courses, recommend_skills
+from flask import Flask, render_template, request, redirect, url_for, flash, session, jsonify, Response
+
+import argparse, os, sys, datetime, logging
+from resume_parser import _extract_phone, get_nlp, parse_resume, jd_profile, calculate_score, calculate_scores, recommend_courses, recommend_skills, get_user_level, count_section_hits, PREDICTED_FIELDS, PDF_MAX_PAGES, PDF_MAX_SECONDS, PHONE_REGION
+from parse_cache import ParseCache, spool_upload
+from jobs import Job, JobQueue, JobStore, QueueFull
+from candidate_queries import admin_page, parse_cursor, MAX_PAGE_SIZE, USER_LEVELS
+from skill_index import add_candidate_skills, candidates_with_skills
+from ranking import TopCandidates, verify
+from match_index import MatchIndex
+from near_dup import NearDupIndex, minhash
+from export import EXPORT_FORMATS, encode, iter_chunks, server_side_cursor
+from tracing import render_prometheus, request_trace, stage
+from worker_metrics import WorkerMetrics
+from db import ConnectionPool, connect_from_env, get_db, init_app, init_schema
 from dotenv import load_dotenv
 
-from typing import Dict, List, Tuple, Any  # NEW: For type hints
+from typing import Dict, List, Optional, Tuple, Any  # NEW: For type hints
 
 
 app = Flask(__name__)
+log = logging.getLogger(__name__)
 app.secret_key = "dev_secret_key"  # simple hardcoded key for school project
 
-UPLOAD_FOLDER = "uploads"
-os.makedirs(UPLOAD_FOLDER, exist_ok=True)
+UPLOAD_FOLDER = "uploads"  # created by open_resources()
 
 # ================================
 # DB CONNECTION (edit credentials)
@@ -23,32 +31,27 @@ os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 # Load .env file
 load_dotenv()
 
-# DB connection using environment variables
-connection = pymysql.connect(
-    host=os.getenv("DB_HOST"),
-    user=os.getenv("DB_USER"),
-    password=os.getenv("DB_PASSWORD"),
-    database=os.getenv("DB_NAME")
-)
-cursor = connection.cursor()
-
-
-cursor.execute("CREATE DATABASE IF NOT EXISTS cv;")
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS user_data (
-    ID INT AUTO_INCREMENT PRIMARY KEY,
-    Name VARCHAR(255),
-    Email VARCHAR(255),
-    Resume_Score INT,
-    Timestamp VARCHAR(50),
-    Page_No INT,
-    Predicted_Field VARCHAR(255),
-    Job_Description VARCHAR(255),
-    User_Level VARCHAR(50) DEFAULT 'Beginner',
-    Skills TEXT,
-    Recommended_Skills TEXT
-)
-""")
+# Per-process resources, opened by open_resources() (see create_app): DB connections, SQLite
+# handles and worker threads cannot be shared across a fork, so nothing here is opened at import.
+# The schema is created by `python App.py migrate`.
+db_pool: Optional[ConnectionPool] = None  # pooled DB connections; each request checks one out via get_db()
+top_candidates: Optional[TopCandidates] = None  # best candidates per JD for /api/top, updated on upload, re-warmed every TOP_K_REFRESH s
+parse_cache: Optional[ParseCache] = None
+match_index: Optional[MatchIndex] = None
+near_dups: Optional[NearDupIndex] = None
+upload_jobs: Optional[JobQueue] = None
+worker_metrics: Optional[WorkerMetrics] = None  # every server worker's /metrics, in one SQLite file
+
+# Upload guards: bigger requests get HTTP 413; longer PDFs are only partly analysed
+app.config["MAX_CONTENT_LENGTH"] = int(float(os.getenv("MAX_UPLOAD_MB", "10")) * 1024 * 1024)
+# Uploads up to this size are parsed straight from memory; bigger ones spool to a temp file
+UPLOAD_SPOOL_BYTES = int(float(os.getenv("UPLOAD_SPOOL_KB", "1024")) * 1024)
+PDF_LIMITS = {
+    "max_pages": int(os.getenv("PDF_MAX_PAGES", PDF_MAX_PAGES)),
+    "max_seconds": float(os.getenv("PDF_MAX_SECONDS", PDF_MAX_SECONDS)),
+}
+# Phone numbers written without a +country code are read as this region's (ISO code, e.g. US, GB, KE)
+PHONE_REGION = os.getenv("PHONE_REGION", PHONE_REGION).upper()
 
 # Predefined Job Descriptions
 JOB_DESCRIPTIONS = [
@@ -60,6 +63,22 @@ JOB_DESCRIPTIONS = [
     "UI/UX Designer"
 ]
 
+# Most custom JDs one all-JD request (/upload with all_jds=1, /api/score_all) may score against
+MAX_SCORE_JDS = int(os.getenv("MAX_SCORE_JDS", "20"))
+
+
+class UnreadableResume(ValueError):
+    """The PDF gave no text (scanned image, broken file): nothing to score or store."""
+
+    def __init__(self):
+        super().__init__("Could not read any text from the PDF")
+
+
+def _require_text(resume_data: Dict[str, Any]) -> None:
+    # Without text there is no email to dedupe on and no MinHash signature: every copy would be a new row
+    if not resume_data["text"].strip():
+        raise UnreadableResume()
+
 # -----------------------
 # ROUTES
 # -----------------------
@@ -73,61 +92,256 @@ def index():
     )
 
 
-@app.route("/upload", methods=["POST"])
-def upload():
-    if "resume" not in request.files:
-        return "No file uploaded", 400
-    file = request.files["resume"]
-    jd_text = request.form.get("jd_text", "")
-    save_path = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(save_path)
+def _parse_and_cache(digest: str, pdf_file) -> Dict[str, Any]:
+    """Parse an uploaded PDF (path, bytes or file object) that missed the parse cache, and cache the result.
 
-    # --- Parse resume ---
-    resume_data = parse_resume(save_path)
+    Parses cut short by the time limit are not cached: they depend on server load, not on the file.
+    """
+    resume_data = parse_resume(pdf_file, phone_region=PHONE_REGION, **PDF_LIMITS)
+    if resume_data["text"] and resume_data.get("truncated") != "time":
+        parse_cache.put(digest, resume_data)
+    return resume_data
 
-    # --- Score resume (JD-aware) ---
-    score = calculate_score(resume_data["text"], jd_text, resume_data["skills"])
 
-    # --- Recommend field & courses ---
-    field, courses = recommend_courses(resume_data["skills"])
+def _cached_parse(digest: str):
+    """Parse cache lookup that ignores entries cut short by the time limit or a lower page limit than today's,
+    and entries whose phone number was read under another PHONE_REGION."""
+    with stage("cache_lookup"):
+        resume_data = parse_cache.get(digest)
+    if resume_data and resume_data.get("phone_region", "US") != PHONE_REGION:  # older entries were all read as US
+        return None
+    if resume_data and resume_data.get("truncated") == "time":
+        return None  # cached before time-limited parses stopped being stored
+    if (resume_data and resume_data.get("truncated") == "pages"
+            and resume_data.get("pages_analysed", 0) < PDF_LIMITS["max_pages"]):
+        return None
+    return resume_data
 
-    # --- Recommend missing core skills ---
-    recommended_skills = recommend_skills(resume_data["skills"], jd_text)
 
-    # --- Determine User Level ---
-    if score >= 80:
-        user_level = "Advanced"
-    elif score >= 50:
-        user_level = "Intermediate"
-    else:
-        user_level = "Beginner"
+def _truncation_note(resume_data: Dict[str, Any]) -> str:
+    if not resume_data.get("truncated"):
+        return ""
+    return (f"Only the first {resume_data['pages_analysed']} of {resume_data['pages']} pages were analysed "
+            f"({'page' if resume_data['truncated'] == 'pages' else 'time'} limit).")
 
-    # --- Prevent duplicate by email ---
-    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    cursor.execute("SELECT * FROM user_data WHERE Email=%s", (resume_data["email"],))
-    existing = cursor.fetchone()
 
-    if not existing:
+def _analyse(resume_data: Dict[str, Any], jd_text: str) -> Dict[str, Any]:
+    """JD-dependent scoring and recommendations for a parsed resume."""
+    profile = jd_profile(jd_text)
+
+    # Score resume (JD-aware)
+    with stage("score"):
+        score = calculate_score(resume_data["text"], profile, resume_data["skills"])
+
+    with stage("recommend"):
+        # Recommend field & courses
+        field, courses = recommend_courses(resume_data["skills"])
+
+        # Recommend missing core skills
+        recommended_skills = recommend_skills(resume_data["skills"], profile)
+
+    return {
+        "score": score,
+        "field": field,
+        "courses": courses,
+        "recommended_skills": recommended_skills,
+        "user_level": get_user_level(score),
+    }
+
+
+def _save_result(resume_data: Dict[str, Any], analysis: Dict[str, Any], jd_text: str) -> bool:
+    """Insert the candidate row; returns False if this resume was already submitted for the JD.
+
+    Duplicate means the same email + JD (unless no email was found), or a near-identical resume text for the JD.
+    """
+    email = resume_data["email"].lower()
+    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with stage("db_checkout"):
+        connection = get_db()
+    cursor = connection.cursor()
+    duplicate = None
+    with stage("db_duplicate_check"):
+        if email != "unknown":
+            cursor.execute("SELECT ID FROM user_data WHERE Email=%s AND Job_Description=%s LIMIT 1", (email, jd_text))
+            duplicate = cursor.fetchone()
+    with stage("near_dup_check"):
+        signature = minhash(resume_data["text"])
+        if not duplicate:
+            duplicate = near_dups.find(signature, jd_text)
+    if duplicate:
+        return False
+
+    section_hits = count_section_hits(resume_data["text"])
+    with stage("db_insert"):
         cursor.execute("""
         INSERT INTO user_data 
-        (Name, Email, Resume_Score, Timestamp, Page_No, Predicted_Field, Job_Description, User_Level, Skills, Recommended_Skills)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        (Name, Email, Resume_Score, Timestamp, Page_No, Predicted_Field, Job_Description, User_Level, Skills, Recommended_Skills, Section_Hits)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
         """, (
             resume_data["name"], 
-            resume_data["email"], 
-            score, 
+            resume_data["email"].lower(),
+            analysis["score"], 
             ts, 
             resume_data["pages"], 
-            field,            
+            analysis["field"],            
             jd_text,          
-            user_level,
+            analysis["user_level"],
             ", ".join(resume_data["skills"]), 
-            ", ".join(recommended_skills)
+            ", ".join(analysis["recommended_skills"]),
+            section_hits
         ))
+        candidate_id = cursor.lastrowid
+        add_candidate_skills(cursor, candidate_id, resume_data["skills"], analysis["recommended_skills"])
+    with stage("db_commit"):
+        connection.commit()
+
+    top_candidates.add({
+        "ID": candidate_id,
+        "Name": resume_data["name"],
+        "Email": resume_data["email"].lower(),
+        "Resume_Score": analysis["score"],
+        "Timestamp": ts,
+        "Page_No": resume_data["pages"],
+        "Predicted_Field": analysis["field"],
+        "Job_Description": jd_text,
+        "User_Level": analysis["user_level"],
+    })
+    with stage("near_dup_index"):
+        near_dups.add(candidate_id, jd_text, signature)
+    with stage("match_index"):
+        match_index.add(candidate_id, resume_data["text"], resume_data["email"])
+    return True
+
+
+def _requested_jds() -> List[str]:
+    """The repeated "jds" field of an all-JD request, or every JOB_DESCRIPTIONS entry if none were sent."""
+    jds: Dict[str, str] = {}
+    for jd in request.values.getlist("jds"):
+        jd = jd.strip()
+        if jd:
+            jds.setdefault(jd.lower(), jd)  # MySQL compares Job_Description case-insensitively
+    return list(jds.values()) or list(JOB_DESCRIPTIONS)
+
+
+def _analyse_all(resume_data: Dict[str, Any], jds: List[str]) -> List[Dict[str, Any]]:
+    """_analyse for several JDs; the resume-only score parts and the field/courses are computed once."""
+    profiles = [jd_profile(jd) for jd in jds]
+
+    with stage("score"):
+        scores = calculate_scores(resume_data["text"], profiles, resume_data["skills"])
+
+    with stage("recommend"):
+        field, courses = recommend_courses(resume_data["skills"])
+        return [{
+            "jd_text": jd,
+            "score": score,
+            "field": field,
+            "courses": courses,
+            "recommended_skills": recommend_skills(resume_data["skills"], profile),
+            "user_level": get_user_level(score),
+        } for jd, profile, score in zip(jds, profiles, scores)]
+
+
+def _save_results(resume_data: Dict[str, Any], analyses: List[Dict[str, Any]]) -> int:
+    """_save_result for several JDs: one duplicate check, then the new rows in one transaction.
+
+    Sets "duplicate" on every analysis and returns the number of rows inserted.
+    """
+    email = resume_data["email"].lower()
+    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    with stage("db_checkout"):
+        connection = get_db()
+    cursor = connection.cursor()
+
+    existing = set()
+    in_jds = ", ".join(["%s"] * len(analyses))
+    with stage("db_duplicate_check"):
+        if email != "unknown":
+            cursor.execute(f"SELECT Job_Description FROM user_data WHERE Email=%s AND Job_Description IN ({in_jds})",
+                           [email] + [a["jd_text"] for a in analyses])
+            existing = {row[0].lower() for row in cursor.fetchall()}
+    with stage("near_dup_check"):
+        signature = minhash(resume_data["text"])
+        existing |= {jd.lower() for _, jd, _ in near_dups.find(signature)}
+    for a in analyses:
+        a["duplicate"] = a["jd_text"].lower() in existing
+    fresh = {a["jd_text"].lower(): a for a in analyses if not a["duplicate"]}
+    if not fresh:
+        return 0
+
+    section_hits = count_section_hits(resume_data["text"])
+    ids = {}
+    with stage("db_insert"):
+        # One INSERT per row, so each ID is its own lastrowid: a multi-row INSERT's IDs are not
+        # guaranteed consecutive (auto_increment_increment > 1, innodb_autoinc_lock_mode=2)
+        for key, a in fresh.items():
+            cursor.execute(
+                "INSERT INTO user_data (Name, Email, Resume_Score, Timestamp, Page_No, Predicted_Field, Job_Description, "
+                "User_Level, Skills, Recommended_Skills, Section_Hits) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                (resume_data["name"], email, a["score"], ts, resume_data["pages"], a["field"], a["jd_text"],
+                 a["user_level"], ", ".join(resume_data["skills"]), ", ".join(a["recommended_skills"]), section_hits)
+            )
+            ids[key] = cursor.lastrowid
+            add_candidate_skills(cursor, ids[key], resume_data["skills"], a["recommended_skills"])
+    with stage("db_commit"):
         connection.commit()
-        flash("Resume uploaded successfully!", "success")
+
+    for key, a in fresh.items():
+        top_candidates.add({
+            "ID": ids[key],
+            "Name": resume_data["name"],
+            "Email": email,
+            "Resume_Score": a["score"],
+            "Timestamp": ts,
+            "Page_No": resume_data["pages"],
+            "Predicted_Field": a["field"],
+            "Job_Description": a["jd_text"],
+            "User_Level": a["user_level"],
+        })
+    with stage("near_dup_index"):
+        near_dups.add_many((ids[key], a["jd_text"], signature) for key, a in fresh.items())
+    with stage("match_index"):  # one vector per resume, not per JD row
+        match_index.add(ids[next(iter(fresh))], resume_data["text"], email)
+    return len(fresh)
+
+
+def _run_upload_job(job: Job) -> Dict[str, Any]:
+    """Background version of /upload: parse, score, save, then report the result."""
+    payload = job.payload
+    with request_trace("upload_job", job_id=job.id, jd=payload["jd_text"]) as trace:
+        try:
+            job.report("parsing", 10)
+            resume_data = _cached_parse(payload["digest"])
+            trace["cache_hit"] = resume_data is not None
+            if resume_data is None:
+                resume_data = _parse_and_cache(payload["digest"], payload["upload"])
+            _require_text(resume_data)
+
+            job.report("scoring", 60)
+            if payload.get("jds"):
+                analyses = _analyse_all(resume_data, payload["jds"])
+            else:
+                analysis = _analyse(resume_data, payload["jd_text"])
+
+            job.report("saving", 80)
+            with app.app_context():
+                if payload.get("jds"):
+                    trace["inserted"] = _save_results(resume_data, analyses)
+                    trace["outcome"] = "scored_all"
+                else:
+                    inserted = _save_result(resume_data, analysis, payload["jd_text"])
+                    trace["outcome"] = "inserted" if inserted else "duplicate"
+        finally:
+            payload["upload"].close()
+
+    result = {k: v for k, v in resume_data.items() if k != "text"}
+    if payload.get("jds"):
+        result["results"] = analyses
     else:
-        flash("This email has already submitted a resume. Duplicate prevented.", "warning")
+        result.update(analysis, jd_text=payload["jd_text"], duplicate=not inserted)
+    if resume_data.get("truncated"):
+        result["warning"] = _truncation_note(resume_data)
+    return result
 
 
 @app.route("/upload", methods=["POST"])
@@ -138,11 +352,16 @@ def upload():
     field: str = ""
     courses: List[Tuple[str, str]] = []
     recommended_skills: List[str] = []
-    user_level: str = "Beginner"
     jd_text: str = request.form.get("jd_text", "")
-    save_path: str = ""
+    upload_file = None
+    async_mode = request.values.get("async") == "1"
+    # all_jds=1: score against every JD (or the "jds" fields) from one parse
+    jds: List[str] = _requested_jds() if request.values.get("all_jds") == "1" else []
+    all_results: List[Dict[str, Any]] = []
 
     if "resume" not in request.files:
+        if async_mode:
+            return jsonify({"error": "No file uploaded"}), 400
         flash("No file uploaded", "error")
         return render_template(
             "index.html", 
@@ -151,59 +370,74 @@ def upload():
         )
 
     file = request.files["resume"]
-    save_path = os.path.join(UPLOAD_FOLDER, file.filename)
-    file.save(save_path)
 
-    try:
-        # Parse resume
-        resume_data = parse_resume(save_path)
-
-        # Score resume (JD-aware)
-        score = calculate_score(resume_data["text"], jd_text, resume_data["skills"])
-
-        # Recommend field & courses
-        field, courses = recommend_courses(resume_data["skills"])
-
-        # Recommend missing core skills
-        recommended_skills = recommend_skills(resume_data["skills"], jd_text)
-
-        # Determine User Level
-        user_level = "Advanced" if score >= 80 else "Intermediate" if score >= 50 else "Beginner"
-
-        # Prevent duplicate by email and job description
-        ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        cursor.execute("SELECT * FROM user_data WHERE Email=%s AND Job_Description=%s", 
-                      (resume_data["email"].lower(), jd_text))
-        existing = cursor.fetchone()
-
-        if not existing:
-            cursor.execute("""
-            INSERT INTO user_data 
-            (Name, Email, Resume_Score, Timestamp, Page_No, Predicted_Field, Job_Description, User_Level, Skills, Recommended_Skills)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            """, (
-                resume_data["name"], 
-                resume_data["email"].lower(),
-                score, 
-                ts, 
-                resume_data["pages"], 
-                field,            
-                jd_text,          
-                user_level,
-                ", ".join(resume_data["skills"]), 
-                ", ".join(recommended_skills)
-            ))
-            connection.commit()
-            flash("Resume uploaded successfully!", "success")
-        else:
-            flash(f"This email has already submitted a resume for {jd_text}. Duplicate prevented.", "warning")
-
-    except Exception as e:
-        flash(f"Error processing resume: {str(e)}", "error")
-        print(f"Upload error: {e}")  # Debug
-    finally:
-        if save_path and os.path.exists(save_path):
-            os.remove(save_path)  # Clean up uploaded file
+    if len(jds) > MAX_SCORE_JDS:
+        message = f"At most {MAX_SCORE_JDS} job descriptions per upload"
+        if async_mode:
+            return jsonify({"error": message}), 400
+        flash(message, "error")
+        return render_template("index.html", job_descriptions=JOB_DESCRIPTIONS, selected_jd=jd_text)
+
+    if async_mode:
+        # The worker thread takes over the spooled copy and closes it when done
+        digest, upload_file = spool_upload(file.stream, UPLOAD_SPOOL_BYTES, UPLOAD_FOLDER)
+        try:
+            job_id = upload_jobs.submit({"digest": digest, "upload": upload_file, "jd_text": jd_text, "jds": jds})
+        except QueueFull as e:
+            upload_file.close()
+            return jsonify({"error": f"Server busy: {e}"}), 503, {"Retry-After": "5"}
+        return jsonify({"job_id": job_id, "status_url": url_for("job_status", job_id=job_id)}), 202
+
+    with request_trace("upload_all" if jds else "upload", jd=jd_text, jds=len(jds)) as trace:
+        try:
+            # Parse resume (cached by file hash; only JD-dependent steps rerun on a hit)
+            with stage("read_upload"):
+                digest, upload_file = spool_upload(file.stream, UPLOAD_SPOOL_BYTES, UPLOAD_FOLDER)
+            resume_data = _cached_parse(digest)
+            trace["cache_hit"] = resume_data is not None
+            if resume_data is None:
+                resume_data = _parse_and_cache(digest, upload_file)
+            _require_text(resume_data)
+
+            if jds:
+                all_results = _analyse_all(resume_data, jds)
+                field = all_results[0]["field"]
+                courses = all_results[0]["courses"]
+            else:
+                analysis = _analyse(resume_data, jd_text)
+                score = analysis["score"]
+                field = analysis["field"]
+                courses = analysis["courses"]
+                recommended_skills = analysis["recommended_skills"]
+
+            if resume_data.get("truncated"):
+                trace["truncated"] = resume_data["truncated"]
+                flash(_truncation_note(resume_data), "warning")
+
+            if jds:
+                inserted = _save_results(resume_data, all_results)
+                trace["outcome"] = "scored_all"
+                trace["inserted"] = inserted
+                flash(f"Resume scored against {len(all_results)} job descriptions "
+                      f"({inserted} saved, {len(all_results) - inserted} already submitted).", "success")
+            elif _save_result(resume_data, analysis, jd_text):
+                trace["outcome"] = "inserted"
+                flash("Resume uploaded successfully!", "success")
+            else:
+                trace["outcome"] = "duplicate"
+                flash(f"This resume has already been submitted for {jd_text}. Duplicate prevented.", "warning")
+
+        except UnreadableResume as e:
+            trace["outcome"] = "unreadable"
+            flash(str(e), "error")
+        except Exception as e:
+            trace["outcome"] = "error"
+            trace["error"] = str(e)
+            flash(f"Error processing resume: {str(e)}", "error")
+            log.exception("Upload of %s failed", file.filename)
+        finally:
+            if upload_file is not None:
+                upload_file.close()  # also removes the temp file if it was spooled to disk
 
     return render_template(
         "index.html", 
@@ -213,31 +447,342 @@ def upload():
         job_descriptions=JOB_DESCRIPTIONS,
         field=field,
         courses=courses,
-        recommended_skills=recommended_skills
+        recommended_skills=recommended_skills,
+        all_results=all_results
     )
 
+
+@app.route("/api/score_all", methods=["POST"])
+def api_score_all():
+    """Parse the "resume" PDF once and score it against every JD (or the repeated "jds" fields)."""
+    if "resume" not in request.files:
+        return jsonify({"error": "No file uploaded"}), 400
+    jds = _requested_jds()
+    if len(jds) > MAX_SCORE_JDS:
+        return jsonify({"error": f"At most {MAX_SCORE_JDS} job descriptions per request"}), 400
+
+    with request_trace("score_all", jds=len(jds)) as trace:
+        digest, upload_file = spool_upload(request.files["resume"].stream, UPLOAD_SPOOL_BYTES, UPLOAD_FOLDER)
+        try:
+            resume_data = _cached_parse(digest)
+            trace["cache_hit"] = resume_data is not None
+            if resume_data is None:
+                resume_data = _parse_and_cache(digest, upload_file)
+        finally:
+            upload_file.close()
+        try:
+            _require_text(resume_data)
+        except UnreadableResume as e:
+            return jsonify({"error": str(e)}), 422
+
+        results = _analyse_all(resume_data, jds)
+        trace["inserted"] = _save_results(resume_data, results)
+
+    body = {k: v for k, v in resume_data.items() if k != "text"}
+    if resume_data.get("truncated"):
+        body["warning"] = _truncation_note(resume_data)
+    body["results"] = results
+    return jsonify(body)
+
+
+def _gauges() -> Dict[str, float]:
+    """This process's pool, queue and cache gauges."""
+    gauges = {f"resume_db_pool_{k}": v for k, v in db_pool.stats().items()}
+    gauges.update({f"resume_upload_queue_{k}": v for k, v in upload_jobs.metrics().items()})
+    gauges.update({f"resume_parse_cache_{k}": v for k, v in parse_cache.stats().items()})
+    gauges.update({f"resume_match_index_{k}": v for k, v in match_index.stats().items()})
+    gauges.update({f"resume_near_dup_{k}": v for k, v in near_dups.stats().items()})
+    return gauges
+
+
+@app.route("/metrics")
+def metrics():
+    """Stage histograms summed over every worker, plus each worker's gauges, in Prometheus text format."""
+    worker_metrics.publish()
+    histograms, gauges = worker_metrics.collect()
+    return Response(render_prometheus(histograms=histograms, worker_gauges=gauges), mimetype="text/plain; version=0.0.4")
+
+
+@app.errorhandler(413)
+def upload_too_large(e):
+    limit_mb = app.config["MAX_CONTENT_LENGTH"] / (1024 * 1024)
+    message = f"File too large (limit {limit_mb:g} MB)"
+    if request.args.get("async") == "1":  # request.form would raise 413 again
+        return jsonify({"error": message}), 413
+    flash(message, "error")
+    return render_template("index.html", job_descriptions=JOB_DESCRIPTIONS, selected_jd=""), 413
+
+
+@app.route("/status/<job_id>")
+def job_status(job_id):
+    job = upload_jobs.status(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown job id"}), 404
+    return jsonify(job)
+
+
+@app.route("/status/metrics")
+def job_metrics():
+    return jsonify(upload_jobs.metrics())
+
+
+@app.route("/api/candidates")
+def api_candidates():
+    """Candidates with all (match=all) or any (match=any) of ?skills=a,b,c, best score first."""
+    skills = request.args.get("skills", "").split(",")
+    match = request.args.get("match", "all")
+    if match not in ("all", "any"):
+        return jsonify({"error": "match must be 'all' or 'any'"}), 400
+
+    rows, next_cursor = candidates_with_skills(
+        get_db().cursor(),
+        skills,
+        match=match,
+        jd=request.args.get("jd", ""),
+        after=parse_cursor(request.args.get("after", "")),
+        limit=request.args.get("limit", 50, type=int)
+    )
+    return jsonify({"candidates": rows, "next": next_cursor})
+
+
+@app.route("/api/top")
+def api_top():
+    """Best ?k= candidates for ?jd=, served from memory."""
+    k = request.args.get("k", 20, type=int)
+    if k > top_candidates.capacity:
+        return jsonify({"error": f"k must be at most {top_candidates.capacity}"}), 400
+    jd = request.args.get("jd", "")
+    return jsonify({"jd": jd, "candidates": top_candidates.top(jd, k)})
+
+
+@app.route("/api/match", methods=["GET", "POST"])
+def api_match():
+    """Candidates ranked by TF-IDF similarity of their resume text to a free-text ?jd=."""
+    jd = request.values.get("jd", "").strip()
+    if not jd:
+        return jsonify({"error": "jd is required"}), 400
+    k = max(1, min(request.values.get("k", 20, type=int), MAX_PAGE_SIZE))
+
+    with stage("match_rank"):
+        ranked = match_index.rank(jd, k)
+    if not ranked:
+        return jsonify({"candidates": []})
+    cursor = get_db().cursor()
+    cursor.execute(
+        "SELECT ID, Name, Email, Resume_Score, Job_Description, User_Level, Skills FROM user_data WHERE ID IN ("
+        + ", ".join(["%s"] * len(ranked)) + ")",
+        [candidate_id for candidate_id, _ in ranked]
+    )
+    rows = {row[0]: row for row in cursor.fetchall()}
+    candidates = []
+    for candidate_id, similarity in ranked:
+        if candidate_id not in rows:  # row deleted since it was indexed
+            continue
+        _, name, email, score, row_jd, level, skills = rows[candidate_id]
+        candidates.append({"ID": candidate_id, "Name": name, "Email": email, "Similarity": similarity,
+                           "Resume_Score": score, "Job_Description": row_jd, "User_Level": level, "Skills": skills})
+    return jsonify({"candidates": candidates})
+
+
+@app.route("/api/top/check")
+def api_top_check():
+    """Rebuild the top-K index from MySQL and compare; ?repair=0 only reports."""
+    return jsonify(verify(top_candidates, get_db(), repair=request.args.get("repair", "1") != "0"))
+
+
 @app.route("/admin")
 def admin():
     selected_jd = request.args.get("jd", "")  # filter by job description
-    if selected_jd:
-        cursor.execute("SELECT * FROM user_data WHERE Job_Description=%s ORDER BY Resume_Score DESC", (selected_jd,))
-    else:
-        cursor.execute("SELECT * FROM user_data ORDER BY Resume_Score DESC")
-
-    data = cursor.fetchall()
-    columns = [desc[0] for desc in cursor.description]
-    data_dicts = [dict(zip(columns, row)) for row in data]
+    selected_level = request.args.get("level", "")
+    selected_field = request.args.get("field", "")
+    include_skills = request.args.get("skills") == "1"
+    after = request.args.get("after", "")
+    limit = request.args.get("limit", 50, type=int)
+
+    data_dicts, next_cursor = admin_page(
+        get_db().cursor(),
+        jd=selected_jd,
+        level=selected_level,
+        field=selected_field,
+        after=parse_cursor(after),
+        limit=limit,
+        include_skills=include_skills
+    )
 
     return render_template(
         "admin.html", 
         data=data_dicts,
         job_descriptions=JOB_DESCRIPTIONS,
-        selected_jd=selected_jd
+        user_levels=USER_LEVELS,
+        predicted_fields=PREDICTED_FIELDS,
+        selected_jd=selected_jd,
+        selected_level=selected_level,
+        selected_field=selected_field,
+        include_skills=include_skills,
+        limit=limit,
+        is_first_page=not after,
+        next_cursor=next_cursor
     )
 
-if __name__ == "__main__":
-    import webbrowser
-    webbrowser.open("http://127.0.0.1:5000/")
-    app.run(debug=True)
+def _export_stream(fmt: str, jd: str, level: str, field: str):
+    """Export bytes for /admin/export; owns its own pool connection for the whole stream."""
+    connection = db_pool.acquire()
+    finished = False
+    try:
+        cursor = server_side_cursor(connection)
+        yield from encode(iter_chunks(cursor, jd, level, field), fmt)
+        cursor.close()
+        finished = True
+    finally:
+        # An abandoned SSCursor still has rows in flight: close that connection instead of draining it
+        db_pool.release(connection, broken=not finished)
+
+
+@app.route("/admin/export")
+def admin_export():
+    """Stream user_data as ?format=csv|parquet, with the same jd/level/field filters as /admin."""
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+
+    stream = _export_stream(fmt, request.args.get("jd", ""), request.args.get("level", ""),
+                            request.args.get("field", ""))
+    try:
+        first = next(stream)  # run the query now so errors still get a proper status code
+    except ImportError:
+        return jsonify({"error": "Parquet export needs pyarrow (pip install pyarrow)"}), 501
+
+    def generate():
+        yield first
+        yield from stream
+
+    filename = "candidates." + fmt
+    return Response(generate(), mimetype=EXPORT_FORMATS[fmt],
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+
+# -----------------------
+# STARTUP
+# -----------------------
+
+def open_resources() -> None:
+    """Open this process's DB pool, SQLite stores, match index and upload threads (once per process)."""
+    global db_pool, top_candidates, parse_cache, match_index, near_dups, upload_jobs, worker_metrics
+    if db_pool is not None:
+        return
+    db_pool = ConnectionPool(
+        connect_from_env,
+        size=int(os.getenv("DB_POOL_SIZE", "5")),
+        timeout=float(os.getenv("DB_POOL_TIMEOUT", "10")),
+        ping_after=float(os.getenv("DB_POOL_PING_AFTER", "30"))
+    )
+    init_app(app, db_pool)
+    os.makedirs(UPLOAD_FOLDER, exist_ok=True)  # spool files for uploads too big to keep in memory
+
+    top_candidates = TopCandidates(
+        capacity=int(os.getenv("TOP_K_CAPACITY", "100")),
+        refresh_after=float(os.getenv("TOP_K_REFRESH", "60"))
+    )
+    connection = db_pool.acquire()
+    try:
+        top_candidates.warm(connection)
+    finally:
+        db_pool.release(connection)
+    top_candidates.start_refresh(db_pool)  # picks up rows other workers and scripts wrote
+
+    # Parsed resumes keyed by PDF hash, so re-uploads skip PDF decoding and NLP
+    parse_cache = ParseCache(
+        path=os.getenv("PARSE_CACHE_PATH", "parse_cache.sqlite3"),
+        memory_items=int(os.getenv("PARSE_CACHE_ITEMS", "256")),
+        max_disk_bytes=int(os.getenv("PARSE_CACHE_MAX_MB", "200")) * 1024 * 1024
+    )
+
+    # TF-IDF vectors of uploaded resume texts, for ranking candidates against free-text JDs (/api/match)
+    match_index = MatchIndex(os.getenv("MATCH_INDEX_DIR", "match_index"))
 
-    app.run(debug=True)
+    # MinHash signatures of stored resumes: the same resume resubmitted for a JD (other email, small edits) is a duplicate
+    near_dups = NearDupIndex(
+        os.getenv("NEAR_DUP_PATH", "near_dup.sqlite3"),
+        threshold=float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))
+    )
+
+    # Opt-in async uploads (/upload?async=1): bounded queue + worker threads
+    # Job status goes to SQLite too, so /status/<job_id> works on whichever server worker gets the poll
+    upload_jobs = JobQueue(
+        _run_upload_job,
+        workers=int(os.getenv("ASYNC_WORKERS", "2")),
+        max_pending=int(os.getenv("ASYNC_MAX_PENDING", "50")),
+        store=JobStore(os.getenv("JOB_STORE_PATH", "jobs.sqlite3"))
+    )
+
+    worker_metrics = WorkerMetrics(
+        os.getenv("METRICS_PATH", "metrics.sqlite3"),
+        gauges=_gauges,
+        interval=float(os.getenv("METRICS_PUBLISH_SECONDS", "5"))
+    )
+
+
+def close_resources() -> None:
+    """Finish queued upload jobs, hand in this worker's metrics and close the DB pool (a recycled server worker calls this on exit)."""
+    if top_candidates is not None:
+        top_candidates.stop_refresh()
+    if upload_jobs is not None:
+        upload_jobs.shutdown(wait=True)
+    if worker_metrics is not None:
+        worker_metrics.close()
+    if db_pool is not None:
+        db_pool.close()
+
+
+def preload() -> None:
+    """Load the read-only parsing state every request uses: spaCy model, skill tables, JD profiles, course lists.
+
+    Most of it is built when resume_parser is imported. This adds the spaCy model and the
+    lazily loaded tokenizer and phone metadata. serve.py calls it in the parent so the
+    workers share it copy-on-write.
+    """
+    get_nlp()("Jane Doe, Software Engineer")
+    _extract_phone(["+1 415 555 2671", "+44 20 7946 0958"], PHONE_REGION)
+
+
+def create_app(resources: bool = True) -> Flask:
+    """The Flask app, with this process's resources opened unless resources=False.
+
+    Importing App has no side effects beyond reading .env. serve.py passes
+    resources=False in the pre-fork parent and opens them in each worker.
+    """
+    if resources:
+        open_resources()
+    return app
+
+
+def migrate() -> None:
+    """Create the database, tables and indexes (idempotent)."""
+    connection = connect_from_env()
+    try:
+        init_schema(connection)
+    finally:
+        connection.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resume analyser web app.")
+    sub = parser.add_subparsers(dest="command")
+    sub.add_parser("migrate", help="create the database, tables and indexes")
+    run = sub.add_parser("run", help="development server (the default); production: python serve.py")
+    run.add_argument("--host", default="127.0.0.1")
+    run.add_argument("--port", type=int, default=5000)
+    run.add_argument("--debug", action="store_true", help="Flask debugger and auto-reload")
+    args = parser.parse_args(argv)
+
+    migrate()
+    if args.command == "migrate":
+        print("Schema is up to date")
+        return 0
+    create_app().run(host=getattr(args, "host", "127.0.0.1"), port=getattr(args, "port", 5000),
+                     debug=getattr(args, "debug", False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,260 @@
+"""Bulk resume ingestion (career fairs etc.) without going through /upload.
+
+Usage (from the Resume_analyser folder):
+    python batch_ingest.py resumes/ --jd "Data Scientist" --workers 8
+    python batch_ingest.py resumes.zip --jd "Web Developer" --dry-run
+
+PDF extraction runs in a multiprocessing pool, NER runs through nlp.pipe in
+the parent, and rows go to user_data in chunks of one transaction each.
+"""
+import argparse
+import datetime
+import functools
+import io
+import multiprocessing
+import os
+import sys
+import time
+import zipfile
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from dotenv import load_dotenv
+
+from db import connect_from_env
+from match_index import MatchIndex
+from near_dup import NearDupIndex, minhash, similarity
+from pdf_extractor import extract_pdf
+from skill_index import add_candidate_skills
+from resume_parser import (
+    _extract_lines, _header_text, get_nlp, parse_resume_text,
+    jd_profile, calculate_score, recommend_courses, recommend_skills, get_user_level, count_section_hits,
+    PDF_MAX_PAGES, PDF_MAX_SECONDS, PHONE_REGION,
+)
+
+INSERT_SQL = """
+INSERT INTO user_data
+(Name, Email, Resume_Score, Timestamp, Page_No, Predicted_Field, Job_Description, User_Level, Skills, Recommended_Skills, Section_Hits)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# (source path, zip member or None)
+Item = Tuple[str, Optional[str]]
+
+
+def collect_items(source: str) -> List[Item]:
+    """List the PDFs in a directory (recursively) or inside a zip file."""
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as zf:
+            return [(source, n) for n in sorted(zf.namelist()) if n.lower().endswith(".pdf")]
+    items = []
+    for root, _, files in os.walk(source):
+        for f in sorted(files):
+            if f.lower().endswith(".pdf"):
+                items.append((os.path.join(root, f), None))
+    return items
+
+
+def _label(item: Item) -> str:
+    path, member = item
+    return f"{path}:{member}" if member else path
+
+
+def _extract_one(item: Item, max_pages: int = PDF_MAX_PAGES, max_seconds: float = PDF_MAX_SECONDS,
+                 max_bytes: Optional[int] = None) -> Tuple[Item, Optional[Dict[str, Any]], Optional[str]]:
+    """Pool worker: decode one PDF (up to the page/time limits). Errors are returned, never raised."""
+    path, member = item
+    try:
+        if member:
+            with zipfile.ZipFile(path) as zf:
+                size = zf.getinfo(member).file_size
+                if max_bytes and size > max_bytes:
+                    return item, None, f"file too large ({size} bytes)"
+                extracted = extract_pdf(io.BytesIO(zf.read(member)), max_pages, max_seconds)
+        else:
+            size = os.path.getsize(path)
+            if max_bytes and size > max_bytes:
+                return item, None, f"file too large ({size} bytes)"
+            extracted = extract_pdf(path, max_pages, max_seconds)
+        if not (extracted["text"] or "").strip():
+            return item, None, "no text in the PDF"  # as /upload: nothing to score or dedupe on
+        return item, {"text": extracted["text"], "pages": extracted["total_pages"]}, None
+    except Exception as e:
+        return item, None, f"{type(e).__name__}: {e}"
+
+
+class Progress:
+    def __init__(self, total: int, every: int = 25):
+        self.total = total
+        self.every = every
+        self.done = 0
+        self.start = time.perf_counter()
+
+    def tick(self):
+        self.done += 1
+        if self.done % self.every == 0 or self.done == self.total:
+            rate = self.done / max(1e-9, time.perf_counter() - self.start)
+            print(f"[{self.done}/{self.total}] {rate:.1f} resumes/s", file=sys.stderr)
+
+
+def analyse(items: List[Item], jd_text: str, workers: int, batch_size: int,
+            errors: List[Tuple[str, str]], limits: Optional[Dict[str, Any]] = None,
+            phone_region: str = PHONE_REGION) -> Iterator[Dict[str, Any]]:
+    """Yield one analysed row per PDF; failures are appended to errors.
+
+    limits are _extract_one's max_pages / max_seconds / max_bytes.
+    """
+    progress = Progress(len(items))
+    nlp = get_nlp()
+    profile = jd_profile(jd_text)
+    extract = functools.partial(_extract_one, **(limits or {}))
+
+    with multiprocessing.Pool(workers) as pool:
+        def extracted() -> Iterator[Tuple[str, Tuple[Item, Dict[str, Any]]]]:
+            for item, result, err in pool.imap_unordered(extract, items, chunksize=4):
+                if err:
+                    errors.append((_label(item), err))
+                    progress.tick()
+                    continue
+                yield _header_text(_extract_lines(result["text"])), (item, result)
+
+        for header_doc, (item, result) in nlp.pipe(extracted(), batch_size=batch_size, as_tuples=True):
+            try:
+                resume_data = parse_resume_text(result["text"], result["pages"], header_doc=header_doc,
+                                                phone_region=phone_region)
+                score = calculate_score(resume_data["text"], profile, resume_data["skills"])
+                field, _ = recommend_courses(resume_data["skills"])
+                resume_data.update(
+                    score=score,
+                    field=field,
+                    user_level=get_user_level(score),
+                    recommended_skills=recommend_skills(resume_data["skills"], profile),
+                    source=_label(item),
+                )
+                yield resume_data
+            except Exception as e:
+                errors.append((_label(item), f"{type(e).__name__}: {e}"))
+            finally:
+                progress.tick()
+
+
+def _to_row(r: Dict[str, Any], jd_text: str, ts: str) -> tuple:
+    return (
+        r["name"], r["email"].lower(), r["score"], ts, r["pages"], r["field"], jd_text,
+        r["user_level"], ", ".join(r["skills"]), ", ".join(r["recommended_skills"]),
+        count_section_hits(r["text"]),
+    )
+
+
+def write_rows(connection, rows: Iterator[Dict[str, Any]], jd_text: str, chunk: int,
+               index: Optional[MatchIndex] = None, near_dups: Optional[NearDupIndex] = None) -> Tuple[int, int]:
+    """Insert rows in chunks of one transaction each, skipping the same duplicates as /upload.
+
+    That is the same Email + JD (not for "unknown" emails) and, if `near_dups` is
+    given, a near-duplicate of a stored row or of an earlier row in this batch.
+    """
+    cursor = connection.cursor()
+    cursor.execute("SELECT Email FROM user_data WHERE Job_Description=%s", (jd_text,))
+    seen = {row[0].lower() for row in cursor.fetchall()}
+
+    ts = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    inserted = skipped = 0
+    pending: List[Tuple[Dict[str, Any], Optional[np.ndarray]]] = []
+    for r in rows:
+        email = r["email"].lower()
+        if email != "unknown" and email in seen:
+            skipped += 1
+            continue
+        signature = None
+        if near_dups is not None:
+            signature = minhash(r["text"])
+            # the index only holds committed chunks, so compare with the pending rows too
+            if near_dups.find(signature, jd_text) or any(
+                    signature is not None and other is not None and similarity(signature, other) >= near_dups.threshold
+                    for _, other in pending):
+                skipped += 1
+                continue
+        seen.add(email)
+        pending.append((r, signature))
+        if len(pending) >= chunk:
+            inserted += _insert_chunk(connection, pending, jd_text, ts, index, near_dups)
+            pending = []
+    if pending:
+        inserted += _insert_chunk(connection, pending, jd_text, ts, index, near_dups)
+    return inserted, skipped
+
+
+def _insert_chunk(connection, rows: List[Tuple[Dict[str, Any], Optional[np.ndarray]]], jd_text: str, ts: str,
+                  index: Optional[MatchIndex] = None, near_dups: Optional[NearDupIndex] = None) -> int:
+    """Insert (row, MinHash signature) pairs and index their skills, in one transaction.
+
+    Their text also goes to `index` and their signature to `near_dups`, if given.
+    """
+    cursor = connection.cursor()
+    ids = []
+    for r, _ in rows:
+        # One INSERT per row, so each ID is its own lastrowid (a multi-row INSERT's IDs need not be consecutive)
+        cursor.execute(INSERT_SQL, _to_row(r, jd_text, ts))
+        ids.append(cursor.lastrowid)
+        add_candidate_skills(cursor, ids[-1], r["skills"], r["recommended_skills"])
+    connection.commit()
+    if index is not None:
+        index.add_many((row_id, r["text"], r["email"].lower()) for row_id, (r, _) in zip(ids, rows))
+    if near_dups is not None:
+        near_dups.add_many((row_id, jd_text, signature) for row_id, (_, signature) in zip(ids, rows))
+    return len(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-ingest a directory or zip of PDF resumes.")
+    parser.add_argument("source", help="directory of PDFs or a .zip file")
+    parser.add_argument("--jd", default="", help="job description to score against")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="PDF extraction processes")
+    parser.add_argument("--batch-size", type=int, default=32, help="nlp.pipe batch size")
+    parser.add_argument("--chunk", type=int, default=500, help="rows per transaction")
+    parser.add_argument("--dry-run", action="store_true", help="analyse only, do not write to MySQL")
+    parser.add_argument("--max-pages", type=int, default=PDF_MAX_PAGES, help="pages decoded per PDF")
+    parser.add_argument("--max-seconds", type=float, default=PDF_MAX_SECONDS, help="decode time per PDF")
+    parser.add_argument("--max-mb", type=float, default=10, help="skip PDFs larger than this")
+    parser.add_argument("--phone-region", default=os.getenv("PHONE_REGION", PHONE_REGION),
+                        help="region for phone numbers without a +country code")
+    args = parser.parse_args(argv)
+
+    items = collect_items(args.source)
+    if not items:
+        print(f"No PDFs found in {args.source}")
+        return 1
+
+    errors: List[Tuple[str, str]] = []
+    start = time.perf_counter()
+    limits = {"max_pages": args.max_pages, "max_seconds": args.max_seconds,
+              "max_bytes": int(args.max_mb * 1024 * 1024)}
+    rows = analyse(items, args.jd, max(1, args.workers), args.batch_size, errors, limits, args.phone_region.upper())
+
+    if args.dry_run:
+        inserted, skipped = 0, 0
+        for _ in rows:
+            pass
+    else:
+        load_dotenv()
+        connection = connect_from_env()
+        try:
+            index = MatchIndex(os.getenv("MATCH_INDEX_DIR", "match_index"))
+            near_dups = NearDupIndex(os.getenv("NEAR_DUP_PATH", "near_dup.sqlite3"),
+                                     threshold=float(os.getenv("NEAR_DUP_THRESHOLD", "0.8")))
+            inserted, skipped = write_rows(connection, rows, args.jd, args.chunk, index, near_dups)
+            if inserted:
+                index.compact()  # a whole batch would otherwise be scanned row by row on every /api/match
+        finally:
+            connection.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\nProcessed {len(items)} files in {elapsed:.1f}s ({len(items) / max(1e-9, elapsed):.1f} resumes/s)")
+    print(f"Inserted: {inserted}  Duplicates skipped: {skipped}  Failed: {len(errors)}")
+    for label, err in errors:
+        print(f"  FAILED {label}: {err}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""Latency of the /admin listing: full-table fetch vs keyset pages.
+
+Fills user_data with synthetic candidates (150k by default) and times:
+  * the old query: SELECT * ... ORDER BY Resume_Score DESC + fetchall()
+  * the first keyset page and a deep keyset page (~100k rows in)
+  * the same deep page with LIMIT/OFFSET, for comparison
+each with and without a Job_Description filter.
+
+Runs against a throwaway SQLite database by default. SQLite understands
+the same SQL and uses the same indexes. Pass --mysql to run against the
+.env database instead (this inserts synthetic rows there).
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_admin_query.py --rows 150000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from candidate_queries import ADMIN_COLUMNS, admin_page, filter_clause
+from db import USER_DATA_INDEXES, connect_from_env, init_schema
+
+JDS = ["Software Engineer", "Data Scientist", "Web Developer", "Android Developer", "iOS Developer", "UI/UX Designer"]
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+PAGE = 50
+
+
+class SQLiteCursor:
+    """pymysql-style %s placeholders on top of sqlite3."""
+
+    def __init__(self, conn):
+        self._cur = conn.cursor()
+
+    def execute(self, sql, params=()):
+        return self._cur.execute(sql.replace("%s", "?"), params)
+
+    def executemany(self, sql, rows):
+        return self._cur.executemany(sql.replace("%s", "?"), rows)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+    @property
+    def description(self):
+        return self._cur.description
+
+
+def sqlite_connection():
+    conn = sqlite3.connect(os.path.join(tempfile.mkdtemp(), "admin_bench.sqlite3"))
+    conn.execute("""
+    CREATE TABLE user_data (
+        ID INTEGER PRIMARY KEY AUTOINCREMENT, Name TEXT, Email TEXT, Resume_Score INT,
+        Timestamp TEXT, Page_No INT, Predicted_Field TEXT, Job_Description TEXT,
+        User_Level TEXT DEFAULT 'Beginner', Skills TEXT, Recommended_Skills TEXT
+    )""")
+    for name, columns in USER_DATA_INDEXES.items():
+        conn.execute(f"CREATE INDEX {name} ON user_data {columns}")
+    return conn
+
+
+def fill(conn, cursor, rows):
+    rng = random.Random(7)
+    skills = ", ".join(["python", "java", "docker", "kubernetes", "react", "sql", "git", "linux"] * 6)
+    batch = []
+    for i in range(rows):
+        score = rng.randint(0, 100)
+        batch.append((f"Candidate {i}", f"c{i}@example.com", score, "2024-01-01 00:00:00", rng.randint(1, 3),
+                      "Software Engineering", rng.choice(JDS), rng.choice(LEVELS), skills, "docker, git"))
+        if len(batch) == 5000:
+            cursor.executemany(
+                "INSERT INTO user_data (Name, Email, Resume_Score, Timestamp, Page_No, Predicted_Field, "
+                "Job_Description, User_Level, Skills, Recommended_Skills) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+                batch)
+            batch = []
+    if batch:
+        cursor.executemany(
+            "INSERT INTO user_data (Name, Email, Resume_Score, Timestamp, Page_No, Predicted_Field, "
+            "Job_Description, User_Level, Skills, Recommended_Skills) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)",
+            batch)
+    conn.commit()
+
+
+def old_admin(cursor, jd):
+    if jd:
+        cursor.execute("SELECT * FROM user_data WHERE Job_Description=%s ORDER BY Resume_Score DESC", (jd,))
+    else:
+        cursor.execute("SELECT * FROM user_data ORDER BY Resume_Score DESC")
+    columns = [d[0] for d in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def offset_page(cursor, jd, offset):
+    where, params = filter_clause(jd)
+    sql = "SELECT " + ", ".join(ADMIN_COLUMNS) + " FROM user_data"
+    if where:
+        sql += " WHERE " + where
+    cursor.execute(sql + " ORDER BY Resume_Score DESC, ID DESC LIMIT %s OFFSET %s", params + [PAGE, offset])
+    return cursor.fetchall()
+
+
+def count_rows(cursor, jd):
+    where, params = filter_clause(jd)
+    cursor.execute("SELECT COUNT(*) FROM user_data" + (" WHERE " + where if where else ""), params)
+    return cursor.fetchall()[0][0]
+
+
+def deep_cursor(cursor, jd, depth):
+    """(score, id) of the row just before `depth`, i.e. where a deep page starts."""
+    where, params = filter_clause(jd)
+    sql = "SELECT Resume_Score, ID FROM user_data" + (" WHERE " + where if where else "")
+    cursor.execute(sql + " ORDER BY Resume_Score DESC, ID DESC LIMIT 1 OFFSET %s", params + [depth - 1])
+    return tuple(cursor.fetchall()[0])
+
+
+def _ms(fn, reps=5):
+    start = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - start) / reps * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=150000)
+    parser.add_argument("--mysql", action="store_true", help="use the MySQL database from .env")
+    args = parser.parse_args()
+
+    if args.mysql:
+        from dotenv import load_dotenv
+        load_dotenv()
+        conn = connect_from_env()
+        init_schema(conn)
+        cursor = conn.cursor()
+    else:
+        conn = sqlite_connection()
+        cursor = SQLiteCursor(conn)
+
+    print(f"Inserting {args.rows} synthetic rows...")
+    fill(conn, cursor, args.rows)
+
+    # ~100k rows in for the full table (at most the last page), same fraction for one JD
+    counts = {jd: count_rows(cursor, jd) for jd in ("", "Data Scientist")}
+    if min(counts.values()) < 2 * PAGE:
+        parser.error(f"--rows {args.rows} leaves fewer than {2 * PAGE} rows for one JD: too few for a deep page")
+    fraction = min(100000, counts[""] - PAGE) / counts[""]
+    depth = {jd: max(1, min(int(n * fraction), n - PAGE)) for jd, n in counts.items()}
+    after = {jd: deep_cursor(cursor, jd, d) for jd, d in depth.items()}
+
+    print(f"{'query':<34} {'all JDs ms':>11} {'one JD ms':>10}")
+    for label, fn in [
+        ("old: SELECT * + fetchall", lambda jd: old_admin(cursor, jd)),
+        ("keyset first page", lambda jd: admin_page(cursor, jd=jd, limit=PAGE)),
+        ("OFFSET deep page", lambda jd: offset_page(cursor, jd, depth[jd])),
+        ("keyset deep page", lambda jd: admin_page(cursor, jd=jd, after=after[jd], limit=PAGE)),
+    ]:
+        reps = 1 if label.startswith("old") else 20
+        print(f"{label:<34} {_ms(lambda: fn(''), reps):>11.2f} {_ms(lambda: fn('Data Scientist'), reps):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Accuracy and per-resume latency of contact extraction: full-text scan vs header/footer first.
+
+Builds --count synthetic resumes per layout. Their bodies are dense with
+dates, ticket numbers and amounts, the way real resumes are:
+  * header: contact line under the name (resume_corpus.py's layout)
+  * footer: contact line moved to the last line, with a phone-like order
+    number in the body (what a full-text scan picks up first)
+  * none:   no contact line at all (the worst case for the full-text scan)
+For each layout it reports how many emails and phones the old and new
+extraction got right, how often they agree, and their p50/p95 per resume.
+Numbers without a +country code are read as --region's (run it for a few,
+e.g. US, GB, KE, IN: "agree" should stay at the resume count).
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_contact.py --count 300 --pages 3 --region US
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import numpy as np
+import phonenumbers
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from resume_corpus import CONTACT_FORMATS, make_resume
+from resume_parser import SECTION_HINTS_GOOD, _extract_email, _extract_lines, _extract_phone
+
+LAYOUTS = ["header", "footer", "none"]
+
+
+def full_text(text, region):
+    """What parse_resume_text used to do: first email and first phone anywhere in the text."""
+    email_m = re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", text)
+    mobile = "Unknown"
+    try:
+        for match in phonenumbers.PhoneNumberMatcher(text, region):
+            mobile = phonenumbers.format_number(match.number, phonenumbers.PhoneNumberFormat.E164)
+            break
+    except Exception:
+        pass
+    return (email_m.group().lower() if email_m else "Unknown"), mobile
+
+
+def header_first(text, region):
+    lines = _extract_lines(text)
+    return _extract_email(lines), _extract_phone(lines, region)
+
+
+def resume(rng, layout, pages, region):
+    pages, meta = make_resume(rng, pages, 0.08, list(SECTION_HINTS_GOOD), rng.choice(list(CONTACT_FORMATS)))
+    lines = [line for page in pages for line in page]
+    for i in range(6, len(lines), 3):
+        lines[i] += (f" Jan {rng.randint(2015, 2020)} - Mar {rng.randint(2021, 2024)}, ticket {rng.randint(10**7, 10**8)},"
+                     f" cut costs by {rng.randint(5, 60)}% to ${rng.randint(1, 99)},{rng.randint(100, 999)}")
+    contact = lines.pop(1)
+    email, phone = meta["email"], phonenumbers.format_number(
+        phonenumbers.parse(meta["phone"], region), phonenumbers.PhoneNumberFormat.E164)
+    if layout == "header":
+        lines.insert(1, contact)
+    elif layout == "footer":
+        lines.insert(len(lines) // 2, f"Shipped order {rng.choice([212, 415, 617])}-{rng.randint(200, 999)}-"
+                                      f"{rng.randint(1000, 9999)} on time.")
+        lines.append(contact)
+    else:
+        email = phone = "Unknown"
+    return "\n".join(lines), email, phone
+
+
+def timed(fn, text, region, reps):
+    start = time.perf_counter()
+    for _ in range(reps):
+        result = fn(text, region)
+    return result, (time.perf_counter() - start) / reps * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=300, help="resumes per layout")
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--reps", type=int, default=3)
+    parser.add_argument("--region", default="US", help="phone region for numbers without a +country code")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    print(f"{'layout':<7} {'method':<13} {'email ok':>9} {'phone ok':>9} {'agree':>6} {'p50 ms':>7} {'p95 ms':>7}")
+    for layout in LAYOUTS:
+        docs = [resume(rng, layout, args.pages, args.region) for _ in range(args.count)]
+        results = {}
+        for name, fn in (("full text", full_text), ("header first", header_first)):
+            got, ms = zip(*(timed(fn, text, args.region, args.reps) for text, _, _ in docs))
+            results[name] = got
+            email_ok = sum(g[0] == e for g, (_, e, _) in zip(got, docs))
+            phone_ok = sum(g[1] == p for g, (_, _, p) in zip(got, docs))
+            agree = sum(a == b for a, b in zip(results["full text"], got))
+            print(f"{layout:<7} {name:<13} {email_ok:>5}/{len(docs):<3} {phone_ok:>5}/{len(docs):<3} {agree:>6} "
+                  f"{np.percentile(ms, 50):>7.2f} {np.percentile(ms, 95):>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
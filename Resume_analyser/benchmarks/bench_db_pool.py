@@ -0,0 +1,161 @@
+"""Concurrent-upload DB throughput: one shared connection vs the connection pool.
+
+Each simulated upload does what /upload does against the DB: the
+Email + Job_Description duplicate check, an INSERT and a commit.
+
+"before" shares one connection between all threads. A lock serializes it,
+because a pymysql connection cannot be used from two threads at once.
+"after" checks connections out of db.ConnectionPool per upload.
+
+By default it runs against an SQLite stand-in that adds a fixed round-trip
+delay per statement, to mimic a networked MySQL server. Pass --mysql to use
+the real database from .env instead (rows go into user_data).
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_db_pool.py --threads 16 --uploads 400 --pool-size 8
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db import ConnectionPool, connect_from_env, init_schema
+
+INSERT_SQL = """
+INSERT INTO user_data
+(Name, Email, Resume_Score, Timestamp, Page_No, Predicted_Field, Job_Description, User_Level, Skills, Recommended_Skills)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+class _SQLiteCursor:
+    def __init__(self, conn, rtt):
+        self._cur = conn.cursor()
+        self._rtt = rtt
+
+    def execute(self, sql, args=()):
+        time.sleep(self._rtt)  # network round trip to the DB server
+        return self._cur.execute(sql.replace("%s", "?"), args)
+
+    def fetchone(self):
+        return self._cur.fetchone()
+
+
+class SQLiteStandIn:
+    """Just enough of the pymysql connection API for this benchmark."""
+
+    def __init__(self, path, rtt):
+        # Autocommit so SQLite's file lock is only held per statement, like InnoDB row locks
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._rtt = rtt
+
+    def cursor(self):
+        return _SQLiteCursor(self._conn, self._rtt)
+
+    def commit(self):
+        time.sleep(self._rtt)
+
+    def rollback(self):
+        pass
+
+    def ping(self, reconnect=True):
+        self._conn.execute("SELECT 1")
+
+    def close(self):
+        self._conn.close()
+
+
+def create_sqlite_table(path):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS user_data (
+        ID INTEGER PRIMARY KEY AUTOINCREMENT, Name TEXT, Email TEXT, Resume_Score INT,
+        Timestamp TEXT, Page_No INT, Predicted_Field TEXT, Job_Description TEXT,
+        User_Level TEXT DEFAULT 'Beginner', Skills TEXT, Recommended_Skills TEXT
+    )""")
+    conn.commit()
+    conn.close()
+
+
+def one_upload(conn, i, run):
+    email = f"bench-{run}-{i}@example.com"
+    cursor = conn.cursor()
+    cursor.execute("SELECT * FROM user_data WHERE Email=%s AND Job_Description=%s", (email, "Data Scientist"))
+    if not cursor.fetchone():
+        cursor.execute(INSERT_SQL, ("Bench User", email, 50, "2024-01-01 00:00:00", 1, "Data Science",
+                                    "Data Scientist", "Intermediate", "python, sql", "pandas"))
+        conn.commit()
+
+
+def run_shared(connect, threads, uploads):
+    conn = connect()
+    lock = threading.Lock()
+
+    def work(i):
+        with lock:
+            one_upload(conn, i, "shared")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as ex:
+        list(ex.map(work, range(uploads)))
+    conn.close()
+    return time.perf_counter() - start
+
+
+def run_pooled(connect, threads, uploads, pool_size):
+    pool = ConnectionPool(connect, size=pool_size)
+
+    def work(i):
+        conn = pool.acquire()
+        try:
+            one_upload(conn, i, "pooled")
+        finally:
+            pool.release(conn)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as ex:
+        list(ex.map(work, range(uploads)))
+    elapsed = time.perf_counter() - start
+    pool.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--uploads", type=int, default=400)
+    parser.add_argument("--pool-size", type=int, default=8)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="simulated round trip (SQLite stand-in only)")
+    parser.add_argument("--mysql", action="store_true", help="use the MySQL database from .env")
+    args = parser.parse_args()
+
+    if args.mysql:
+        from dotenv import load_dotenv
+        load_dotenv()
+        conn = connect_from_env()
+        init_schema(conn)
+        conn.close()
+        connect = connect_from_env
+        backend = "MySQL"
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "bench.sqlite3")
+        create_sqlite_table(path)
+        connect = lambda: SQLiteStandIn(path, args.rtt_ms / 1000)
+        backend = f"SQLite stand-in, {args.rtt_ms} ms RTT"
+
+    print(f"{backend}: {args.uploads} uploads from {args.threads} threads")
+    shared = run_shared(connect, args.threads, args.uploads)
+    pooled = run_pooled(connect, args.threads, args.uploads, args.pool_size)
+    print(f"shared connection     {args.uploads / shared:8.1f} uploads/s")
+    print(f"pool (size {args.pool_size:<3})       {args.uploads / pooled:8.1f} uploads/s")
+
+
+if __name__ == "__main__":
+    main()
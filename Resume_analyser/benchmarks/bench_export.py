@@ -0,0 +1,124 @@
+"""Exporting user_data: fetchall() into memory vs the streaming CSV / Parquet export.
+
+Fills a throwaway SQLite user_data with N synthetic candidates (1M by
+default). Each mode then runs in its own subprocess so peak RSS is
+measured cleanly:
+  * fetchall: what scraping /admin cost, i.e. every row as a dict, then one CSV string
+  * csv / parquet: export.iter_chunks + encode, written to a file chunk by chunk
+
+SQLite cursors stream rows the way pymysql's SSCursor does. Pass --mysql
+to export the .env database with a real SSCursor instead.
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_export.py --rows 1000000
+"""
+import argparse
+import csv
+import io
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from export import EXPORT_COLUMNS, encode, iter_chunks, server_side_cursor
+
+JDS = ["Software Engineer", "Data Scientist", "Web Developer", "Android Developer", "iOS Developer", "UI/UX Designer"]
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+
+
+class SQLiteCursor:
+    """pymysql-style %s placeholders on top of sqlite3."""
+
+    def __init__(self, conn):
+        self._cur = conn.cursor()
+
+    def execute(self, sql, params=()):
+        return self._cur.execute(sql.replace("%s", "?"), params)
+
+    def fetchmany(self, size):
+        return self._cur.fetchmany(size)
+
+    def fetchall(self):
+        return self._cur.fetchall()
+
+
+def fill(path, rows):
+    conn = sqlite3.connect(path)
+    conn.execute("""
+    CREATE TABLE user_data (
+        ID INTEGER PRIMARY KEY AUTOINCREMENT, Name TEXT, Email TEXT, Resume_Score INT,
+        Timestamp TEXT, Page_No INT, Predicted_Field TEXT, Job_Description TEXT,
+        User_Level TEXT DEFAULT 'Beginner', Skills TEXT, Recommended_Skills TEXT
+    )""")
+    skills = ", ".join(["python", "java", "docker", "kubernetes", "react", "sql", "git", "linux"] * 3)
+    conn.executemany(
+        "INSERT INTO user_data (Name, Email, Resume_Score, Timestamp, Page_No, Predicted_Field, "
+        "Job_Description, User_Level, Skills, Recommended_Skills) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        ((f"Candidate {i}", f"c{i}@example.com", i * 37 % 101, "2024-01-01 00:00:00", 1 + i % 3,
+          "Software Engineering", JDS[i % len(JDS)], LEVELS[i % 3], skills, "docker, git") for i in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_mode(mode, db, out_path):
+    if db == "mysql":
+        from dotenv import load_dotenv
+        from db import connect_from_env
+        load_dotenv()
+        conn = connect_from_env()
+        cursor = server_side_cursor(conn) if mode != "fetchall" else conn.cursor()
+    else:
+        conn = sqlite3.connect(db)
+        cursor = SQLiteCursor(conn)
+
+    start = time.perf_counter()
+    written = 0
+    if mode == "fetchall":
+        cursor.execute("SELECT " + ", ".join(EXPORT_COLUMNS) + " FROM user_data ORDER BY ID")
+        data = [dict(zip(EXPORT_COLUMNS, row)) for row in cursor.fetchall()]
+        buf = io.StringIO()
+        writer = csv.DictWriter(buf, EXPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(data)
+        with open(out_path, "w") as f:
+            written = f.write(buf.getvalue())
+    else:
+        with open(out_path, "wb") as f:
+            for block in encode(iter_chunks(cursor), mode):
+                written += f.write(block)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:9s} {elapsed:7.2f} s  peak RSS {peak_mb:7.1f} MB  output {written / 1e6:7.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--mysql", action="store_true", help="export the .env database instead")
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    parser.add_argument("--db", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    if args.mode:
+        run_mode(args.mode, args.db, os.path.join(tmp, "export.out"))
+        return
+
+    db = "mysql"
+    if not args.mysql:
+        db = os.path.join(tmp, "export_bench.sqlite3")
+        start = time.perf_counter()
+        fill(db, args.rows)
+        print(f"filled {args.rows} rows in {time.perf_counter() - start:.1f} s")
+    for mode in ["fetchall", "csv", "parquet"]:
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode, "--db", db], check=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Latency and peak memory of parse_resume on a very long PDF, with and without the page/time limits.
+
+Generates one synthetic resume with --pages pages (300 by default) and parses
+it in a fresh subprocess per mode, so peak RSS is not shared:
+  * unlimited: every page decoded (what parse_resume did before the limits)
+  * limited:   parse_resume's defaults (PDF_MAX_PAGES / PDF_MAX_SECONDS)
+Both modes also report how many skills they found. The skills show up in
+the first pages, so the partial analysis loses little.
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_large_pdf.py --pages 300
+"""
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_mode(mode, path):
+    import resume_parser
+
+    resume_parser.get_nlp()
+    start = time.perf_counter()
+    try:
+        if mode == "unlimited":
+            data = resume_parser.parse_resume(path, max_pages=None, max_seconds=None)
+        else:
+            data = resume_parser.parse_resume(path)
+    except Exception as e:  # e.g. spaCy's 1M-character limit on the full-text NER fallback
+        elapsed = time.perf_counter() - start
+        peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"{mode:9s} {elapsed:7.2f} s  peak RSS {peak_mb:7.1f} MB  FAILED {type(e).__name__}: {str(e)[:60]}")
+        return
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    analysed = data.get("pages_analysed", data["pages"])
+    print(f"{mode:9s} {elapsed:7.2f} s  peak RSS {peak_mb:7.1f} MB  pages {analysed:>4}/{data['pages']:<4} "
+          f"skills {len(data['skills']):>3}  email {data['email']}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    parser.add_argument("--pdf", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.pdf)
+        return
+
+    from resume_corpus import make_resume, pdf_bytes
+    from resume_parser import SECTION_HINTS_GOOD
+
+    page_lines, _ = make_resume(random.Random(1), args.pages, 0.08, list(SECTION_HINTS_GOOD), "us")
+    path = os.path.join(tempfile.mkdtemp(), "long_resume.pdf")
+    with open(path, "wb") as f:
+        f.write(pdf_bytes(page_lines))
+    print(f"{args.pages}-page PDF, {os.path.getsize(path) / 1e6:.1f} MB")
+    for mode in ["unlimited", "limited"]:
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--mode", mode, "--pdf", path], check=False)
+
+
+if __name__ == "__main__":
+    main()
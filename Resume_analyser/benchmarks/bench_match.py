@@ -0,0 +1,153 @@
+"""Query latency of the TF-IDF match index (match_index.py) at 10k, 100k and 1M resumes.
+
+Vectorises a pool of synthetic resume texts, then grows one on-disk index to
+each --sizes step by appending rows sampled from that pool. That gives real
+per-row sizes without running the tokenizer a million times. At every step
+it reports:
+  * rows, stored entries (nnz) and bytes on disk
+  * scan p50: ranking straight off the appended CSR log (no compaction)
+  * compact: time to rewrite the log as posting lists
+  * cold: first query from a fresh MatchIndex, which maps the files and
+    builds the live mask
+  * p50/p95: compacted ranking over the --jds queries
+  * add: one upload's vectorise + append at that size
+At the first step both ranking paths are also checked against a
+brute-force bincount mat-vec.
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_match.py --sizes 10000,100000,1000000
+"""
+import argparse
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import match_index
+from match_index import N_FEATURES, MatchIndex, features, resume_vector
+from resume_corpus import make_resume
+from resume_parser import SECTION_HINTS_GOOD
+
+JDS = [
+    "Backend engineer: python, django, docker, kubernetes, aws, postgresql, redis, ci/cd",
+    "Machine learning engineer with pytorch, tensorflow, pandas and sql experience",
+    "Frontend developer: react, typescript, html, css, figma, accessibility",
+    "Mobile developer (swift, kotlin, flutter) to build our consumer apps",
+    "Data analyst: sql, excel, tableau, statistics, communication",
+]
+
+
+def resume_text(rng):
+    pages, _ = make_resume(rng, rng.randint(1, 2), 0.08, list(SECTION_HINTS_GOOD), "us")
+    return "\n".join(line for page in pages for line in page)
+
+
+def grow(index, pool, start, stop, batch=100000, seed=0):
+    """Append rows [start, stop) sampled from the vectorised pool."""
+    rng = np.random.default_rng(seed + start)
+    lengths = np.array([len(idx) for idx, _ in pool])
+    for lo in range(start, stop, batch):
+        hi = min(stop, lo + batch)
+        pick = rng.integers(0, len(pool), hi - lo)
+        indptr = np.concatenate(([0], np.cumsum(lengths[pick]))).astype(np.int64)
+        indices = np.concatenate([pool[i][0] for i in pick])
+        data = np.concatenate([pool[i][1] for i in pick])
+        ids = np.arange(lo + 1, hi + 1, dtype=np.int64)
+        index.append_csr(ids, ids, indptr, indices, data)  # distinct keys: every row stays live
+
+
+def brute_force(index, jd, k):
+    """Same ranking with a plain bincount mat-vec over the whole log."""
+    n = len(index)
+    indptr, indices, data, ids = index._indptr, index._indices, index._data, np.asarray(index._ids)
+    idx, tf = features(jd)
+    idf = np.log((1.0 + n) / (1.0 + index._df[idx])).astype(np.float32) + 1
+    q = np.zeros(N_FEATURES, dtype=np.float32)
+    q[idx] = tf * idf / np.linalg.norm(tf * idf) * idf
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    scores = np.bincount(rows, weights=data * q[indices], minlength=n).astype(np.float32)
+    order = np.lexsort((-ids, -scores))[:k]
+    return [int(ids[i]) for i in order if scores[i] > 0]
+
+
+def timed_queries(index, k, rounds=3):
+    latency = []
+    for _ in range(rounds):
+        for jd in JDS:
+            t0 = time.perf_counter()
+            index.rank(jd, k)
+            latency.append(time.perf_counter() - t0)
+    return np.asarray(latency) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--pool", type=int, default=2000, help="distinct synthetic resume texts")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--dir", help="index directory (default: a temp dir, removed afterwards)")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    rng = random.Random(11)
+    texts = [resume_text(rng) for _ in range(args.pool)]
+    t0 = time.perf_counter()
+    pool = [resume_vector(t) for t in texts]
+    per_doc = (time.perf_counter() - t0) / len(texts)
+    print(f"pool: {len(pool)} resumes, {np.mean([len(i) for i, _ in pool]):.0f} features each, "
+          f"vectorise {per_doc * 1000:.2f} ms/resume")
+
+    path = args.dir or tempfile.mkdtemp(prefix="match_index_")
+    index = MatchIndex(path)
+    index.clear()
+    print(f"{'rows':>9} {'nnz':>12} {'disk MB':>8} {'scan p50':>9} {'compact s':>10} {'cold ms':>8} "
+          f"{'p50 ms':>7} {'p95 ms':>7} {'add ms':>7} {'RSS MB':>7}")
+    current = 0
+    try:
+        for step, size in enumerate(sizes):
+            grow(index, pool, current, size)
+            current = size
+            scan = timed_queries(index, args.k, rounds=1)
+            if step == 0:
+                scan_ok = sum([i for i, _ in index.rank(jd, args.k)] == brute_force(index, jd, args.k) for jd in JDS)
+
+            t0 = time.perf_counter()
+            index.compact()
+            compact_s = time.perf_counter() - t0
+
+            fresh = MatchIndex(path)
+            t0 = time.perf_counter()
+            fresh.rank(JDS[0], args.k)
+            cold = time.perf_counter() - t0
+            ms = timed_queries(fresh, args.k)
+            if step == 0:
+                compact_ok = sum([i for i, _ in fresh.rank(jd, args.k)] == brute_force(fresh, jd, args.k) for jd in JDS)
+
+            t0 = time.perf_counter()
+            index.add(size + 1, texts[step % len(texts)], f"bench{step}@example.com")
+            add = time.perf_counter() - t0
+            current += 1
+
+            stats = fresh.stats()
+            print(f"{stats['rows']:>9} {stats['nnz']:>12} {stats['bytes'] / 1e6:>8.1f} {np.percentile(scan, 50):>9.1f} "
+                  f"{compact_s:>10.2f} {cold * 1000:>8.1f} {np.percentile(ms, 50):>7.1f} {np.percentile(ms, 95):>7.1f} "
+                  f"{add * 1000:>7.2f} {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:>7.0f}")
+            if step == 0:
+                print(f"          brute-force check: scan {scan_ok}/{len(JDS)}, compacted {compact_ok}/{len(JDS)} "
+                      "rankings identical")
+    finally:
+        if not args.dir:
+            shutil.rmtree(path, ignore_errors=True)
+    print(f"(mat-vec slices of {match_index.CHUNK_NNZ} stored entries)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Precision/recall and latency of the MinHash/LSH near-duplicate check (near_dup.py).
+
+Stores --count synthetic resumes in a NearDupIndex. Then it looks up --queries
+new resumes, half fresh and half edited copies of stored ones. Each copy
+keeps the email, changes it, or drops it (like "Unknown"), and replaces a
+random 0-12% of its words. The truth is the exact Jaccard similarity of the
+shingle sets against the source resume, at or above the threshold. The
+benchmark reports:
+  * precision / recall of NearDupIndex.find(), and recall for pairs well
+    above the threshold (J >= threshold + 0.1)
+  * recall of the old exact Email + JD check on the same queries
+  * signature time, bulk load time, and find() p50/p95 vs a linear scan
+    over every stored signature
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_near_dup.py --count 20000 --queries 1000 --threshold 0.8
+"""
+import argparse
+import os
+import random
+import sys
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from near_dup import NearDupIndex, minhash, shingles
+from resume_corpus import make_resume
+from resume_parser import SECTION_HINTS_GOOD
+
+
+def resume(rng):
+    pages, meta = make_resume(rng, rng.randint(1, 2), 0.08, list(SECTION_HINTS_GOOD), "us")
+    return "\n".join(line for page in pages for line in page), meta["email"]
+
+
+def edit(rng, text, email, rate):
+    """Copy with the same email, another one or none, and `rate` of the words replaced."""
+    new_email = rng.choice([email, "", f"{rng.randint(0, 10**6)}@mail.example"])
+    words = text.replace(email, new_email).split(" ")
+    words = [w if rng.random() >= rate else rng.choice(["lorem", "ipsum", "dolor", "amet"]) for w in words]
+    return " ".join(words), new_email or "unknown"
+
+
+def jaccard(a, b):
+    a, b = set(shingles(a).tolist()), set(shingles(b).tolist())
+    return len(a & b) / len(a | b) if a | b else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=20000, help="stored resumes")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    stored = [resume(rng) for _ in range(args.count)]
+    t0 = time.perf_counter()
+    signatures = [minhash(text) for text, _ in stored]
+    sign_ms = (time.perf_counter() - t0) / len(stored) * 1000
+
+    folder = tempfile.mkdtemp(prefix="near_dup_")
+    index = NearDupIndex(os.path.join(folder, "near_dup.sqlite3"), threshold=args.threshold)
+    t0 = time.perf_counter()
+    index.add_many((i, "Data Scientist", sig) for i, sig in enumerate(signatures))
+    load_s = time.perf_counter() - t0
+    matrix = np.stack(signatures)
+
+    tp = fp = fn = email_hits = positives = clear_hits = clear_total = 0
+    lsh_ms, scan_ms = [], []
+    for q in range(args.queries):
+        if q % 2:
+            text, email = resume(rng)
+            source, score = None, 0.0
+        else:
+            source = rng.randrange(len(stored))
+            text, email = edit(rng, *stored[source], rate=rng.uniform(0, 0.12))
+            score = jaccard(text, stored[source][0])
+        truth, clear = score >= args.threshold, score >= args.threshold + 0.1
+        signature = minhash(text)
+
+        t0 = time.perf_counter()
+        found = {cid for cid, _, _ in index.find(signature, "Data Scientist")}
+        lsh_ms.append((time.perf_counter() - t0) * 1000)
+        t0 = time.perf_counter()
+        np.flatnonzero((matrix == signature).mean(axis=1) >= args.threshold)
+        scan_ms.append((time.perf_counter() - t0) * 1000)
+
+        positives += truth
+        hit = source in found
+        tp += truth and hit
+        fn += truth and not hit
+        clear_total += clear
+        clear_hits += clear and hit
+        fp += len(found - {source}) + (hit and not truth)
+        email_hits += truth and email != "unknown" and email == stored[source][1]
+
+    precision = tp / (tp + fp) if tp + fp else 1.0
+    recall = tp / positives if positives else 1.0
+    print(f"stored {args.count}, queries {args.queries} ({positives} true near-duplicates at J >= {args.threshold}), "
+          f"LSH {index.bands} bands x {index.rows} rows")
+    print(f"MinHash/LSH:        precision {precision:.3f}  recall {recall:.3f}  (tp {tp}, fp {fp}, fn {fn})")
+    print(f"                    recall at J >= {args.threshold + 0.1:.1f}: "
+          f"{clear_hits / clear_total if clear_total else 1.0:.3f} ({clear_total} pairs)")
+    print(f"Email + JD check:   recall {email_hits / positives if positives else 1.0:.3f}")
+    print(f"signature {sign_ms:.2f} ms/resume, bulk load {load_s:.2f} s")
+    print(f"find   p50 {np.percentile(lsh_ms, 50):7.3f} ms  p95 {np.percentile(lsh_ms, 95):7.3f} ms")
+    shutil.rmtree(folder, ignore_errors=True)
+    print(f"scan   p50 {np.percentile(scan_ms, 50):7.3f} ms  p95 {np.percentile(scan_ms, 95):7.3f} ms  "
+          f"(every stored signature)")
+
+
+if __name__ == "__main__":
+    main()
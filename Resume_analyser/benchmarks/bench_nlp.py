@@ -0,0 +1,99 @@
+"""Report worker startup and per-upload NER latency, before and after trimming spaCy.
+
+"before" is the full en_core_web_sm pipeline, loaded when resume_parser is
+imported and run over the whole resume text.
+"after" is the NER-only pipeline from resume_parser.get_nlp() run over the
+header, plus the full-text fallback when the header has no PERSON entity.
+Startup is measured in a fresh interpreter: import resume_parser, then load
+the model (what every worker used to pay at import).
+
+Run from the Resume_analyser folder (optionally pass resume PDFs; without
+them --count synthetic resumes from resume_corpus.py are used):
+    python benchmarks/bench_nlp.py --count 50 [resume.pdf ...]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import spacy
+import resume_parser
+from pdf_extractor import extract_pdf
+from resume_corpus import make_resume
+
+STARTUP_FULL = ("import time; t=time.perf_counter(); import resume_parser, spacy; "
+                "spacy.load(resume_parser.NLP_MODEL); print(time.perf_counter()-t)")
+STARTUP_TRIMMED = ("import time; t=time.perf_counter(); import resume_parser; "
+                   "resume_parser.get_nlp(); print(time.perf_counter()-t)")
+
+
+def synthetic(rng):
+    pages, _ = make_resume(rng, rng.randint(1, 3), 0.08, ["Experience", "Education", "Skills"], "us")
+    return "\n".join(line for page in pages for line in page)
+
+
+def cold_start(code, reps):
+    """Median startup time in a fresh interpreter (seconds)."""
+    times = []
+    for _ in range(reps):
+        out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+        times.append(float(out.stdout.strip().splitlines()[-1]))
+    return sorted(times)[len(times) // 2]
+
+
+def _time(fn, reps):
+    start = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - start) / reps * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pdfs", nargs="*")
+    parser.add_argument("--count", type=int, default=50, help="synthetic resumes when no PDFs are given")
+    parser.add_argument("--reps", type=int, default=3, help="NER runs per resume")
+    parser.add_argument("--starts", type=int, default=5, help="fresh interpreters per startup measurement")
+    args = parser.parse_args()
+
+    if args.pdfs:
+        texts = [extract_pdf(p)["text"] for p in args.pdfs]
+    else:
+        rng = random.Random(3)
+        texts = [synthetic(rng) for _ in range(args.count)]
+
+    full_start = cold_start(STARTUP_FULL, args.starts)
+    trimmed_start = cold_start(STARTUP_TRIMMED, args.starts)
+    print(f"worker startup  before {full_start * 1000:8.1f} ms   after {trimmed_start * 1000:8.1f} ms")
+
+    full_nlp = spacy.load(resume_parser.NLP_MODEL)
+    nlp = resume_parser.get_nlp()
+    # an untrained pipeline with the same components times differently (and finds no names): say which one ran
+    print(f"model           {resume_parser.NLP_MODEL} = {full_nlp.meta['name']} {full_nlp.meta['version']}")
+    print(f"pipeline        before {full_nlp.pipe_names}   after {nlp.pipe_names}")
+
+    before, after, header = [], [], []
+    fallbacks = 0
+    for text in texts:
+        lines = resume_parser._extract_lines(text)
+        head = resume_parser._header_text(lines)
+        before.append(_time(lambda: full_nlp(text), args.reps))
+        after.append(_time(lambda: resume_parser._extract_name(text, lines), args.reps))
+        header.append(_time(lambda: nlp(head), args.reps))
+        fallbacks += resume_parser._name_from_doc(nlp(head)) is None
+    for label, ms in (("before", before), ("after", after), ("  header only", header)):
+        print(f"NER {label:<13} p50 {np.percentile(ms, 50):8.2f} ms   p95 {np.percentile(ms, 95):8.2f} ms   "
+              f"mean {np.mean(ms):8.2f} ms")
+    print(f"full-text fallback on {fallbacks}/{len(texts)} resumes (no PERSON in the header)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Compare the old two-pass PDF decode with the single-pass extractor.
+
+Run from the Resume_analyser folder with one or more PDFs:
+    python benchmarks/bench_pdf_extract.py resume1.pdf resume2.pdf
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdfminer.high_level import extract_text, extract_pages
+from pdf_extractor import extract_pdf, count_pages
+
+
+def two_pass(path):
+    """What parse_resume used to do: extract_text then extract_pages."""
+    return extract_text(path), len(list(extract_pages(path)))
+
+
+def _time(fn, reps=5):
+    start = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - start) / reps * 1000
+
+
+def main(paths):
+    if not paths:
+        print(__doc__)
+        return
+    print(f"{'file':<30} {'pages':>5} {'two-pass ms':>12} {'one-pass ms':>12} {'count ms':>9}")
+    for path in paths:
+        result = extract_pdf(path)
+        text, pages = two_pass(path)
+        assert result["text"] == text and result["pages"] == pages == count_pages(path)
+
+        old_ms = _time(lambda: two_pass(path))
+        new_ms = _time(lambda: extract_pdf(path))
+        count_ms = _time(lambda: count_pages(path))
+        print(f"{os.path.basename(path)[:30]:<30} {pages:>5} {old_ms:>12.1f} {new_ms:>12.1f} {count_ms:>9.2f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
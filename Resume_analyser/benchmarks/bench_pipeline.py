@@ -0,0 +1,166 @@
+"""Per-stage and end-to-end latency of the resume analyser, saved as JSON for comparison.
+
+Times every resume in a corpus through:
+    parse_resume, _skills_from_text, calculate_score, recommend_skills,
+    recommend_courses, and end_to_end (all of them in a row, like /upload)
+It reports p50/p95/p99 and mean latency per stage, throughput and peak RSS.
+It also reports how many names, emails, phones and skills matched the
+corpus manifest.
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_pipeline.py --count 100 --output before.json
+    # ...change resume_parser.py...
+    python benchmarks/bench_pipeline.py --count 100 --output after.json --compare before.json
+
+Without --corpus a corpus is generated (same seed, so runs are comparable).
+Use --corpus DIR to reuse one made by benchmarks/resume_corpus.py.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import resume_parser
+from resume_parser import (parse_resume, _skills_from_text, calculate_score, recommend_skills,
+                           recommend_courses, get_user_level)
+from resume_corpus import generate, parse_range
+
+STAGES = ["parse_resume", "_skills_from_text", "calculate_score", "recommend_skills", "recommend_courses", "end_to_end"]
+
+
+def _timed(fn: Callable[[], Any], samples: List[float]) -> Any:
+    start = time.perf_counter()
+    result = fn()
+    samples.append(time.perf_counter() - start)
+    return result
+
+
+def _digits(value: str) -> str:
+    return "".join(ch for ch in value if ch.isdigit())
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    ms = np.asarray(samples) * 1000
+    return {
+        "n": len(ms),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "mean_ms": float(ms.mean()),
+        "per_second": float(len(ms) / (ms.sum() / 1000)) if ms.sum() else 0.0,
+    }
+
+
+def run(corpus: str, resumes: List[Dict[str, Any]], jd: str, repeat: int) -> Dict[str, Any]:
+    samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    accuracy = {"name": 0, "email": 0, "phone": 0, "skills_recall": 0.0}
+
+    resume_parser.get_nlp()  # model load is a one-off cost, keep it out of the samples
+    wall_start = time.perf_counter()
+    for round_no in range(repeat):
+        for entry in resumes:
+            path = os.path.join(corpus, entry["file"])
+            start = time.perf_counter()
+            data = _timed(lambda: parse_resume(path), samples["parse_resume"])
+            skills = _timed(lambda: _skills_from_text(data["text"]), samples["_skills_from_text"])
+            score = _timed(lambda: calculate_score(data["text"], jd, data["skills"]), samples["calculate_score"])
+            _timed(lambda: recommend_skills(data["skills"], jd), samples["recommend_skills"])
+            _timed(lambda: recommend_courses(data["skills"]), samples["recommend_courses"])
+            get_user_level(score)
+            samples["end_to_end"].append(time.perf_counter() - start)
+
+            if round_no == 0:
+                accuracy["name"] += data["name"] == entry["name"]
+                accuracy["email"] += data["email"] == entry["email"]
+                accuracy["phone"] += _digits(data["mobile"]).endswith(_digits(entry["phone"])[-10:])
+                mentioned = set(entry["skills_mentioned"])
+                accuracy["skills_recall"] += len(mentioned & set(skills)) / len(mentioned) if mentioned else 1.0
+    wall = time.perf_counter() - wall_start
+
+    n = len(resumes)
+    return {
+        "stages": {stage: summarize(values) for stage, values in samples.items()},
+        "throughput_resumes_per_s": n * repeat / wall,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "accuracy": {k: (v / n if n else 0.0) for k, v in accuracy.items()},
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def print_report(result: Dict[str, Any], baseline: Dict[str, Any] = None) -> None:
+    header = f"{'stage':<20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'mean ms':>9}"
+    print(header + ("  p50 vs baseline" if baseline else ""))
+    for stage, s in result["stages"].items():
+        line = f"{stage:<20} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} {s['p99_ms']:>9.3f} {s['mean_ms']:>9.3f}"
+        if baseline and stage in baseline["stages"] and baseline["stages"][stage]["p50_ms"]:
+            change = s["p50_ms"] / baseline["stages"][stage]["p50_ms"] - 1
+            line += f"  {change:+8.1%}"
+        print(line)
+    print(f"throughput: {result['throughput_resumes_per_s']:.1f} resumes/s, peak RSS: {result['peak_rss_mb']:.1f} MB")
+    if baseline:
+        print(f"baseline:   {baseline['throughput_resumes_per_s']:.1f} resumes/s, "
+              f"peak RSS: {baseline['peak_rss_mb']:.1f} MB (commit {baseline['meta']['commit']})")
+    print("accuracy:   " + ", ".join(f"{k} {v:.1%}" for k, v in result["accuracy"].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--corpus", help="directory from resume_corpus.py (default: generate one)")
+    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--pages", default="1-2")
+    parser.add_argument("--skill-density", type=float, default=0.08)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--jd", default="Data Scientist")
+    parser.add_argument("--repeat", type=int, default=1, help="passes over the corpus")
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="earlier --output file to compare against")
+    args = parser.parse_args()
+
+    corpus = args.corpus
+    if not corpus:
+        corpus = tempfile.mkdtemp(prefix="resume_corpus_")
+        generate(corpus, args.count, parse_range(args.pages), args.skill_density, seed=args.seed)
+    with open(os.path.join(corpus, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    result = run(corpus, manifest["resumes"], args.jd, args.repeat)
+    result["meta"] = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "jd": args.jd,
+        "repeat": args.repeat,
+        "corpus": {k: v for k, v in manifest.items() if k != "resumes"},
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(result, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
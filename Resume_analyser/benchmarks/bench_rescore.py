@@ -0,0 +1,78 @@
+"""Bulk re-scoring: calculate_score() per candidate vs the vectorized rescore.py pass.
+
+Builds N synthetic candidates (random skill sets, section hits and JDs) in
+memory and times:
+  * calculate_score + recommend_skills for a sample, one call per candidate
+    (the per-row path is extrapolated to N)
+  * rescore.rescore() over all N candidates: own JD, plus the matrix over the
+    predefined roles
+and checks on the sample that both paths give the same score, level and
+recommendations.
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_rescore.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_parser import (ALL_SWE_SKILLS, SOFT_SKILLS, SECTION_HINTS_GOOD, calculate_score,
+                           get_user_level, recommend_skills)
+from rescore import CandidateSkills, rescore
+
+JDS = ["", "Software Engineer", "Data Scientist", "Web Developer", "Android Developer", "iOS Developer",
+       "UI/UX Designer", "Backend engineer: python, django, docker, kubernetes, aws, postgresql, redis, ci/cd"]
+
+
+def make_candidates(rows: int, seed: int = 7):
+    rng = random.Random(seed)
+    skills = sorted(ALL_SWE_SKILLS | SOFT_SKILLS)
+    out = []
+    for _ in range(rows):
+        out.append((rng.choice(JDS), rng.sample(skills, rng.randint(0, 30)), rng.randint(0, len(SECTION_HINTS_GOOD))))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--sample", type=int, default=20000, help="candidates scored one by one")
+    args = parser.parse_args()
+
+    candidates = make_candidates(args.rows)
+    data = CandidateSkills()
+    for i, (jd, skills, hits) in enumerate(candidates, 1):
+        data.add(i, jd, skills, hits, 0, "")
+    data.freeze()
+
+    sample = candidates[:args.sample]
+    texts = {h: " ".join(SECTION_HINTS_GOOD[:h]) for h in range(len(SECTION_HINTS_GOOD) + 1)}
+    t0 = time.perf_counter()
+    expected = []
+    for jd, skills, hits in sample:
+        score = calculate_score(texts[hits], jd, skills)
+        expected.append((score, get_user_level(score), ", ".join(recommend_skills(skills, jd))))
+    per_row = (time.perf_counter() - t0) / len(sample)
+
+    t0 = time.perf_counter()
+    result = rescore(data)
+    vectorized = time.perf_counter() - t0
+
+    got = [(int(result["scores"][i]), result["levels"][i], result["recommended"][i]) for i in range(len(sample))]
+    mismatches = sum(a != b for a, b in zip(expected, got))
+
+    print(f"candidates: {args.rows}, JDs: {len(result['jds'])}, matrix JDs: {len(result['matrix_jds'])}, "
+          f"vocabulary: {len(data.vocab)}")
+    print(f"per-row calculate_score: {per_row * 1e6:8.1f} us/candidate -> {per_row * args.rows:8.1f} s for all (own JD only)")
+    print(f"vectorized rescore:      {vectorized / args.rows * 1e6:8.1f} us/candidate -> {vectorized:8.1f} s for all (own JD + matrix)")
+    print(f"speedup (own JD only):   {per_row * args.rows / vectorized:8.1f}x")
+    print(f"mismatches on {len(sample)} sampled candidates: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""Scoring one resume against every JD: N separate uploads vs one all-JD request.
+
+For each resume in a synthetic corpus and each of the --jds job descriptions
+(JOB_DESCRIPTIONS plus free-text ones):
+  * per_jd: what N uploads did: parse_resume, calculate_score, recommend_skills
+    and one INSERT + commit per JD
+  * all_jds: what /upload?all_jds=1 and /api/score_all do: one parse_resume,
+    calculate_scores over every JD profile, and one multi-row INSERT + commit
+Rows go to an SQLite user_data table, which stands in for MySQL. The benchmark
+reports the p50/p95 latency per resume and the total time, and checks that
+both paths give the same scores and recommendations.
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_score_all.py --count 30 --jds 6
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import resume_parser
+from resume_parser import (calculate_score, calculate_scores, count_section_hits, get_user_level,
+                           jd_profile, parse_resume, recommend_courses, recommend_skills)
+from resume_corpus import generate
+
+JOB_DESCRIPTIONS = ["Software Engineer", "Data Scientist", "Web Developer", "Android Developer",
+                    "iOS Developer", "UI/UX Designer"]
+CUSTOM_JDS = ["Backend engineer: python, django, docker, kubernetes, aws, postgresql",
+              "ML engineer: pytorch, tensorflow, numpy, pandas, sql",
+              "Frontend developer: react, typescript, html, css, figma"]
+
+COLUMNS = ("Name, Email, Resume_Score, Timestamp, Page_No, Predicted_Field, Job_Description, "
+           "User_Level, Skills, Recommended_Skills, Section_Hits")
+ROW = "(" + ", ".join(["?"] * 11) + ")"
+
+
+def make_db(path):
+    db = sqlite3.connect(path)
+    db.execute(f"CREATE TABLE user_data (ID INTEGER PRIMARY KEY AUTOINCREMENT, {COLUMNS})")
+    db.execute("CREATE INDEX idx_user_data_email ON user_data (Email)")
+    return db
+
+
+def _row(data, jd, score, recommended, field, hits):
+    return (data["name"], data["email"].lower(), score, "2024-01-01 00:00:00", data["pages"], field, jd,
+            get_user_level(score), ", ".join(data["skills"]), ", ".join(recommended), hits)
+
+
+def per_jd(db, path, jds):
+    results = []
+    for jd in jds:  # each upload re-parses the same PDF
+        data = parse_resume(path)
+        score = calculate_score(data["text"], jd, data["skills"])
+        recommended = recommend_skills(data["skills"], jd)
+        field, _ = recommend_courses(data["skills"])
+        db.execute(f"INSERT INTO user_data ({COLUMNS}) VALUES {ROW}",
+                   _row(data, jd, score, recommended, field, count_section_hits(data["text"])))
+        db.commit()
+        results.append((score, recommended))
+    return results
+
+
+def all_jds(db, path, jds):
+    data = parse_resume(path)
+    profiles = [jd_profile(jd) for jd in jds]
+    scores = calculate_scores(data["text"], profiles, data["skills"])
+    field, _ = recommend_courses(data["skills"])
+    hits = count_section_hits(data["text"])
+    results, params = [], []
+    for jd, profile, score in zip(jds, profiles, scores):
+        recommended = recommend_skills(data["skills"], profile)
+        params += _row(data, jd, score, recommended, field, hits)
+        results.append((score, recommended))
+    db.execute(f"INSERT INTO user_data ({COLUMNS}) VALUES " + ", ".join([ROW] * len(jds)), params)
+    db.commit()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=30, help="resumes")
+    parser.add_argument("--jds", type=int, default=len(JOB_DESCRIPTIONS),
+                        help=f"JDs per resume (up to {len(JOB_DESCRIPTIONS) + len(CUSTOM_JDS)})")
+    args = parser.parse_args()
+
+    jds = (JOB_DESCRIPTIONS + CUSTOM_JDS)[:args.jds]
+    corpus = tempfile.mkdtemp(prefix="score_all_corpus_")
+    paths = [os.path.join(corpus, e["file"]) for e in generate(corpus, args.count, pages=(1, 2))]
+    workdir = tempfile.mkdtemp(prefix="score_all_db_")
+
+    resume_parser.get_nlp()  # model load is a one-off cost
+    outputs = {}
+    for mode, fn in [("per_jd", per_jd), ("all_jds", all_jds)]:
+        db = make_db(os.path.join(workdir, mode + ".sqlite3"))
+        latency, outputs[mode] = [], []
+        start = time.perf_counter()
+        for path in paths:
+            t0 = time.perf_counter()
+            outputs[mode].append(fn(db, path, jds))
+            latency.append(time.perf_counter() - t0)
+        total = time.perf_counter() - start
+        rows = db.execute("SELECT COUNT(*) FROM user_data").fetchone()[0]
+        ms = np.asarray(latency) * 1000
+        print(f"{mode:8s} p50 {np.percentile(ms, 50):8.1f} ms  p95 {np.percentile(ms, 95):8.1f} ms  "
+              f"total {total:6.2f} s  rows {rows}")
+        db.close()
+
+    mismatches = sum(a != b for a, b in zip(outputs["per_jd"], outputs["all_jds"]))
+    print(f"{len(paths)} resumes x {len(jds)} JDs, resumes with different results: {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Startup time and per-worker memory of serve.py with 1, 4 and 16 workers, preloaded vs not.
+
+For each --workers count it starts serve.py twice: once with the default
+preload (models loaded once in the parent, gc.freeze before fork) and once
+with --no-preload (every worker loads its own copy). It then reports:
+  * startup: seconds from launch until every worker has logged "ready"
+  * RSS: resident set size of the parent and the average worker
+  * PSS/USS: each worker's proportional share and its private pages
+    (from /proc/<pid>/smaps_rollup). USS is what one more worker really costs.
+  * total PSS: memory of the whole server
+The numbers are taken after --uploads synthetic resume uploads, so the
+workers have actually run the model. Uploads go through /upload, so the
+benchmark writes rows (bench-*@example.com) to the database in .env. Run
+`python App.py migrate` first. Linux only.
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_server.py --workers 1,4,16 --uploads 32
+"""
+import argparse
+import glob
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+import uuid
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from resume_corpus import make_resume, pdf_bytes
+
+SECTIONS = ["Experience", "Education", "Skills", "Projects"]
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def children(pid):
+    found = []
+    for path in glob.glob(f"/proc/{pid}/task/*/children"):
+        with open(path) as f:
+            found += [int(p) for p in f.read().split()]
+    return found
+
+
+def memory_kb(pid):
+    """Rss, Pss and Uss (private clean + dirty) of a process, in kB."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return fields["Rss"], fields["Pss"], fields["Private_Clean"] + fields["Private_Dirty"]
+
+
+def upload(port, pdf, i):
+    boundary = uuid.uuid4().hex
+    body = (f"--{boundary}\r\nContent-Disposition: form-data; name=\"jd_text\"\r\n\r\nSoftware Engineer\r\n"
+            f"--{boundary}\r\nContent-Disposition: form-data; name=\"resume\"; filename=\"bench{i}.pdf\"\r\n"
+            "Content-Type: application/pdf\r\n\r\n").encode() + pdf + f"\r\n--{boundary}--\r\n".encode()
+    request = urllib.request.Request(f"http://127.0.0.1:{port}/upload", data=body, method="POST",
+                                     headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    with urllib.request.urlopen(request, timeout=120) as response:
+        response.read()
+
+
+def resumes(rng, count):
+    """Fresh PDFs with unique emails, so no upload is a parse-cache hit or a duplicate."""
+    pdfs = []
+    for i in range(count):
+        pages, _ = make_resume(rng, 1, 0.08, SECTIONS, "us")
+        pages[0][1] = f"bench-{uuid.uuid4().hex[:12]}@example.com | (415) 555-{1000 + i}"
+        pdfs.append(pdf_bytes(pages))
+    return pdfs
+
+
+def run(workers, preload, pdfs):
+    port = free_port()
+    cmd = [sys.executable, "serve.py", "--workers", str(workers), "--bind", f"127.0.0.1:{port}", "--max-requests", "0"]
+    if not preload:
+        cmd.append("--no-preload")
+    start = time.perf_counter()
+    server = subprocess.Popen(cmd, cwd=ROOT, stderr=subprocess.PIPE, text=True)
+    ready, log = 0, []
+    for line in server.stderr:
+        log.append(line)
+        ready += "ready" in line
+        if ready == workers:
+            break
+    startup = time.perf_counter() - start
+    if ready < workers:
+        raise RuntimeError("server exited before its workers were ready:\n" + "".join(log[-20:]))
+    drain = threading.Thread(target=lambda: [None for _ in server.stderr], daemon=True)
+    drain.start()
+    try:
+        threads = [threading.Thread(target=upload, args=(port, pdf, i)) for i, pdf in enumerate(pdfs)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        parent = memory_kb(server.pid)
+        per_worker = [memory_kb(pid) for pid in children(server.pid)]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=60)
+    rss, pss, uss = (sum(m[i] for m in per_worker) / len(per_worker) for i in range(3))
+    total_pss = parent[1] + sum(m[1] for m in per_worker)
+    return startup, parent[0], rss, pss, uss, total_pss
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,4,16")
+    parser.add_argument("--uploads", type=int, default=32, help="uploads sent before measuring memory")
+    args = parser.parse_args()
+
+    rng = random.Random(9)
+    print(f"{'workers':>7} {'mode':<10} {'startup s':>9} {'parent RSS':>10} {'worker RSS':>10} "
+          f"{'worker PSS':>10} {'worker USS':>10} {'total PSS':>10}  (MB)")
+    for workers in [int(w) for w in args.workers.split(",")]:
+        for preload in (True, False):
+            startup, parent, rss, pss, uss, total = run(workers, preload, resumes(rng, args.uploads))
+            print(f"{workers:>7} {'preload' if preload else 'no-preload':<10} {startup:>9.2f} {parent / 1024:>10.0f} "
+                  f"{rss / 1024:>10.0f} {pss / 1024:>10.0f} {uss / 1024:>10.0f} {total / 1024:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
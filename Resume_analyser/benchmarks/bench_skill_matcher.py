@@ -0,0 +1,80 @@
+"""Time skill extraction per resume as the skill vocabulary grows.
+
+Compares the old per-skill regex loop with the single-pass SkillMatcher.
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_skill_matcher.py
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from resume_parser import ALL_SWE_SKILLS, SOFT_SKILLS, SKILL_VARIATIONS, _normalize
+from skill_matcher import SkillMatcher
+
+VOCAB_SIZES = [150, 1000, 5000, 10000]
+FILLER = ("worked on the team delivering features for customers using modern tools and "
+          "improved performance across services while mentoring junior engineers").split()
+
+
+def legacy_find(text, skills, variations):
+    """The original loop: one regex search per skill and per variation."""
+    text_l = " " + _normalize(text) + " "
+    found = set()
+    for sk in skills:
+        pattern = r"(?<![A-Za-z0-9])" + re.escape(sk) + r"(?![A-Za-z0-9])"
+        if re.search(pattern, text_l, re.IGNORECASE):
+            found.add(sk)
+    for var, canonical in variations.items():
+        pattern = r"(?<![A-Za-z0-9])" + re.escape(var) + r"(?![A-Za-z0-9])"
+        if re.search(pattern, text_l, re.IGNORECASE):
+            found.add(canonical)
+    return found
+
+
+def make_vocab(size, rng):
+    vocab = set(ALL_SWE_SKILLS | SOFT_SKILLS)
+    while len(vocab) < size:
+        vocab.add("%s%d" % (rng.choice(["lib", "tool", "framework ", "platform-"]), rng.randint(0, 10 ** 6)))
+    return vocab
+
+
+def make_resume(vocab, rng, words=700):
+    vocab = sorted(vocab)
+    out = []
+    for _ in range(words):
+        out.append(rng.choice(vocab) if rng.random() < 0.1 else rng.choice(FILLER))
+    return " ".join(out)
+
+
+def _time(fn, reps):
+    start = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - start) / reps * 1000
+
+
+def main():
+    rng = random.Random(42)
+    print(f"{'vocab':>7} {'legacy ms':>10} {'matcher ms':>11} {'build ms':>9} {'speedup':>8}")
+    for size in VOCAB_SIZES:
+        vocab = make_vocab(size, rng)
+        text = make_resume(vocab, rng)
+
+        start = time.perf_counter()
+        matcher = SkillMatcher.from_skills(vocab, SKILL_VARIATIONS)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        assert matcher.find(_normalize(text)) == legacy_find(text, vocab, SKILL_VARIATIONS)
+
+        legacy_ms = _time(lambda: legacy_find(text, vocab, SKILL_VARIATIONS), 3)
+        matcher_ms = _time(lambda: matcher.find(_normalize(text)), 50)
+        print(f"{size:>7} {legacy_ms:>10.2f} {matcher_ms:>11.3f} {build_ms:>9.1f} {legacy_ms / matcher_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Concurrent uploads: save-to-uploads/ round trip vs in-memory (spooled) processing.
+
+Simulates N concurrent /upload requests over a synthetic corpus. Each
+request hashes the file and decodes the PDF, in one of two ways:
+  * disk:   file.save("uploads/<filename>"), extract_pdf(path), os.remove (the old /upload)
+  * memory: parse_cache.spool_upload(...) then extract_pdf(file object) (the new /upload)
+For each mode it reports latency p50/p95, wall time, read/write syscalls
+and bytes from /proc/self/io, and how many uploads got another upload's
+text or failed. That is the filename collision the disk path has when
+browsers all send "resume.pdf".
+
+Run from the Resume_analyser folder:
+    python benchmarks/bench_upload_io.py --uploads 400 --concurrency 8
+"""
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from parse_cache import file_digest, spool_upload
+from pdf_extractor import extract_pdf
+from resume_corpus import generate
+
+
+def io_counters():
+    """syscr/syscw/read_bytes/write_bytes for this process (Linux only)."""
+    try:
+        with open("/proc/self/io") as f:
+            return {k: int(v) for k, v in (line.split(": ") for line in f)}
+    except OSError:
+        return {}
+
+
+def upload_disk(data, filename, folder):
+    file_digest(data)
+    path = os.path.join(folder, filename)
+    with open(path, "wb") as f:  # what FileStorage.save does
+        f.write(data)
+    try:
+        return extract_pdf(path, max_pages=10)["text"]
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def upload_memory(data, filename, folder, spool_bytes):
+    _, upload = spool_upload(io.BytesIO(data), spool_bytes, folder)
+    try:
+        return extract_pdf(upload, max_pages=10)["text"]
+    finally:
+        upload.close()
+
+
+def run(mode, resumes, uploads, concurrency, folder, spool_bytes):
+    def one(i):
+        data, email = resumes[i % len(resumes)]
+        start = time.perf_counter()
+        try:
+            if mode == "disk":
+                text = upload_disk(data, "resume.pdf", folder)
+            else:
+                text = upload_memory(data, "resume.pdf", folder, spool_bytes)
+        except Exception:  # e.g. another upload removed the shared file first
+            text = ""
+        return time.perf_counter() - start, email in text
+
+    before = io_counters()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        results = list(pool.map(one, range(uploads)))
+    wall = time.perf_counter() - start
+    after = io_counters()
+
+    latency = np.array([r[0] for r in results]) * 1000
+    wrong = sum(1 for r in results if not r[1])
+    delta = {k: after[k] - before.get(k, 0) for k in after}
+    print(f"{mode:7s} p50 {np.percentile(latency, 50):7.1f} ms  p95 {np.percentile(latency, 95):7.1f} ms  "
+          f"wall {wall:6.2f} s  syscr {delta.get('syscr', 0):>7}  syscw {delta.get('syscw', 0):>6}  "
+          f"write_bytes {delta.get('write_bytes', 0) / 1e6:6.1f} MB  wrong/failed {wrong}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--uploads", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--resumes", type=int, default=40, help="distinct synthetic resumes")
+    parser.add_argument("--spool-kb", type=int, default=1024)
+    args = parser.parse_args()
+
+    corpus = tempfile.mkdtemp(prefix="upload_corpus_")
+    manifest = generate(corpus, args.resumes, pages=(1, 2))
+    resumes = []
+    for entry in manifest:
+        with open(os.path.join(corpus, entry["file"]), "rb") as f:
+            resumes.append((f.read(), entry["email"]))
+
+    folder = tempfile.mkdtemp(prefix="uploads_")
+    for mode in ["disk", "memory"]:
+        run(mode, resumes, args.uploads, args.concurrency, folder, args.spool_kb * 1024)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+# Columns shown on /admin by default; the large TEXT columns are opt-in
+ADMIN_COLUMNS = ["ID", "Name", "Email", "Resume_Score", "Timestamp", "Page_No",
+                 "Predicted_Field", "Job_Description", "User_Level"]
+SKILL_COLUMNS = ["Skills", "Recommended_Skills"]
+
+USER_LEVELS = ["Beginner", "Intermediate", "Advanced"]
+
+MAX_PAGE_SIZE = 500
+
+
+def filter_clause(jd: str = "", level: str = "", field: str = "") -> Tuple[str, list]:
+    """WHERE conditions (without the WHERE) for the /admin filters."""
+    conditions, params = [], []
+    if jd:
+        conditions.append("Job_Description=%s")
+        params.append(jd)
+    if level:
+        conditions.append("User_Level=%s")
+        params.append(level)
+    if field:
+        conditions.append("Predicted_Field=%s")
+        params.append(field)
+    return " AND ".join(conditions), params
+
+
+def parse_cursor(value: str) -> Optional[Tuple[int, int]]:
+    """Turn a "score:id" page cursor back into a tuple (None if missing/invalid)."""
+    try:
+        score, row_id = value.split(":")
+        return int(score), int(row_id)
+    except (AttributeError, ValueError):
+        return None
+
+
+def admin_page(cursor, jd: str = "", level: str = "", field: str = "",
+               after: Optional[Tuple[int, int]] = None, limit: int = 50,
+               include_skills: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of candidates ordered by Resume_Score DESC, ID DESC.
+
+    Uses keyset pagination: `after` is the (Resume_Score, ID) of the last row
+    on the previous page, so deep pages cost the same as the first one.
+    Returns the rows and the cursor for the next page (None on the last page).
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    columns = ADMIN_COLUMNS + (SKILL_COLUMNS if include_skills else [])
+
+    where, params = filter_clause(jd, level, field)
+    conditions = [where] if where else []
+    if after is not None:
+        # The leading <= gives the index a range to seek into; the OR trims ties on the score
+        conditions.append("Resume_Score <= %s AND (Resume_Score < %s OR ID < %s)")
+        params += [after[0], after[0], after[1]]
+
+    sql = "SELECT " + ", ".join(columns) + " FROM user_data"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY Resume_Score DESC, ID DESC LIMIT %s"
+    cursor.execute(sql, params + [limit + 1])  # one extra row tells us if there is a next page
+
+    rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1]['Resume_Score']}:{rows[-1]['ID']}"
+    return rows, next_cursor
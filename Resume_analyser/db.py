@@ -0,0 +1,199 @@
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional
+
+import pymysql
+from flask import current_app, g
+
+
+def connect_from_env():
+    """Open a MySQL connection using the DB_* variables from .env."""
+    return pymysql.connect(
+        host=os.getenv("DB_HOST"),
+        user=os.getenv("DB_USER"),
+        password=os.getenv("DB_PASSWORD"),
+        database=os.getenv("DB_NAME")
+    )
+
+
+# Secondary indexes on user_data: name -> columns
+USER_DATA_INDEXES = {
+    "idx_user_data_jd_score": "(Job_Description, Resume_Score)",  # /admin JD filter + score order
+    "idx_user_data_score": "(Resume_Score)",  # unfiltered /admin listing
+    "idx_user_data_email": "(Email)",  # duplicate check on upload
+}
+
+
+def init_schema(connection) -> None:
+    """Create the database, tables and indexes if they do not exist."""
+    cursor = connection.cursor()
+    cursor.execute("CREATE DATABASE IF NOT EXISTS cv;")
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS user_data (
+        ID INT AUTO_INCREMENT PRIMARY KEY,
+        Name VARCHAR(255),
+        Email VARCHAR(255),
+        Resume_Score INT,
+        Timestamp VARCHAR(50),
+        Page_No INT,
+        Predicted_Field VARCHAR(255),
+        Job_Description VARCHAR(255),
+        User_Level VARCHAR(50) DEFAULT 'Beginner',
+        Skills TEXT,
+        Recommended_Skills TEXT,
+        Section_Hits INT NULL
+    )
+    """)
+    # Added after the first release; older tables get it here (NULL for existing rows)
+    try:
+        cursor.execute("ALTER TABLE user_data ADD COLUMN Section_Hits INT NULL")
+    except pymysql.err.OperationalError as e:
+        if e.args[0] != 1060:  # 1060 = duplicate column name, already added
+            raise
+    # One row per (candidate, skill); see skill_index.py
+    cursor.execute("""
+    CREATE TABLE IF NOT EXISTS candidate_skill (
+        Kind VARCHAR(20) NOT NULL,
+        Skill VARCHAR(100) NOT NULL,
+        Candidate_ID INT NOT NULL,
+        PRIMARY KEY (Kind, Skill, Candidate_ID),
+        KEY idx_candidate_skill_candidate (Candidate_ID)
+    )
+    """)
+    for name, columns in USER_DATA_INDEXES.items():
+        try:
+            cursor.execute(f"CREATE INDEX {name} ON user_data {columns}")
+        except pymysql.err.OperationalError as e:
+            if e.args[0] != 1061:  # 1061 = duplicate key name, index already exists
+                raise
+    connection.commit()
+
+
+class PoolTimeout(Exception):
+    """No connection became free within the pool timeout."""
+
+
+class ConnectionPool:
+    """A fixed-size pool of DB connections that are checked for health on checkout.
+
+    Connections are created lazily up to `size`. A connection idle for more
+    than `ping_after` seconds is pinged (with reconnect) before it is handed
+    out. If the ping fails, it is replaced with a new connection.
+    """
+
+    def __init__(self, connect: Callable[[], Any], size: int = 5, timeout: float = 10.0,
+                 ping_after: float = 30.0):
+        self.connect = connect
+        self.size = size
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self.checkouts = 0
+        self.reconnects = 0
+
+    def acquire(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                conn, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._create()
+                if conn is not None:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(f"no DB connection free after {self.timeout}s (pool size {self.size})")
+                try:
+                    # Short waits so a slot freed by a discarded connection is noticed
+                    conn, last_used = self._idle.get(timeout=min(remaining, 0.1))
+                except queue.Empty:
+                    continue
+
+            if time.monotonic() - last_used > self.ping_after:
+                conn = self._check(conn)
+            break
+
+        self.checkouts += 1
+        return conn
+
+    def release(self, conn, broken: bool = False) -> None:
+        if broken:
+            self._discard(conn)
+            return
+        try:
+            conn.rollback()  # never hand out a connection with an open transaction
+        except Exception:
+            self._discard(conn)
+            return
+        self._idle.put((conn, time.monotonic()))
+
+    def close(self) -> None:
+        while True:
+            try:
+                conn, _ = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "open": self._created,
+            "idle": self._idle.qsize(),
+            "checkouts": self.checkouts,
+            "reconnects": self.reconnects,
+        }
+
+    def _create(self) -> Optional[Any]:
+        with self._lock:
+            if self._created >= self.size:
+                return None
+            self._created += 1
+        try:
+            return self.connect()
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            raise
+
+    def _check(self, conn):
+        try:
+            conn.ping(reconnect=True)
+            return conn
+        except Exception:
+            self.reconnects += 1
+            self._discard(conn)
+            conn = self._create()
+            if conn is None:
+                raise PoolTimeout("could not replace a dead DB connection")
+            return conn
+
+    def _discard(self, conn) -> None:
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+
+
+def init_app(app, pool: ConnectionPool) -> None:
+    """Return each request's connection to the pool when the app context ends."""
+    app.extensions["db_pool"] = pool
+
+    @app.teardown_appcontext
+    def _release_db(exc):
+        conn = g.pop("db", None)
+        if conn is not None:
+            pool.release(conn, broken=isinstance(exc, pymysql.err.OperationalError))
+
+
+def get_db():
+    """Connection checked out for the current request (one per app context)."""
+    if "db" not in g:
+        g.db = current_app.extensions["db_pool"].acquire()
+    return g.db
@@ -0,0 +1,151 @@
+"""Streaming CSV / Parquet export of user_data.
+
+Rows come off a server-side cursor (pymysql SSCursor) in fixed-size chunks,
+and each chunk is encoded and handed on before the next one is read. Memory
+stays flat whatever the table size. /admin/export streams the same bytes
+over HTTP.
+
+Usage (from the Resume_analyser folder):
+    python export.py candidates.csv
+    python export.py candidates.parquet --jd "Data Scientist" --level Advanced
+
+Parquet needs pyarrow (pip install pyarrow); CSV has no extra dependency.
+"""
+import argparse
+import csv
+import io
+import sys
+from typing import Iterable, Iterator, List, Sequence
+
+from candidate_queries import ADMIN_COLUMNS, SKILL_COLUMNS, filter_clause
+
+EXPORT_COLUMNS = ADMIN_COLUMNS + SKILL_COLUMNS
+EXPORT_FORMATS = {"csv": "text/csv", "parquet": "application/vnd.apache.parquet"}
+EXPORT_CHUNK_ROWS = 5000
+
+_INT_COLUMNS = {"ID", "Resume_Score", "Page_No"}
+
+
+def server_side_cursor(connection):
+    """Unbuffered cursor: rows stay on the server until fetched."""
+    import pymysql.cursors
+    return connection.cursor(pymysql.cursors.SSCursor)
+
+
+def iter_chunks(cursor, jd: str = "", level: str = "", field: str = "",
+                chunk: int = EXPORT_CHUNK_ROWS) -> Iterator[Sequence[tuple]]:
+    """Filtered user_data rows (EXPORT_COLUMNS order, by ID) in lists of up to `chunk`."""
+    where, params = filter_clause(jd, level, field)
+    sql = "SELECT " + ", ".join(EXPORT_COLUMNS) + " FROM user_data"
+    if where:
+        sql += " WHERE " + where
+    cursor.execute(sql + " ORDER BY ID", params)
+    while True:
+        rows = cursor.fetchmany(chunk)
+        if not rows:
+            return
+        yield rows
+
+
+def iter_csv(chunks: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    """Header, then one encoded block of CSV per chunk."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buf.getvalue().encode("utf-8")
+        buf.seek(0)
+        buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands over whatever was written since the last take()."""
+
+    def __init__(self):
+        super().__init__()
+        self._parts: List[bytes] = []
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._parts.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def take(self) -> bytes:
+        data = b"".join(self._parts)
+        self._parts = []
+        return data
+
+
+def iter_parquet(chunks: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    """One Parquet row group per chunk, yielded as soon as it is written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(c, pa.int64() if c in _INT_COLUMNS else pa.string()) for c in EXPORT_COLUMNS])
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for rows in chunks:
+            columns = list(zip(*rows))
+            arrays = [
+                pa.array(col, type=field.type) if field.type == pa.int64()
+                else pa.array([None if v is None else str(v) for v in col], type=pa.string())
+                for col, field in zip(columns, schema)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()  # footer
+
+
+def encode(chunks: Iterable[Sequence[tuple]], fmt: str) -> Iterator[bytes]:
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+    return iter_parquet(chunks) if fmt == "parquet" else iter_csv(chunks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export user_data as CSV or Parquet.")
+    parser.add_argument("output", help="file to write (.csv or .parquet), or - for CSV on stdout")
+    parser.add_argument("--format", choices=sorted(EXPORT_FORMATS), help="default: from the file extension")
+    parser.add_argument("--jd", default="")
+    parser.add_argument("--level", default="")
+    parser.add_argument("--field", default="")
+    parser.add_argument("--chunk", type=int, default=EXPORT_CHUNK_ROWS)
+    args = parser.parse_args(argv)
+    fmt = args.format or ("parquet" if args.output.endswith(".parquet") else "csv")
+
+    from dotenv import load_dotenv
+    from db import connect_from_env
+
+    load_dotenv()
+    connection = connect_from_env()
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        cursor = server_side_cursor(connection)
+        written = 0
+        for block in encode(iter_chunks(cursor, args.jd, args.level, args.field, args.chunk), fmt):
+            out.write(block)
+            written += len(block)
+        cursor.close()
+        print(f"Wrote {written} bytes of {fmt}", file=sys.stderr)
+    finally:
+        if out is not sys.stdout.buffer:
+            out.close()
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+log = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """The job queue is at its pending limit; the caller should retry later."""
+
+
+class Job:
+    def __init__(self, job_id: str, payload: Dict[str, Any], store: Optional["JobStore"] = None):
+        self.id = job_id
+        self.payload = payload
+        self.store = store
+        self.state = "queued"  # queued -> running -> done | failed
+        self.stage = "queued"
+        self.progress = 0
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.queued_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def report(self, stage: str, progress: int) -> None:
+        """Called by the handler as it moves through the pipeline."""
+        self.stage = stage
+        self.progress = progress
+        if self.store is not None:
+            self.store.save(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "job_id": self.id,
+            "state": self.state,
+            "stage": self.stage,
+            "progress": self.progress,
+            "queued_at": self.queued_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.state == "done":
+            data["result"] = self.result
+        if self.state == "failed":
+            data["error"] = self.error
+        return data
+
+
+class JobStore:
+    """Job status in SQLite, so any server worker can answer /status/<job_id> for a job another one runs.
+
+    Keeps the newest keep_finished finished jobs; queued and running ones stay until they finish.
+    """
+
+    def __init__(self, path: str = "jobs.sqlite3", keep_finished: int = 1000):
+        self.path = path
+        self.keep_finished = keep_finished
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)  # shared by the server's worker processes
+        self._db.execute("""
+        CREATE TABLE IF NOT EXISTS upload_job (
+            job_id TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            finished_at REAL
+        )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_upload_job_finished_at ON upload_job (finished_at)")
+        self._db.commit()
+
+    def save(self, job: Job) -> None:
+        blob = json.dumps(job.to_dict(), default=str)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO upload_job (job_id, data, finished_at) VALUES (?, ?, ?)",
+                             (job.id, blob, job.finished_at))
+            if job.finished_at is not None:
+                self._db.execute(
+                    "DELETE FROM upload_job WHERE finished_at <= (SELECT finished_at FROM upload_job"
+                    " WHERE finished_at IS NOT NULL ORDER BY finished_at DESC LIMIT 1 OFFSET ?)",
+                    (self.keep_finished,)
+                )
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute("SELECT data FROM upload_job WHERE job_id=?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def delete(self, job_id: str) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM upload_job WHERE job_id=?", (job_id,))
+            self._db.commit()
+
+
+def _percentile(values, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+class JobQueue:
+    """Background worker threads that run upload jobs off the request thread.
+
+    submit() refuses new work once max_pending jobs are waiting (backpressure).
+    Finished jobs are kept for status lookups, up to keep_finished of them.
+    With a store, every state change is also written there and status() falls
+    back to it for jobs run by other processes.
+    """
+
+    def __init__(self, handler: Callable[[Job], Dict[str, Any]], workers: int = 2,
+                 max_pending: int = 50, keep_finished: int = 1000, store: Optional[JobStore] = None):
+        self.handler = handler
+        self.store = store
+        self.max_pending = max_pending
+        self.keep_finished = keep_finished
+        self._queue: "queue.Queue[Optional[Job]]" = queue.Queue(maxsize=max_pending)
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._wait_times: deque = deque(maxlen=1000)
+        self._run_times: deque = deque(maxlen=1000)
+        self._threads = [
+            threading.Thread(target=self._work, name=f"upload-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    def submit(self, payload: Dict[str, Any]) -> str:
+        job = Job(uuid.uuid4().hex, payload, self.store)
+        with self._lock:
+            self._jobs[job.id] = job
+        if self.store is not None:
+            self.store.save(job)  # before a worker thread can pick it up and save "running"
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+                self.rejected += 1
+            if self.store is not None:
+                self.store.delete(job.id)
+            raise QueueFull(f"{self.max_pending} jobs already waiting")
+        with self._lock:
+            self._trim()
+        return job.id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job as /status/<job_id> reports it, from this process or the store."""
+        job = self.get(job_id)
+        if job is not None:
+            return job.to_dict()
+        return self.store.get(job_id) if self.store is not None else None
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            waits, runs = list(self._wait_times), list(self._run_times)
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_pending": self.max_pending,
+                "running": self._running,
+                "workers": len(self._threads),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "wait_seconds_p50": _percentile(waits, 0.50),
+                "wait_seconds_p95": _percentile(waits, 0.95),
+                "run_seconds_p50": _percentile(runs, 0.50),
+                "run_seconds_p95": _percentile(runs, 0.95),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        for _ in self._threads:
+            self._queue.put(None)
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job.state = "running"
+            job.started_at = time.time()
+            with self._lock:
+                self._running += 1
+            try:
+                if self.store is not None:
+                    self.store.save(job)
+                job.result = self.handler(job)
+                job.state = "done"
+                job.stage = "done"
+                job.progress = 100
+            except Exception as e:
+                job.error = str(e)
+                job.state = "failed"
+                log.exception("Job %s failed", job.id)
+            finally:
+                job.finished_at = time.time()
+                if self.store is not None:
+                    try:
+                        self.store.save(job)
+                    except Exception:
+                        log.exception("Could not store the status of job %s", job.id)
+                with self._lock:
+                    self._running -= 1
+                    if job.state == "done":
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                    self._wait_times.append(job.started_at - job.queued_at)
+                    self._run_times.append(job.finished_at - job.started_at)
+                    self._trim()
+
+    def _trim(self) -> None:
+        # Forget the oldest finished jobs once we hold too many
+        excess = len(self._jobs) - self.keep_finished
+        if excess <= 0:
+            return
+        for job_id in [j.id for j in self._jobs.values() if j.finished_at is not None][:excess]:
+            del self._jobs[job_id]
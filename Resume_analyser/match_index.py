@@ -0,0 +1,431 @@
+"""TF-IDF matching of free-text job descriptions against stored resume texts.
+
+calculate_score only knows the CORE_SKILLS_PER_JOB keys. This index ranks
+every candidate for any pasted JD by text similarity instead.
+
+Each resume becomes a sparse vector of hashed word unigrams and bigrams
+(N_FEATURES buckets, 1 + log(tf), L2-normalised), kept on disk in
+MATCH_INDEX_DIR and memory-mapped for queries:
+  * uploads append their row to a CSR log (indptr / indices / data / ids),
+    so adding a resume costs one small write
+  * compact() rewrites the logged rows column-major (CSC: one posting list
+    per feature). A JD then only reads the postings of its own terms.
+Ranking a JD is one sparse matrix-vector product: postings of the JD terms
+for the compacted rows, plus a scan of the rows logged since. IDF weights
+are applied on the JD side, so stored rows never change when document
+frequencies do.
+
+There is one live vector per email. A newer upload from the same address
+replaces the older one in the ranking. Uploads are indexed with their full
+text. Rows that were never indexed (older data) only have their Skills
+column to go on:
+    python match_index.py backfill              # index user_data rows newer than the index, then compact
+    python match_index.py backfill --rebuild    # start over from user_data
+    python match_index.py compact               # e.g. nightly, once uploads have piled up in the log
+    python match_index.py query "Backend engineer: python, docker, aws" --k 10
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import zlib
+from collections import Counter
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl  # serialises appends between worker processes (not on Windows)
+except ImportError:
+    fcntl = None
+
+N_FEATURES = 1 << 20
+FEATURE_MASK = N_FEATURES - 1
+CHUNK_NNZ = 1 << 22  # stored entries per scan / compaction slice (bounds the temporaries to ~100 MB)
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+STOP_WORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the their this to was were "
+    "will with you your we us i my me".split()
+)
+
+# CSR log file -> dtype; appended in this order, "ids" last, so its length is the committed row count
+FILES = {"indices": np.int32, "data": np.float32, "indptr": np.int64, "keys": np.int64, "ids": np.int64}
+
+
+def features(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    """Sorted hashed unigram + bigram ids of text and their 1 + log(tf) weights."""
+    tokens = [t for t in TOKEN_RE.findall((text or "").lower()) if t not in STOP_WORDS]
+    grams = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    counts = Counter(zlib.crc32(g.encode()) & FEATURE_MASK for g in grams)
+    idx = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+    tf = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+    order = np.argsort(idx)
+    return idx[order], 1 + np.log(tf[order])
+
+
+def resume_vector(text: str) -> Tuple[np.ndarray, np.ndarray]:
+    idx, weights = features(text)
+    norm = np.linalg.norm(weights)
+    return idx, (weights / norm if norm else weights)
+
+
+def email_key(email: Optional[str]) -> int:
+    """Stable 63-bit key per email; 0 (never replaced) when the resume had none."""
+    email = (email or "").strip().lower()
+    if not email or email == "unknown":
+        return 0
+    return int.from_bytes(hashlib.blake2b(email.encode(), digest_size=8).digest(), "little") >> 1 or 1
+
+
+class MatchIndex:
+    """On-disk resume vectors in `path`: compacted CSC part + appended CSR log, memory-mapped for ranking."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get("n_features") != N_FEATURES:
+                raise ValueError(f"{path} was built with {meta.get('n_features')} features, expected {N_FEATURES}; "
+                                 "rebuild it with: python match_index.py backfill --rebuild")
+        else:
+            self._create()
+        self._lock = threading.Lock()
+        self._mapped: Tuple[int, int] = (-1, -1)  # (inode, size) of ids.bin when last mapped
+        self._csc_mapped: Tuple[int, int] = (-1, -1)  # (inode, mtime) of csc.json when last mapped
+        self._n = 0
+        self._live = np.zeros(0, dtype=bool)
+        self._csc_n = 0
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name + ".bin")
+
+    def _create(self) -> None:
+        # New files are swapped in with os.replace, so processes still mapping the old ones are unaffected
+        empty = {name: np.zeros(0, dtype=dtype) for name, dtype in FILES.items()}
+        empty["indptr"] = np.zeros(1, dtype=np.int64)
+        empty["df"] = np.zeros(N_FEATURES, dtype=np.int32)
+        for name, values in empty.items():
+            values.tofile(self._file(name) + ".tmp")
+            os.replace(self._file(name) + ".tmp", self._file(name))
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump({"n_features": N_FEATURES, "version": 1}, f)
+
+    def _committed(self) -> int:
+        return os.path.getsize(self._file("ids")) // 8
+
+    def _map(self, path: str, dtype, count: int) -> np.ndarray:
+        if count == 0:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r", shape=(count,))
+
+    def _refresh(self) -> int:
+        """(Re)map the files if rows were appended or compacted since the last call (also by other processes)."""
+        st = os.stat(self._file("ids"))
+        signature = (st.st_ino, st.st_size)
+        if signature != self._mapped:
+            n = st.st_size // 8
+            if signature[0] != self._mapped[0]:  # first call, or the index was rebuilt
+                self._n = 0
+                self._csc_mapped = (-1, -1)
+            self._indptr = self._map(self._file("indptr"), np.int64, n + 1)
+            nnz = int(self._indptr[n])
+            self._indices = self._map(self._file("indices"), np.int32, nnz)
+            self._data = self._map(self._file("data"), np.float32, nnz)
+            self._ids = self._map(self._file("ids"), np.int64, n)
+            self._keys = self._map(self._file("keys"), np.int64, n)
+            self._df = np.memmap(self._file("df"), dtype=np.int32, mode="r", shape=(N_FEATURES,))
+            old = max(0, min(self._n, n))
+            self._live = _update_live(self._live[:old], self._keys, old, n)
+            self._n = n
+            self._mapped = signature
+        self._refresh_csc()
+        return self._n
+
+    def _refresh_csc(self) -> None:
+        pointer = os.path.join(self.path, "csc.json")
+        try:
+            st = os.stat(pointer)
+        except FileNotFoundError:
+            self._csc_n, self._csc_mapped = 0, (-1, -1)
+            return
+        signature = (st.st_ino, st.st_mtime_ns)
+        if signature == self._csc_mapped:
+            return
+        with open(pointer) as f:
+            csc = json.load(f)
+        self._csc_mapped = signature
+        if csc["ids_inode"] != self._mapped[0]:  # compacted before a rebuild: not these rows
+            self._csc_n = 0
+            return
+        folder = os.path.join(self.path, csc["dir"])
+        self._csc_indptr = self._map(os.path.join(folder, "indptr.bin"), np.int64, N_FEATURES + 1)
+        self._csc_rows = self._map(os.path.join(folder, "rows.bin"), np.int32, csc["nnz"])
+        self._csc_data = self._map(os.path.join(folder, "data.bin"), np.float32, csc["nnz"])
+        self._csc_n = min(csc["rows"], self._n)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._refresh()
+
+    def add(self, candidate_id: int, text: str, email: Optional[str] = None) -> None:
+        """Index one resume (called after its user_data row is committed)."""
+        self.add_many([(candidate_id, text, email)])
+
+    def add_many(self, items: Iterable[Tuple[int, str, Optional[str]]]) -> int:
+        """Index (candidate_id, text, email) tuples with one append; returns how many were added."""
+        ids, keys, rows = [], [], []
+        for candidate_id, text, email in items:
+            ids.append(candidate_id)
+            keys.append(email_key(email))
+            rows.append(resume_vector(text))
+        if not rows:
+            return 0
+        indptr = np.cumsum([0] + [len(idx) for idx, _ in rows], dtype=np.int64)
+        self.append_csr(np.asarray(ids, dtype=np.int64), np.asarray(keys, dtype=np.int64), indptr,
+                        np.concatenate([idx for idx, _ in rows]), np.concatenate([w for _, w in rows]))
+        return len(rows)
+
+    def append_csr(self, ids: np.ndarray, keys: np.ndarray, indptr: np.ndarray,
+                   indices: np.ndarray, data: np.ndarray) -> None:
+        """Append already-vectorised rows (indptr starts at 0) to the log in one go."""
+        with self._lock, open(os.path.join(self.path, "lock"), "w") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            n = self._committed()
+            # Drop whatever an interrupted append left past the last committed row
+            committed_nnz = int(np.fromfile(self._file("indptr"), dtype=np.int64, count=1, offset=8 * n)[0])
+            for name, size in (("indices", 4 * committed_nnz), ("data", 4 * committed_nnz),
+                               ("indptr", 8 * (n + 1)), ("keys", 8 * n)):
+                with open(self._file(name), "r+b") as f:
+                    f.truncate(size)
+
+            for name, values in (("indices", indices), ("data", data),
+                                 ("indptr", indptr[1:] + committed_nnz), ("keys", keys), ("ids", ids)):
+                with open(self._file(name), "ab") as f:
+                    np.ascontiguousarray(values, dtype=FILES[name]).tofile(f)
+
+            df = np.memmap(self._file("df"), dtype=np.int32, mode="r+", shape=(N_FEATURES,))
+            # Features are unique per row, so this counts documents; only the touched pages get written
+            features_seen, counts = np.unique(np.asarray(indices), return_counts=True)
+            df[features_seen] += counts.astype(np.int32)
+            df.flush()
+            del df
+
+    def compact(self) -> int:
+        """Rewrite every logged row column-major (posting list per feature); returns the rows covered.
+
+        Reads committed rows only, so uploads can keep appending meanwhile. The new
+        generation is swapped in through csc.json, and readers pick it up on their next rank().
+        """
+        with self._lock:
+            n = self._refresh()
+            ids_inode = self._mapped[0]
+            indptr, indices, data = self._indptr, self._indices, self._data
+        nnz = int(indptr[n])
+
+        counts = np.zeros(N_FEATURES, dtype=np.int64)
+        for lo in range(0, nnz, CHUNK_NNZ):
+            counts += np.bincount(indices[lo:lo + CHUNK_NNZ], minlength=N_FEATURES)
+        csc_indptr = np.zeros(N_FEATURES + 1, dtype=np.int64)
+        np.cumsum(counts, out=csc_indptr[1:])
+
+        name = f"csc.{n}.{os.getpid()}"
+        folder = os.path.join(self.path, name)
+        shutil.rmtree(folder, ignore_errors=True)
+        os.makedirs(folder)
+        csc_indptr.tofile(os.path.join(folder, "indptr.bin"))
+        if nnz:
+            out_rows = np.memmap(os.path.join(folder, "rows.bin"), dtype=np.int32, mode="w+", shape=(nnz,))
+            out_data = np.memmap(os.path.join(folder, "data.bin"), dtype=np.float32, mode="w+", shape=(nnz,))
+            next_pos = csc_indptr[:-1].copy()
+            # Counting sort by feature, one row slice at a time; rows stay ascending inside each posting list
+            for row, stop in _row_slices(indptr, 0, n):
+                lo, hi = int(indptr[row]), int(indptr[stop])
+                feats = np.asarray(indices[lo:hi])
+                order = np.argsort(feats, kind="stable")
+                feats = feats[order]
+                rank_in_feature = np.arange(len(feats)) - np.searchsorted(feats, feats, side="left")
+                pos = next_pos[feats] + rank_in_feature
+                rows = np.repeat(np.arange(row, stop, dtype=np.int32), np.diff(indptr[row:stop + 1]))
+                out_rows[pos] = rows[order]
+                out_data[pos] = np.asarray(data[lo:hi])[order]
+                seen, seen_counts = np.unique(feats, return_counts=True)
+                next_pos[seen] += seen_counts
+            out_rows.flush()
+            out_data.flush()
+            del out_rows, out_data
+        else:
+            for file_name in ("rows.bin", "data.bin"):
+                open(os.path.join(folder, file_name), "wb").close()
+
+        pointer = os.path.join(self.path, "csc.json")
+        with open(pointer + ".tmp", "w") as f:
+            json.dump({"dir": name, "rows": n, "nnz": nnz, "ids_inode": ids_inode}, f)
+        os.replace(pointer + ".tmp", pointer)
+        for old in os.listdir(self.path):  # open mappings of the old generation stay valid after unlink
+            if old.startswith("csc.") and old != name and os.path.isdir(os.path.join(self.path, old)):
+                shutil.rmtree(os.path.join(self.path, old), ignore_errors=True)
+        return n
+
+    def rank(self, jd_text: str, k: int = 20) -> List[Tuple[int, float]]:
+        """Best k (candidate_id, similarity) for a free-text JD, best first."""
+        with self._lock:
+            n = self._refresh()
+            indptr, indices, data = self._indptr, self._indices, self._data
+            ids, live, df, csc_n = self._ids, self._live, self._df, self._csc_n
+            if csc_n:
+                csc_indptr, csc_rows, csc_data = self._csc_indptr, self._csc_rows, self._csc_data
+        idx, tf = features(jd_text)
+        if n == 0 or len(idx) == 0 or k <= 0:
+            return []
+
+        idf = np.log((1.0 + n) / (1.0 + df[idx])).astype(np.float32) + 1
+        weights = tf * idf
+        weights = weights / np.linalg.norm(weights) * idf  # second idf factor stands in for the document side
+
+        scores = np.zeros(n, dtype=np.float32)
+        if csc_n:
+            # Compacted rows: only the posting lists of the JD's features
+            spans = [(int(csc_indptr[t]), int(csc_indptr[t + 1]), w) for t, w in zip(idx, weights)]
+            spans = [(a, b, w) for a, b, w in spans if b > a]
+            if spans:
+                rows = np.concatenate([csc_rows[a:b] for a, b, _ in spans])
+                values = np.concatenate([w * csc_data[a:b] for a, b, w in spans])
+                scores[:csc_n] = np.bincount(rows, weights=values, minlength=csc_n)[:csc_n]
+        if csc_n < n:
+            # Rows logged since the last compact(): scan them
+            q = np.zeros(N_FEATURES, dtype=np.float32)
+            q[idx] = weights
+            scores[csc_n:] = _csr_dot(indptr, indices, data, q, csc_n, n)
+        scores[~live] = 0
+
+        k = min(k, n)
+        kth = max(np.partition(scores, n - k)[n - k], np.float32(1e-12))
+        top = np.flatnonzero(scores >= kth)  # every row tied with the k-th, so ties break by ID below
+        top = top[np.lexsort((-ids[top], -scores[top]))][:k]
+        return [(int(ids[i]), round(float(scores[i]), 4)) for i in top]
+
+    def max_id(self) -> int:
+        with self._lock:
+            n = self._refresh()
+            return int(self._ids.max()) if n else 0
+
+    def clear(self) -> None:
+        with self._lock:
+            self._create()
+
+    def stats(self) -> dict:
+        with self._lock:
+            n = self._refresh()
+            folders = [f for f in os.listdir(self.path) if f.startswith("csc.")]
+            csc_bytes = sum(os.path.getsize(os.path.join(self.path, d, f))
+                            for d in folders if os.path.isdir(os.path.join(self.path, d))
+                            for f in os.listdir(os.path.join(self.path, d)))
+            return {
+                "rows": n,
+                "live": int(self._live.sum()),
+                "uncompacted_rows": n - self._csc_n,
+                "nnz": int(self._indptr[n]),
+                "bytes": sum(os.path.getsize(self._file(name)) for name in list(FILES) + ["df"]) + csc_bytes,
+            }
+
+
+def _update_live(live: np.ndarray, keys: np.ndarray, old: int, n: int) -> np.ndarray:
+    """Extend the live mask to rows [old, n): the newest row per non-zero key wins."""
+    new = np.asarray(keys[old:n])
+    out = np.ones(n, dtype=bool)
+    out[:old] = live
+    if not len(new):
+        return out
+    unique, last_rev = np.unique(new[::-1], return_index=True)
+    batch = np.zeros(len(new), dtype=bool)
+    batch[len(new) - 1 - last_rev] = True
+    out[old:] = batch | (new == 0)
+    replaced = unique[unique != 0]
+    if old and len(replaced):
+        out[:old] &= ~np.isin(keys[:old], replaced)
+    return out
+
+
+def _row_slices(indptr: np.ndarray, start: int, stop: int):
+    """(row, end) ranges of about CHUNK_NNZ stored entries each."""
+    row = start
+    while row < stop:
+        end = int(np.searchsorted(indptr, indptr[row] + CHUNK_NNZ, side="right")) - 1
+        end = min(stop, max(end, row + 1))
+        yield row, end
+        row = end
+
+
+def _csr_dot(indptr: np.ndarray, indices: np.ndarray, data: np.ndarray, q: np.ndarray,
+             start: int, stop: int) -> np.ndarray:
+    """X[start:stop] @ q over the CSR log, a slice of rows at a time."""
+    scores = np.zeros(stop - start, dtype=np.float32)
+    for row, end in _row_slices(indptr, start, stop):
+        lo, hi = int(indptr[row]), int(indptr[end])
+        prefix = np.zeros(hi - lo + 1, dtype=np.float64)
+        np.cumsum(data[lo:hi] * q[indices[lo:hi]], out=prefix[1:])
+        bounds = np.asarray(indptr[row:end + 1]) - lo
+        scores[row - start:end - start] = prefix[bounds[1:]] - prefix[bounds[:-1]]
+    return scores
+
+
+def backfill(index: MatchIndex, connection, rebuild: bool = False, chunk: int = 5000) -> int:
+    """Index user_data rows newer than the index from their Skills column; returns rows added."""
+    if rebuild:
+        index.clear()
+    cursor = connection.cursor()
+    last_id = index.max_id()
+    done = 0
+    while True:
+        cursor.execute("SELECT ID, Email, Skills FROM user_data WHERE ID > %s ORDER BY ID LIMIT %s", (last_id, chunk))
+        rows = cursor.fetchall()
+        if not rows:
+            return done
+        done += index.add_many((row_id, skills or "", email) for row_id, email, skills in rows)
+        last_id = rows[-1][0]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TF-IDF resume index for free-text job descriptions.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    fill = sub.add_parser("backfill", help="index user_data rows that are not in the index yet, then compact")
+    fill.add_argument("--rebuild", action="store_true", help="clear the index first")
+    sub.add_parser("compact", help="move logged rows into the posting lists")
+    query = sub.add_parser("query", help="rank indexed candidates for a JD")
+    query.add_argument("jd")
+    query.add_argument("--k", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    index = MatchIndex(os.getenv("MATCH_INDEX_DIR", "match_index"))
+    if args.command == "query":
+        for candidate_id, similarity in index.rank(args.jd, args.k):
+            print(f"{candidate_id:>10}  {similarity:.4f}")
+        return 0
+    if args.command == "compact":
+        print(f"Compacted {index.compact()} rows; {index.stats()}")
+        return 0
+
+    from db import connect_from_env
+    connection = connect_from_env()
+    try:
+        added = backfill(index, connection, rebuild=args.rebuild)
+    finally:
+        connection.close()
+    index.compact()
+    print(f"Indexed {added} rows; {index.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
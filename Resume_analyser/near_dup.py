@@ -0,0 +1,253 @@
+"""Near-duplicate resume detection with MinHash + LSH banding.
+
+The Email + JD check misses a resume resubmitted from another address or
+with a small edit, and every resume whose email could not be parsed is
+"Unknown". Here each resume text gets a MinHash signature over its word
+3-shingles (NUM_PERM 32-bit minima). The signature is stored per candidate
+row in a SQLite file, next to one bucket key per LSH band. A lookup only
+reads the rows sharing a bucket with the new resume, and reports those
+whose estimated Jaccard similarity reaches the threshold. The band layout
+is derived from the threshold (see lsh_params). Changing the threshold
+re-buckets the stored signatures on the next start.
+
+Signatures for rows stored before this feature come from resume texts still
+in the parse cache, matched to user_data by Email:
+    python near_dup.py backfill
+"""
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from match_index import TOKEN_RE
+
+NUM_PERM = 128
+SHINGLE_WORDS = 3
+DEFAULT_THRESHOLD = 0.8
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, (1 << 61) - 1, size=NUM_PERM, dtype=np.uint64)
+SHINGLE_CHUNK = 4096  # shingles hashed per step (bounds the shingle x permutation temporary to 4 MB)
+
+
+def shingles(text: str) -> np.ndarray:
+    """Distinct 32-bit hashes of the word SHINGLE_WORDS-grams of text."""
+    tokens = TOKEN_RE.findall((text or "").lower())
+    if len(tokens) < SHINGLE_WORDS:
+        grams = [" ".join(tokens)] if tokens else []
+    else:
+        grams = [" ".join(tokens[i:i + SHINGLE_WORDS]) for i in range(len(tokens) - SHINGLE_WORDS + 1)]
+    hashes = {int.from_bytes(hashlib.blake2b(g.encode(), digest_size=4).digest(), "little") for g in grams}
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """NUM_PERM-value MinHash signature of text (uint32), or None when it has no words."""
+    values = shingles(text)
+    if not len(values):
+        return None
+    signature = np.full(NUM_PERM, _MAX_HASH, dtype=np.uint64)
+    with np.errstate(over="ignore"):  # a * x wraps around in uint64, as in the usual numpy MinHash
+        for lo in range(0, len(values), SHINGLE_CHUNK):
+            chunk = values[lo:lo + SHINGLE_CHUNK, None]
+            hashed = ((chunk * _PERM_A + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+            np.minimum(signature, hashed.min(axis=0), out=signature)
+    return signature.astype(np.uint32)
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two resumes' shingle sets."""
+    return float(np.mean(a == b))
+
+
+def lsh_params(threshold: float, num_perm: int = NUM_PERM) -> Tuple[int, int]:
+    """(bands, rows per band) with the least false positive + false negative area around threshold.
+
+    A pair with Jaccard s shares at least one bucket with probability 1 - (1 - s^rows)^bands.
+    """
+    s = np.linspace(0.0, 1.0, 501)
+    below, above = s < threshold, s >= threshold
+    best, best_error = (1, num_perm), float("inf")
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            p = 1 - (1 - s ** rows) ** bands
+            error = p[below].sum() + (1 - p[above]).sum()
+            if error < best_error:
+                best, best_error = (bands, rows), error
+    return best
+
+
+class NearDupIndex:
+    """MinHash signatures per candidate row plus their LSH buckets, in a SQLite file."""
+
+    def __init__(self, path: str = "near_dup.sqlite3", threshold: float = DEFAULT_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self.bands, self.rows = lsh_params(threshold)
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.flagged = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._db.execute("""
+        CREATE TABLE IF NOT EXISTS near_dup_signature (
+            candidate_id INTEGER PRIMARY KEY,
+            jd TEXT NOT NULL,
+            signature BLOB NOT NULL
+        )
+        """)
+        self._db.execute("CREATE TABLE IF NOT EXISTS near_dup_bucket (bucket INTEGER NOT NULL, candidate_id INTEGER NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_near_dup_bucket ON near_dup_bucket (bucket)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS near_dup_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        layout = json.dumps({"num_perm": NUM_PERM, "shingle_words": SHINGLE_WORDS,
+                             "bands": self.bands, "rows": self.rows})
+        stored = self._db.execute("SELECT value FROM near_dup_meta WHERE key='layout'").fetchone()
+        if stored and stored[0] != layout:
+            self._rebucket(json.loads(stored[0]))
+        self._db.execute("INSERT OR REPLACE INTO near_dup_meta (key, value) VALUES ('layout', ?)", (layout,))
+        self._db.commit()
+
+    def _rebucket(self, old_layout: dict) -> None:
+        """New threshold: bucket the stored signatures again (or drop them if they are not comparable)."""
+        self._db.execute("DELETE FROM near_dup_bucket")
+        if (old_layout.get("num_perm"), old_layout.get("shingle_words")) != (NUM_PERM, SHINGLE_WORDS):
+            self._db.execute("DELETE FROM near_dup_signature")
+            return
+        rows = self._db.execute("SELECT candidate_id, signature FROM near_dup_signature").fetchall()
+        self._db.executemany(
+            "INSERT INTO near_dup_bucket (bucket, candidate_id) VALUES (?, ?)",
+            [(bucket, cid) for cid, blob in rows for bucket in self._buckets(np.frombuffer(blob, dtype=np.uint32))]
+        )
+
+    def _buckets(self, signature: np.ndarray) -> List[int]:
+        """One 64-bit key per band: the band number and its rows, hashed together."""
+        out = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(chunk, digest_size=8, salt=band.to_bytes(16, "little")).digest()
+            out.append(int.from_bytes(digest, "little", signed=True))
+        return out
+
+    def find(self, signature: Optional[np.ndarray], jd: Optional[str] = None) -> List[Tuple[int, str, float]]:
+        """Stored rows at or above the threshold, as (candidate_id, jd, similarity), most similar first.
+
+        With jd, only rows for that job description (case-insensitive, like MySQL).
+        """
+        if signature is None:
+            return []
+        buckets = self._buckets(signature)
+        with self._lock:
+            self.lookups += 1
+            rows = self._db.execute(
+                "SELECT s.candidate_id, s.jd, s.signature FROM near_dup_signature s WHERE s.candidate_id IN "
+                "(SELECT candidate_id FROM near_dup_bucket WHERE bucket IN (" + ", ".join("?" * len(buckets)) + "))",
+                buckets
+            ).fetchall()
+        matches = []
+        for candidate_id, row_jd, blob in rows:
+            if jd is not None and row_jd.lower() != jd.lower():
+                continue
+            score = similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if score >= self.threshold:
+                matches.append((candidate_id, row_jd, score))
+        if matches:
+            with self._lock:
+                self.flagged += 1
+        return sorted(matches, key=lambda m: (-m[2], m[0]))
+
+    def add(self, candidate_id: int, jd: str, signature: Optional[np.ndarray]) -> None:
+        """Store a committed row's signature (no-op for resumes without text)."""
+        self.add_many([(candidate_id, jd, signature)])
+
+    def add_many(self, items: Iterable[Tuple[int, str, Optional[np.ndarray]]]) -> int:
+        """Store (candidate_id, jd, signature) rows in one transaction; returns how many were new."""
+        items = [(cid, jd or "", sig) for cid, jd, sig in items if sig is not None]
+        if not items:
+            return 0
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO near_dup_signature (candidate_id, jd, signature) VALUES (?, ?, ?)",
+                [(cid, jd, sig.tobytes()) for cid, jd, sig in items]
+            )
+            added = self._db.total_changes - before
+            if added:
+                self._db.executemany(
+                    "INSERT INTO near_dup_bucket (bucket, candidate_id) VALUES (?, ?)",
+                    [(bucket, cid) for cid, _, sig in items for bucket in self._buckets(sig)]
+                )
+            self._db.commit()
+        return added
+
+    def stats(self) -> dict:
+        with self._lock:
+            (signatures,) = self._db.execute("SELECT COUNT(*) FROM near_dup_signature").fetchone()
+            return {"signatures": signatures, "bands": self.bands, "rows_per_band": self.rows,
+                    "lookups": self.lookups, "flagged": self.flagged}
+
+
+def backfill(index: NearDupIndex, connection, cache_path: str, chunk: int = 500) -> int:
+    """Signatures for user_data rows whose resume text is still in the parse cache (matched by Email).
+
+    Returns the number of rows added. An email with several cached resumes gets the first one's signature.
+    """
+    cache = sqlite3.connect(cache_path)
+    cursor = connection.cursor()
+    done = 0
+    try:
+        pending = {}
+        for (blob,) in cache.execute("SELECT data FROM parse_cache"):
+            data = json.loads(blob)
+            email = (data.get("email") or "").lower()
+            if email and email != "unknown" and email not in pending:
+                pending[email] = data.get("text", "")
+            if len(pending) >= chunk:
+                done += _backfill_emails(index, cursor, pending)
+                pending = {}
+        if pending:
+            done += _backfill_emails(index, cursor, pending)
+    finally:
+        cache.close()
+    return done
+
+
+def _backfill_emails(index: NearDupIndex, cursor, texts: dict) -> int:
+    cursor.execute(
+        "SELECT ID, Email, Job_Description FROM user_data WHERE Email IN (" + ", ".join(["%s"] * len(texts)) + ")",
+        list(texts)
+    )
+    signatures = {email: minhash(text) for email, text in texts.items()}
+    return index.add_many((row_id, jd, signatures[email.lower()]) for row_id, email, jd in cursor.fetchall())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MinHash/LSH near-duplicate resume index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("backfill", help="sign user_data rows whose resume text is in the parse cache")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from db import connect_from_env
+    load_dotenv()
+    index = NearDupIndex(os.getenv("NEAR_DUP_PATH", "near_dup.sqlite3"),
+                         threshold=float(os.getenv("NEAR_DUP_THRESHOLD", DEFAULT_THRESHOLD)))
+    connection = connect_from_env()
+    try:
+        added = backfill(index, connection, os.getenv("PARSE_CACHE_PATH", "parse_cache.sqlite3"))
+    finally:
+        connection.close()
+    print(f"Signed {added} rows; {index.stats()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import IO, Any, Dict, Optional, Tuple
+
+# Fields of parse_resume() output that do not depend on the job description
+CACHED_FIELDS = ("name", "email", "mobile", "phone_region", "skills", "pages", "text", "truncated", "pages_analysed")
+
+
+def file_digest(data: bytes) -> str:
+    """SHA-256 of the uploaded PDF bytes, used as the cache key."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def spool_upload(stream, max_memory: int, spool_dir: Optional[str] = None,
+                 chunk_size: int = 64 * 1024) -> Tuple[str, IO[bytes]]:
+    """Copy an upload stream into a temp file while hashing it (same digest as file_digest).
+
+    The copy stays in memory up to max_memory bytes. Past that it rolls
+    over to an anonymous, uniquely named file in spool_dir, so concurrent
+    uploads never share a path. Returns (digest, file rewound to 0); the
+    caller closes the file.
+    """
+    digest = hashlib.sha256()
+    spooled = tempfile.SpooledTemporaryFile(max_size=max_memory, dir=spool_dir)
+    for chunk in iter(lambda: stream.read(chunk_size), b""):
+        digest.update(chunk)
+        spooled.write(chunk)
+    spooled.seek(0)
+    return digest.hexdigest(), spooled
+
+
+class ParseCache:
+    """Content-addressed cache of parse_resume() results.
+
+    A bounded in-memory LRU sits in front of a SQLite file. The SQLite
+    store is evicted least-recently-used first once it grows past
+    max_disk_bytes. Its size is kept in the parse_cache_size row, updated
+    with every write, so put() never has to sum the table.
+    """
+
+    def __init__(self, path: str = "parse_cache.sqlite3", memory_items: int = 256,
+                 max_disk_bytes: int = 200 * 1024 * 1024):
+        self.path = path
+        self.memory_items = memory_items
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)  # shared by the server's worker processes
+        self._db.execute("""
+        CREATE TABLE IF NOT EXISTS parse_cache (
+            digest TEXT PRIMARY KEY,
+            data TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            last_used REAL NOT NULL
+        )
+        """)
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_parse_cache_last_used ON parse_cache (last_used)")
+        self._db.execute("""
+        CREATE TABLE IF NOT EXISTS parse_cache_size (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            bytes INTEGER NOT NULL
+        )
+        """)
+        # Summed once, when a cache file from before parse_cache_size is first opened
+        self._db.execute("INSERT OR IGNORE INTO parse_cache_size (id, bytes) SELECT 0, COALESCE(SUM(size), 0) FROM parse_cache")
+        self._db.commit()
+
+    def get(self, digest: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            data = self._memory.get(digest)
+            if data is not None:
+                self._memory.move_to_end(digest)
+                self.hits += 1
+                self.memory_hits += 1
+                return dict(data)
+
+            row = self._db.execute("SELECT data FROM parse_cache WHERE digest=?", (digest,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE parse_cache SET last_used=? WHERE digest=?", (time.time(), digest))
+            self._db.commit()
+            data = json.loads(row[0])
+            self._remember(digest, data)
+            self.hits += 1
+            self.disk_hits += 1
+            return dict(data)
+
+    def put(self, digest: str, resume_data: Dict[str, Any]) -> None:
+        data = {k: resume_data[k] for k in CACHED_FIELDS if k in resume_data}
+        blob = json.dumps(data)
+        with self._lock:
+            self._remember(digest, data)
+            self._db.execute("BEGIN IMMEDIATE")  # other workers write the same file
+            try:
+                row = self._db.execute("SELECT size FROM parse_cache WHERE digest=?", (digest,)).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO parse_cache (digest, data, size, last_used) VALUES (?, ?, ?, ?)",
+                    (digest, blob, len(blob), time.time()),
+                )
+                self._db.execute("UPDATE parse_cache_size SET bytes = bytes + ? WHERE id = 0",
+                                 (len(blob) - (row[0] if row else 0),))
+                self._evict_disk()
+                self._db.commit()
+            except Exception:
+                self._db.rollback()
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            (entries,) = self._db.execute("SELECT COUNT(*) FROM parse_cache").fetchone()
+            (size,) = self._db.execute("SELECT bytes FROM parse_cache_size WHERE id = 0").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": entries,
+                "disk_bytes": size,
+            }
+
+    def _remember(self, digest: str, data: Dict[str, Any]) -> None:
+        self._memory[digest] = data
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, batch: int = 100) -> None:
+        (total,) = self._db.execute("SELECT bytes FROM parse_cache_size WHERE id = 0").fetchone()
+        if total <= self.max_disk_bytes:
+            return
+        # Drop least recently used rows until we are back under the limit, reading only as many as needed
+        while total > self.max_disk_bytes:
+            rows = self._db.execute("SELECT digest, size FROM parse_cache ORDER BY last_used LIMIT ?", (batch,)).fetchall()
+            if not rows:
+                total = 0
+                break
+            evicted = []
+            for digest, size in rows:
+                if total <= self.max_disk_bytes:
+                    break
+                evicted.append((digest,))
+                total -= size
+            self._db.executemany("DELETE FROM parse_cache WHERE digest=?", evicted)
+            for (digest,) in evicted:
+                self._memory.pop(digest, None)
+            self.evictions += len(evicted)
+        self._db.execute("UPDATE parse_cache_size SET bytes = ? WHERE id = 0", (total,))
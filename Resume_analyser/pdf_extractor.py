@@ -0,0 +1,103 @@
+import tempfile
+import time
+from io import BytesIO, StringIO
+from typing import Any, Dict, Iterator, Optional
+
+from pdfminer.converter import TextConverter
+from pdfminer.layout import LAParams
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdftypes import resolve1
+from pdfminer.utils import open_filename
+
+
+def _as_file(pdf_file):
+    """In-memory PDF bytes (bytes, bytearray, memoryview) as a seekable file.
+
+    A SpooledTemporaryFile (spooled uploads) is unwrapped to the BytesIO or temp file
+    it currently holds: pdfminer's open_filename only accepts io.IOBase objects, and
+    SpooledTemporaryFile is one only from Python 3.11.
+    """
+    if isinstance(pdf_file, (bytes, bytearray, memoryview)):
+        return BytesIO(pdf_file)
+    if isinstance(pdf_file, tempfile.SpooledTemporaryFile):
+        return pdf_file._file
+    return pdf_file
+
+
+def iter_page_texts(pdf_file) -> Iterator[str]:
+    """Run pdfminer layout analysis once and yield the text of each page.
+
+    Output matches pdfminer.high_level.extract_text split per page
+    (every page ends with a form feed), so "".join(...) is the full text.
+    pdf_file can be a path, the PDF bytes, or a binary file-like object.
+    """
+    with open_filename(_as_file(pdf_file), "rb") as fp, StringIO() as output:
+        rsrcmgr = PDFResourceManager(caching=True)
+        device = TextConverter(rsrcmgr, output, laparams=LAParams())
+        interpreter = PDFPageInterpreter(rsrcmgr, device)
+
+        for page in PDFPage.get_pages(fp, caching=True):
+            interpreter.process_page(page)
+            yield output.getvalue()
+            # Reset the buffer so each page is only copied once
+            output.seek(0)
+            output.truncate()
+
+
+def extract_pdf(pdf_file, max_pages: Optional[int] = None, max_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Decode a PDF once and return its text, page count and per-page text.
+
+    Stops early after max_pages pages, or once max_seconds have passed (checked
+    between pages, so the first page is always read). "pages" is the number
+    of pages decoded. "total_pages" is the document's page count, and
+    "truncated" says which limit stopped the decode ("pages", "time" or "").
+    """
+    pdf_file = _as_file(pdf_file)
+    deadline = time.monotonic() + max_seconds if max_seconds else None
+    page_texts = []
+    truncated = ""
+    pages = iter_page_texts(pdf_file)
+    try:
+        for text in pages:
+            page_texts.append(text)
+            if max_pages and len(page_texts) >= max_pages:
+                truncated = "pages"
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                truncated = "time"
+                break
+    finally:
+        pages.close()  # release the file and pdfminer state right away
+
+    total_pages = len(page_texts)
+    if truncated:
+        if hasattr(pdf_file, "seek"):
+            pdf_file.seek(0)
+        try:
+            total_pages = max(total_pages, count_pages(pdf_file))
+        except Exception:
+            pass  # no readable page tree; report what was decoded
+        if total_pages == len(page_texts):
+            truncated = ""  # the limit was hit on the last page anyway
+    return {
+        "text": "".join(page_texts),
+        "pages": len(page_texts),
+        "total_pages": total_pages,
+        "truncated": truncated,
+        "page_texts": page_texts,
+    }
+
+
+def count_pages(pdf_file) -> int:
+    """Read the page count from the PDF page tree without any layout analysis."""
+    with open_filename(_as_file(pdf_file), "rb") as fp:
+        doc = PDFDocument(PDFParser(fp))
+        pages = resolve1(doc.catalog.get("Pages"))
+        count = resolve1(pages.get("Count")) if isinstance(pages, dict) else None
+        if isinstance(count, int) and count >= 0:
+            return count
+        # Broken /Count: walk the tree instead (still no layout analysis)
+        return sum(1 for _ in PDFPage.create_pages(doc))
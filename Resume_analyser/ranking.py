@@ -0,0 +1,155 @@
+import bisect
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from candidate_queries import ADMIN_COLUMNS
+
+log = logging.getLogger(__name__)
+
+
+def _key(row: Dict[str, Any]) -> Tuple[int, int]:
+    # Ascending order of this key is Resume_Score DESC, ID DESC (the /admin order)
+    return -(row["Resume_Score"] or 0), -row["ID"]
+
+
+def _jd_key(jd: Optional[str]) -> str:
+    return (jd or "").lower()
+
+
+class TopCandidates:
+    """In-memory best-`capacity` candidates per Job_Description.
+
+    Each JD keeps a list sorted by (Resume_Score DESC, ID DESC), keyed by the
+    lowercased JD because MySQL compares Job_Description case-insensitively
+    ("Data Scientist" and "data scientist" are one list, as in /admin). It is warmed
+    from user_data, then updated by add() after every committed upload, so
+    top() never touches MySQL. Rows written by other processes (other server
+    workers, batch_ingest.py, rescore.py) only show up after the next warm():
+    start_refresh() re-warms every refresh_after seconds (0 = never) on a
+    background thread, so requests keep reading the current lists meanwhile.
+    """
+
+    def __init__(self, capacity: int = 100, refresh_after: float = 0):
+        self.capacity = capacity
+        self.refresh_after = refresh_after
+        self._lock = threading.Lock()
+        self._keys: Dict[str, List[Tuple[int, int]]] = {}
+        self._rows: Dict[str, List[Dict[str, Any]]] = {}
+        self._names: Dict[str, str] = {}  # key -> JD as first stored, for reports
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    def warm(self, connection) -> int:
+        """(Re)load every JD's top rows from user_data; returns the number of rows loaded."""
+        cursor = connection.cursor()
+        cursor.execute("SELECT DISTINCT Job_Description FROM user_data")
+        names: Dict[str, str] = {}
+        for row in cursor.fetchall():
+            names.setdefault(_jd_key(row[0]), row[0] or "")
+
+        keys, rows = {}, {}
+        for jd, name in names.items():
+            # Served by idx_user_data_jd_score: one index range read per JD
+            cursor.execute(
+                "SELECT " + ", ".join(ADMIN_COLUMNS) + " FROM user_data WHERE Job_Description=%s"
+                " ORDER BY Resume_Score DESC, ID DESC LIMIT %s",
+                (name, self.capacity)
+            )
+            rows[jd] = [self._clean(dict(zip(ADMIN_COLUMNS, r))) for r in cursor.fetchall()]
+            keys[jd] = [_key(r) for r in rows[jd]]
+        with self._lock:
+            self._keys, self._rows, self._names = keys, rows, names
+        return sum(len(r) for r in rows.values())
+
+    def start_refresh(self, pool) -> None:
+        """warm() from a `pool` connection every refresh_after seconds until stop_refresh()."""
+        if not self.refresh_after or self._refresher is not None:
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, args=(pool,), name="top-k-refresh", daemon=True)
+        self._refresher.start()
+
+    def stop_refresh(self) -> None:
+        if self._refresher is not None:
+            self._stop.set()
+            self._refresher.join()
+            self._refresher = None
+
+    def _refresh_loop(self, pool) -> None:
+        while not self._stop.wait(self.refresh_after):
+            try:
+                connection = pool.acquire()
+            except Exception:
+                log.exception("Top-K refresh: no DB connection")
+                continue
+            broken = False
+            try:
+                self.warm(connection)
+            except Exception:
+                broken = True  # a failed connection is discarded rather than handed to a request
+                log.exception("Top-K refresh failed")
+            finally:
+                pool.release(connection, broken=broken)
+
+    def add(self, row: Dict[str, Any]) -> None:
+        """Insert a freshly committed user_data row (needs at least ID and Resume_Score)."""
+        row = self._clean(row)
+        jd = _jd_key(row.get("Job_Description"))
+        key = _key(row)
+        with self._lock:
+            self._names.setdefault(jd, row.get("Job_Description") or "")
+            keys = self._keys.setdefault(jd, [])
+            rows = self._rows.setdefault(jd, [])
+            if len(keys) >= self.capacity and key >= keys[-1]:
+                return  # would not make the cut
+            pos = bisect.bisect_left(keys, key)
+            keys.insert(pos, key)
+            rows.insert(pos, row)
+            if len(keys) > self.capacity:
+                keys.pop()
+                rows.pop()
+
+    def top(self, jd: str = "", k: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._rows.get(_jd_key(jd), [])[:max(0, min(k, self.capacity))])
+
+    def compare(self, other: "TopCandidates") -> Dict[str, Any]:
+        """Which JDs rank differently (by Resume_Score and ID) in the two indexes."""
+        with self._lock:
+            mine = {jd: list(keys) for jd, keys in self._keys.items() if keys}
+            names = dict(self._names)
+        with other._lock:
+            theirs = {jd: list(keys) for jd, keys in other._keys.items() if keys}
+            names.update(other._names)
+        mismatched = sorted(names[jd] for jd in mine.keys() | theirs.keys() if mine.get(jd) != theirs.get(jd))
+        return {"consistent": not mismatched, "mismatched_jds": mismatched, "jds": len(theirs)}
+
+    def replace(self, other: "TopCandidates") -> None:
+        with other._lock:
+            keys, rows, names = other._keys, other._rows, other._names
+        with self._lock:
+            self._keys, self._rows, self._names = keys, rows, names
+
+    @staticmethod
+    def _clean(row: Dict[str, Any]) -> Dict[str, Any]:
+        row = {c: row.get(c) for c in ADMIN_COLUMNS}
+        # MySQL hands back datetimes; uploads insert the same value as a string
+        if row["Timestamp"] is not None:
+            row["Timestamp"] = str(row["Timestamp"])
+        return row
+
+
+def verify(index: TopCandidates, connection, repair: bool = True) -> Dict[str, Any]:
+    """Rebuild the index from user_data and compare it with the live one.
+
+    Rows written outside this process (batch_ingest.py, rescore.py) make the
+    live index drift. With repair=True the rebuilt index replaces it.
+    """
+    fresh = TopCandidates(index.capacity)
+    fresh.warm(connection)
+    report = index.compare(fresh)
+    if repair and not report["consistent"]:
+        index.replace(fresh)
+    report["repaired"] = repair and not report["consistent"]
+    return report
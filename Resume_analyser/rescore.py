@@ -0,0 +1,304 @@
+"""Re-score every stored candidate after CORE_SKILLS_PER_JOB or the score weights change.
+
+Usage (from the Resume_analyser folder):
+    python rescore.py             # recompute and write back rows that changed
+    python rescore.py --dry-run   # only report how many rows would change
+
+Skills are loaded once into a sparse (CSR) candidate x skill matrix over the
+canonical vocabulary. Each job description becomes a core mask and a JD
+mask. Per row chunk, each group of rows with the same Job_Description is
+scored against that JD with one matrix product, and every calculate_score
+term is vectorized over the match counts. Custom and free-text JDs make the
+number of distinct JDs unbounded, so the full candidates x JDs matrix is
+only built for the predefined roles (CORE_SKILLS_PER_JOB).
+
+The structure points need the resume text, which user_data does not store.
+Rows inserted before the Section_Hits column existed have that number
+estimated from their stored score on the first run.
+"""
+import argparse
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from resume_parser import (
+    ALL_SWE_SKILLS, SOFT_SKILLS, CORE_SKILLS_PER_JOB, CORE_FOUNDATION_SKILLS, jd_profile,
+    CORE_WEIGHT, OTHER_WEIGHT, NO_JD_POINTS_PER_SKILL, NO_JD_POINTS_CAP,
+    SECTION_POINTS, SECTION_POINTS_CAP, BREADTH_POINTS_PER_SKILL, BREADTH_POINTS_CAP,
+)
+from skill_index import RECOMMENDED, INSERT_SKILL_SQL, split_skills
+
+LEVELS = np.array(["Beginner", "Intermediate", "Advanced"], dtype=object)
+
+
+class CandidateSkills:
+    """Candidates in CSR form: row i has skill ids indices[indptr[i]:indptr[i+1]]."""
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {s: i for i, s in enumerate(sorted(
+            ALL_SWE_SKILLS | SOFT_SKILLS | CORE_FOUNDATION_SKILLS | set().union(*CORE_SKILLS_PER_JOB.values())
+        ))}
+        self.jds: Dict[str, int] = {}
+        self._ids: List[int] = []
+        self._jd: List[int] = []
+        self._hits: List[float] = []
+        self._scores: List[int] = []
+        self._recommended: List[str] = []
+        self._indptr: List[int] = [0]
+        self._indices: List[int] = []
+
+    def add(self, row_id: int, jd: str, skills: List[str], section_hits: Optional[int],
+            score: Optional[int], recommended: Optional[str]) -> None:
+        ids = {self.vocab.setdefault(s.lower(), len(self.vocab)) for s in skills}
+        self._indices.extend(ids)
+        self._indptr.append(len(self._indices))
+        self._ids.append(row_id)
+        self._jd.append(self.jds.setdefault(jd or "", len(self.jds)))
+        self._hits.append(np.nan if section_hits is None else section_hits)
+        self._scores.append(score or 0)
+        self._recommended.append(recommended or "")
+
+    def freeze(self) -> None:
+        """Turn the Python lists into NumPy arrays once loading is finished."""
+        self.ids = np.asarray(self._ids, dtype=np.int64)
+        self.jd = np.asarray(self._jd, dtype=np.int32)
+        self.section_hits = np.asarray(self._hits, dtype=np.float64)
+        self.old_scores = np.asarray(self._scores, dtype=np.int64)
+        self.old_recommended = self._recommended
+        self.indptr = np.asarray(self._indptr, dtype=np.int64)
+        self.indices = np.asarray(self._indices, dtype=np.int32)
+        self.skill_names = sorted(self.vocab, key=self.vocab.get)
+        del self._ids, self._jd, self._hits, self._scores, self._indptr, self._indices
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def dense(self, start: int, stop: int) -> np.ndarray:
+        """Rows [start, stop) as a 0/1 matrix over the vocabulary (float32 counts stay exact)."""
+        lo, hi = self.indptr[start], self.indptr[stop]
+        x = np.zeros((stop - start, len(self.vocab)), dtype=np.float32)
+        rows = np.repeat(np.arange(stop - start), np.diff(self.indptr[start:stop + 1]))
+        x[rows, self.indices[lo:hi]] = 1.0
+        return x
+
+
+def load_candidates(connection, chunk: int = 50000) -> CandidateSkills:
+    """Read ID, JD and skills for every candidate, walking user_data by ID."""
+    data = CandidateSkills()
+    cursor = connection.cursor()
+    last_id = 0
+    while True:
+        cursor.execute(
+            "SELECT ID, Job_Description, Skills, Section_Hits, Resume_Score, Recommended_Skills"
+            " FROM user_data WHERE ID > %s ORDER BY ID LIMIT %s",
+            (last_id, chunk)
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        for row_id, jd, skills, hits, score, recommended in rows:
+            data.add(row_id, jd, split_skills(skills), hits, score, recommended)
+        last_id = rows[-1][0]
+    data.freeze()
+    return data
+
+
+def jd_masks(jds: List[str], vocab: Dict[str, int]) -> Dict[str, np.ndarray]:
+    """Per-JD skill masks and sizes, mirroring calculate_score's core/other split."""
+    v, n = len(vocab), len(jds)
+    core = np.zeros((v, n), dtype=np.float32)
+    jd_all = np.zeros((v, n), dtype=np.float32)
+    n_core = np.ones(n)
+    n_other = np.ones(n)
+    has_skills = np.zeros(n, dtype=bool)
+    for j, jd in enumerate(jds):
+        profile = jd_profile(jd)
+        if not profile.skills:
+            continue
+        has_skills[j] = True
+        n_core[j] = profile.n_core
+        n_other[j] = profile.n_other
+        for s in profile.core:
+            if s in vocab:
+                core[vocab[s], j] = 1.0
+        for s in profile.skills:
+            if s in vocab:
+                jd_all[vocab[s], j] = 1.0
+    return {"core": core, "jd": jd_all, "n_core": n_core, "n_other": n_other, "has_skills": has_skills}
+
+
+def jd_points(x: np.ndarray, masks: Dict[str, np.ndarray]) -> np.ndarray:
+    """JD points for every row of x against every JD (rows x JDs)."""
+    matched_core = (x @ masks["core"]).astype(np.float64)
+    matched_other = (x @ masks["jd"]).astype(np.float64) - matched_core
+    core_score = CORE_WEIGHT * (matched_core / masks["n_core"])
+    other_score = OTHER_WEIGHT * (matched_other / masks["n_other"])
+    with_jd = np.round(core_score + other_score)  # round-half-even, like Python's round()
+
+    n_skills = x.sum(axis=1, keepdims=True, dtype=np.float64)
+    without_jd = np.minimum(NO_JD_POINTS_CAP, n_skills * NO_JD_POINTS_PER_SKILL)
+    return np.where(masks["has_skills"], with_jd, without_jd)
+
+
+def final_scores(points: np.ndarray, n_skills: np.ndarray, section_hits: np.ndarray) -> np.ndarray:
+    """calculate_score's total for every row x JD; int() truncates like np.trunc."""
+    struct_points = np.minimum(SECTION_POINTS_CAP, section_hits * SECTION_POINTS)[:, None]
+    breadth = np.minimum(BREADTH_POINTS_CAP, n_skills * BREADTH_POINTS_PER_SKILL)[:, None]
+    return np.trunc(np.minimum(100, points + struct_points + breadth)).astype(np.int64)
+
+
+def estimate_section_hits(old_scores: np.ndarray, own_points: np.ndarray, n_skills: np.ndarray) -> np.ndarray:
+    """Back out Section_Hits for legacy rows from the stored score and the current weights."""
+    breadth = np.minimum(BREADTH_POINTS_CAP, n_skills * BREADTH_POINTS_PER_SKILL)
+    # int() truncates toward zero: a stored score s came from a total in [s, s + 1) if s > 0, in (s - 1, s]
+    # if s <= 0 (scores can go negative), or anything >= 100 if s == 100. The fewest hits that reach the
+    # bottom of that range give the stored score back; rounding could land on another one.
+    lowest_total = np.where(old_scores > 0, old_scores, old_scores - 1 + 1e-6)
+    struct = lowest_total - own_points - breadth
+    return np.clip(np.ceil(struct / SECTION_POINTS - 1e-9), 0, SECTION_POINTS_CAP // SECTION_POINTS)
+
+
+def recommended_for(x: np.ndarray, jd: str, names: Dict[str, int]) -> List[str]:
+    """recommend_skills() for every row of x (sorted, so the text is stable)."""
+    wanted = list(jd_profile(jd).recommend)
+    if not wanted:
+        return [""] * len(x)
+    have = x[:, [names[s] for s in wanted]].astype(bool)
+    # Encode each row's missing-skill pattern as an int and decode each distinct one once
+    codes = (~have).astype(np.int64) @ (1 << np.arange(len(wanted), dtype=np.int64))
+    uniq, inverse = np.unique(codes, return_inverse=True)
+    decoded = [", ".join([s for b, s in enumerate(wanted) if code >> b & 1][:12]) for code in uniq]
+    return [decoded[i] for i in inverse]
+
+
+def rescore(data: CandidateSkills, chunk: int = 50000,
+            matrix_jds: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Score every candidate against its own JD, and against each of matrix_jds.
+
+    Returns each row's score for its own JD, plus new levels, recommendations
+    and section hits, and the candidates x matrix_jds score matrix (default:
+    the predefined roles).
+    """
+    jds = sorted(data.jds, key=data.jds.get)
+    matrix_jds = list(CORE_SKILLS_PER_JOB) if matrix_jds is None else matrix_jds
+    matrix_masks = jd_masks(matrix_jds, data.vocab)
+    n = len(data)
+    scores = np.zeros(n, dtype=np.int64)
+    matrix = np.zeros((n, len(matrix_jds)), dtype=np.int64)
+    section_hits = data.section_hits.copy()
+    recommended: List[str] = [""] * n
+
+    for start in range(0, n, chunk):
+        stop = min(n, start + chunk)
+        x = data.dense(start, stop)
+        n_skills = x.sum(axis=1, dtype=np.float64)
+        own = data.jd[start:stop]
+        hits = section_hits[start:stop]
+
+        for j in np.unique(own):
+            sel = np.nonzero(own == j)[0]
+            points = jd_points(x[sel], jd_masks([jds[j]], data.vocab))
+            unknown = np.isnan(hits[sel])
+            if unknown.any():
+                hits[sel[unknown]] = estimate_section_hits(
+                    data.old_scores[start + sel[unknown]], points[unknown, 0], n_skills[sel[unknown]]
+                )
+            scores[start + sel] = final_scores(points, n_skills[sel], hits[sel])[:, 0]
+            for i, rec in zip(sel, recommended_for(x[sel], jds[j], data.vocab)):
+                recommended[start + i] = rec
+
+        if matrix_jds:
+            matrix[start:stop] = final_scores(jd_points(x, matrix_masks), n_skills, hits)
+
+    levels = LEVELS[(scores >= 50).astype(int) + (scores >= 80).astype(int)]
+    return {
+        "jds": jds,
+        "matrix_jds": matrix_jds,
+        "matrix": matrix,
+        "scores": scores,
+        "levels": levels,
+        "recommended": recommended,
+        "section_hits": section_hits.astype(np.int64),
+        "estimated_hits": np.isnan(data.section_hits),
+    }
+
+
+def write_back(connection, data: CandidateSkills, result: Dict[str, Any], chunk: int = 5000) -> int:
+    """Write changed rows through a temp table and one UPDATE ... JOIN per chunk."""
+    # recommend_skills() used to return JD skills in set order, so compare them as sets
+    rec_changed = np.array([set(split_skills(a)) != set(split_skills(b))
+                            for a, b in zip(result["recommended"], data.old_recommended)], dtype=bool)
+    changed = np.nonzero((result["scores"] != data.old_scores) | result["estimated_hits"] | rec_changed)[0]
+
+    cursor = connection.cursor()
+    cursor.execute("""
+    CREATE TEMPORARY TABLE IF NOT EXISTS rescore_tmp (
+        ID INT PRIMARY KEY,
+        Resume_Score INT,
+        User_Level VARCHAR(50),
+        Recommended_Skills TEXT,
+        Section_Hits INT
+    )
+    """)
+    for start in range(0, len(changed), chunk):
+        sel = changed[start:start + chunk]
+        cursor.execute("DELETE FROM rescore_tmp")
+        cursor.executemany(
+            "INSERT INTO rescore_tmp (ID, Resume_Score, User_Level, Recommended_Skills, Section_Hits)"
+            " VALUES (%s, %s, %s, %s, %s)",
+            [(int(data.ids[i]), int(result["scores"][i]), result["levels"][i],
+              result["recommended"][i], int(result["section_hits"][i])) for i in sel]
+        )
+        cursor.execute("""
+        UPDATE user_data u JOIN rescore_tmp t ON u.ID = t.ID
+        SET u.Resume_Score = t.Resume_Score, u.User_Level = t.User_Level,
+            u.Recommended_Skills = t.Recommended_Skills, u.Section_Hits = t.Section_Hits
+        """)
+
+        # Keep the recommended rows of candidate_skill in step
+        ids = [int(data.ids[i]) for i in sel]
+        cursor.execute(
+            "DELETE FROM candidate_skill WHERE Kind=%s AND Candidate_ID IN (" + ", ".join(["%s"] * len(ids)) + ")",
+            [RECOMMENDED] + ids
+        )
+        cursor.executemany(INSERT_SKILL_SQL, [
+            (RECOMMENDED, s, int(data.ids[i])) for i in sel for s in split_skills(result["recommended"][i])
+        ])
+        connection.commit()
+    cursor.execute("DROP TEMPORARY TABLE IF EXISTS rescore_tmp")
+    return len(changed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Re-score all candidates with the current scoring config.")
+    parser.add_argument("--dry-run", action="store_true", help="compute only, do not UPDATE")
+    parser.add_argument("--chunk", type=int, default=50000, help="rows per read / compute chunk")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from db import connect_from_env, init_schema
+
+    load_dotenv()
+    connection = connect_from_env()
+    init_schema(connection)
+    try:
+        t0 = time.perf_counter()
+        data = load_candidates(connection, args.chunk)
+        t1 = time.perf_counter()
+        result = rescore(data, args.chunk)
+        t2 = time.perf_counter()
+        changed = int((result["scores"] != data.old_scores).sum())
+        print(f"Loaded {len(data)} candidates in {t1 - t0:.1f}s, scored against {len(result['jds'])} JDs in {t2 - t1:.2f}s")
+        print(f"{changed} scores changed, {int(result['estimated_hits'].sum())} legacy rows had Section_Hits estimated")
+        if not args.dry_run:
+            written = write_back(connection, data, result)
+            print(f"Updated {written} rows in {time.perf_counter() - t2:.1f}s")
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
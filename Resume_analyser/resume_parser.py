@@ -1,11 +1,39 @@
+import functools
+import logging
 import re
-from pdfminer.high_level import extract_text, extract_pages
+import threading
 import spacy
 import phonenumbers  # NEW: For robust phone number parsing
+from skill_matcher import SkillMatcher
+from pdf_extractor import extract_pdf
+from tracing import stage
 from Courses import ds_course, web_course, android_course, ios_course, uiux_course
 
-# Load spaCy model once
-nlp = spacy.load("en_core_web_sm")
+# spaCy model: loaded lazily on first use, with only what NER needs
+NLP_MODEL = "en_core_web_sm"
+NLP_EXCLUDE = ["tagger", "parser", "attribute_ruler", "lemmatizer", "senter"]
+
+# Name NER runs on the resume header first (first N lines, capped in chars)
+NAME_HEADER_LINES = 10
+NAME_HEADER_CHARS = 600
+
+# Extraction limits per resume: name/contact come from the header and skills saturate early
+PDF_MAX_PAGES = 10
+PDF_MAX_SECONDS = 10.0
+
+# Contact details are looked for in the header lines, then the footer lines, then the rest of the text
+CONTACT_HEADER_LINES = 12
+CONTACT_FOOTER_LINES = 6
+PHONE_REGION = "US"  # numbers without a +country code are read as this region's
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+# Lines worth handing to phonenumbers: 7+ digits joined only by runs of phone punctuation, e.g. "(20)-7946"
+# (skips dates, years, amounts)
+PHONE_HINT_RE = re.compile(r"\d(?:[^\S\n]*(?:[-./()\[\]~\u2010-\u2015\u2212][^\S\n]*){0,3}\d){6,}")
+
+_nlp = None
+_nlp_lock = threading.Lock()
+
+log = logging.getLogger(__name__)
 
 # --- Canonical SWE skills (normalized to lowercase) ---
 ALL_SWE_SKILLS = {
@@ -56,6 +84,9 @@ SECTION_HINTS_GOOD = [
     "education", "experience", "projects", "skills", "certifications", "work experience"
 ]
 
+# NEW: Single-pass matcher over every skill + variation, built once at import
+_SKILL_MATCHER = SkillMatcher.from_skills(ALL_SWE_SKILLS | SOFT_SKILLS, SKILL_VARIATIONS)
+
 CORE_SKILLS_PER_JOB = {
     "Software Engineer": {"python","java","c++","git","testing"},
     "Data Scientist": {"python","r","machine learning","deep learning","pandas","numpy","statistics"},
@@ -65,176 +96,252 @@ CORE_SKILLS_PER_JOB = {
     "UI/UX Designer": {"figma","adobe xd","ui","ux","prototyping"}
 }
 
+# calculate_score weights (rescore.py reads these too, so keep them here)
+CORE_WEIGHT = 50           # max points for matching the JD's core skills
+OTHER_WEIGHT = 20          # max points for matching the JD's other skills
+NO_JD_POINTS_PER_SKILL = 3
+NO_JD_POINTS_CAP = 90
+SECTION_POINTS = 5         # per SECTION_HINTS_GOOD header found
+SECTION_POINTS_CAP = 20
+BREADTH_POINTS_PER_SKILL = 0.5
+BREADTH_POINTS_CAP = 10
+
+# Fallback skill suggestions when no JD is selected
+CORE_FOUNDATION_SKILLS = {
+    "git","docker","ci/cd","testing","unit testing","sql","linux",
+    "aws","azure","gcp","rest","graphql","mysql","postgres","mongodb"
+}
+
 def _normalize(text: str) -> str:
     return re.sub(r"\s+", " ", text.lower()).strip()
 
 def _extract_lines(text: str):
     return [ln.strip() for ln in text.splitlines() if ln.strip()]
 
-def parse_resume(file_path):
-
-    """Extract basic info with better name heuristic + skills including soft skills."""
-    text = extract_text(file_path) or ""
-    lines = _extract_lines(text)
-    doc = nlp(text)
-
-    # --- Email & phone ---
-    email_m = re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", text)
-    email = email_m.group() if email_m else "Unknown"
-
-    phone_m = re.search(
-        r"\b(?:\+?\d{1,3}[-.\s]?)?\(?\d{2,4}\)?[-.\s]?\d{3}[-.\s]?\d{3,4}\b", text
-    )
-    mobile = phone_m.group() if phone_m else "Unknown"
-
-    # --- Name heuristic ---
-    name = None
+def get_nlp():
+    """Return the trimmed spaCy pipeline, loading it on the first call."""
+    global _nlp
+    if _nlp is None:
+        with _nlp_lock:
+            if _nlp is None:
+                nlp = spacy.load(NLP_MODEL, exclude=NLP_EXCLUDE)
+                # Drop the shared tok2vec if nothing left in the pipeline listens to it
+                if "tok2vec" in nlp.pipe_names and not nlp.get_pipe("tok2vec").listening_components:
+                    nlp.remove_pipe("tok2vec")
+                _nlp = nlp
+    return _nlp
+
+def _header_text(lines) -> str:
+    return "\n".join(lines[:NAME_HEADER_LINES])[:NAME_HEADER_CHARS]
+
+def _name_from_doc(doc):
     for ent in doc.ents:
         if ent.label_ == "PERSON" and 2 <= len(ent.text.split()) <= 4:
-            name = ent.text.strip()
-            break
-    if not name and lines:
-        first = lines[0]
-        if 1 <= len(first.split()) <= 4 and re.match(r"^[A-Za-z ,.'-]+$", first):
-            name = first.title()
-    """Extract basic info with improved name heuristic + skills including soft skills."""
+            return ent.text.strip().title()
+    return None
+
+def _extract_name(text: str, lines, header_doc=None) -> str:
+    """Name heuristic: NER on the header, then the full text, then the first 5 lines."""
+    header = _header_text(lines)
+    if header_doc is None:
+        with stage("ner"):
+            header_doc = get_nlp()(header)
+    name = _name_from_doc(header_doc)
+    if not name and len(header) < len("\n".join(lines)):
+        with stage("ner_full_text"):
+            name = _name_from_doc(get_nlp()(text))
+    if not name:
+        for line in lines[:5]:  # Check first 5 lines
+            if 1 <= len(line.split()) <= 4 and re.match(r"^[A-Za-z ,.'-]+$", line):
+                name = line.title()
+                break
+    return name or "Unknown"
+
+def _contact_regions(lines):
+    """Header lines, footer lines, then everything in between (each in document order)."""
+    head = lines[:CONTACT_HEADER_LINES]
+    foot_start = max(len(head), len(lines) - CONTACT_FOOTER_LINES)
+    return head, lines[foot_start:], lines[len(head):foot_start]
+
+def _extract_email(lines) -> str:
+    for region in _contact_regions(lines):
+        for line in region:
+            email_m = EMAIL_RE.search(line)
+            if email_m:
+                return email_m.group().lower()
+    return "Unknown"
+
+def _extract_phone(lines, region: str = PHONE_REGION) -> str:
+    """First valid number (E.164). phonenumbers only sees the lines PHONE_HINT_RE finds a digit run in.
+
+    It gets the whole line, so the "+country" prefix and the matcher's own checks on
+    neighbouring text are the same as in a full-text scan.
+    """
+    for part in _contact_regions(lines):
+        for line in part:
+            if not PHONE_HINT_RE.search(line):
+                continue
+            try:
+                for match in phonenumbers.PhoneNumberMatcher(line, region):
+                    return phonenumbers.format_number(match.number, phonenumbers.PhoneNumberFormat.E164)
+            except Exception:
+                pass  # Fallback to "Unknown" if phonenumbers fails
+    return "Unknown"
+
+def parse_resume(file_path, max_pages: int = PDF_MAX_PAGES, max_seconds: float = PDF_MAX_SECONDS,
+                 phone_region: str = PHONE_REGION):
+    """Extract basic info with improved name heuristic + skills including soft skills.
+
+    Only the first max_pages pages (or max_seconds of decoding) are analysed.
+    Longer resumes get a partial analysis with "truncated" set.
+    """
     try:
-        text = extract_text(file_path) or ""
-    except Exception as e:
-        print(f"PDF parsing error: {e}")
+        # NEW: One layout pass gives both the text and the page count
+        with stage("pdf_extract"):
+            extracted = extract_pdf(file_path, max_pages, max_seconds)
+        text = extracted["text"] or ""
+    except Exception:
+        log.exception("PDF parsing failed")
         return {
             "name": "Unknown",
             "email": "Unknown",
             "mobile": "Unknown",
             "skills": [],
             "pages": 0,
-            "text": ""
+            "text": "",
+            "truncated": ""
         }
-    
+    resume_data = parse_resume_text(text, extracted["total_pages"], phone_region=phone_region)
+    resume_data["truncated"] = extracted["truncated"]
+    if extracted["truncated"]:
+        resume_data["pages_analysed"] = extracted["pages"]
+    return resume_data
+
+def parse_resume_text(text: str, pages: int = 0, header_doc=None, phone_region: str = PHONE_REGION):
+    """Analyse already-extracted resume text (contact info, name, skills)."""
     lines = _extract_lines(text)
-    doc = nlp(text)
 
-    # --- Email ---
-    email_m = re.search(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", text)
-    email = email_m.group().lower() if email_m else "Unknown"
+    # --- Email (header, footer, then the rest) ---
+    with stage("email"):
+        email = _extract_email(lines)
 
-    # --- Phone ---
-    mobile = "Unknown"
-    try:
-        for match in phonenumbers.PhoneNumberMatcher(text, "US"):  # Adjust region as needed
-            mobile = phonenumbers.format_number(match.number, phonenumbers.PhoneNumberFormat.E164)
-            break
-    except Exception:
-        pass  # Fallback to "Unknown" if phonenumbers fails
+    # --- Phone (same order; phonenumbers only sees candidate lines) ---
+    with stage("phone"):
+        mobile = _extract_phone(lines, phone_region)
 
-    # --- Name heuristic (check first 5 lines) ---
-    name = None
-    for ent in doc.ents:
-        if ent.label_ == "PERSON" and 2 <= len(ent.text.split()) <= 4:
-            name = ent.text.strip().title()
-            break
-    if not name:
-        for line in lines[:5]:  # Check first 5 lines
-            if 1 <= len(line.split()) <= 4 and re.match(r"^[A-Za-z ,.'-]+$", line):
-                name = line.title()
-                break
-    if not name:
-        name = "Unknown"
+    # --- Name heuristic (header NER first) ---
+    name = _extract_name(text, lines, header_doc)
 
     # --- Skills extraction (SWE + soft skills) ---
-    lower_text = " " + _normalize(text) + " "
-    skills_found = set()
-    for sk in ALL_SWE_SKILLS | SOFT_SKILLS:
-        pattern = r"(?<![A-Za-z0-9])" + re.escape(sk) + r"(?![A-Za-z0-9])"
-        if re.search(pattern, lower_text, re.IGNORECASE):
-            skills_found.add(sk)
-    # Handle variations
-    for var, canonical in SKILL_VARIATIONS.items():
-        pattern = r"(?<![A-Za-z0-9])" + re.escape(var) + r"(?![A-Za-z0-9])"
-        if re.search(pattern, lower_text, re.IGNORECASE):
-            skills_found.add(canonical)
-
-    no_of_pages = len(list(extract_pages(file_path)))
+    with stage("skills"):
+        skills_found = _skills_from_text(text)
 
     return {
         "name": name,
         "email": email,
         "mobile": mobile,
+        "phone_region": phone_region,  # what mobile was read as, so cached parses can be checked against today's
         "skills": sorted(skills_found),
-        "pages": no_of_pages,
+        "pages": pages,
         "text": text
     }
 
 def _skills_from_text(text: str):
     """Extract canonical SWE + soft skills from text."""
-    text_l = " " + _normalize(text) + " "
-    found = set()
-    for sk in ALL_SWE_SKILLS | SOFT_SKILLS:
-        pattern = r"(?<![A-Za-z0-9])" + re.escape(sk) + r"(?![A-Za-z0-9])"
-        if re.search(pattern, text_l, re.IGNORECASE):
-            found.add(sk)
-
-    for var, canonical in SKILL_VARIATIONS.items():
-        pattern = r"(?<![A-Za-z0-9])" + re.escape(var) + r"(?![A-Za-z0-9])"
-        if re.search(pattern, text_l, re.IGNORECASE):
-            found.add(canonical)
-    return found
-
-def calculate_score(resume_text: str, jd_text: str = "", resume_skills=None) -> int:
-    """Improved scoring system with core skill prioritization."""
-    resume_skills = set(map(str.lower, resume_skills or []))
-    jd_skills = _skills_from_text(jd_text) if jd_text else set()
-
-    jd_points = 0
-    if jd_skills:
-        core_skills = {s for s in jd_skills if s in CORE_SKILLS_PER_JOB.get(jd_text, jd_skills)}
-        core_skills = CORE_SKILLS_PER_JOB.get(jd_text, jd_skills)  # Use all JD skills if not predefined
-        matched_core = len(resume_skills & core_skills)
-        matched_other = len(resume_skills & jd_skills) - matched_core
+    return _SKILL_MATCHER.find(_normalize(text))
 
-        core_score = 50 * (matched_core / max(1, len(core_skills)))
-
-        other_score = 30 * (matched_other / max(1, len(jd_skills - core_skills)))
-        jd_points = round(core_score + other_score)
-    else:
-        jd_points = min(80, len(resume_skills) * 4)
-        other_score = 20 * (matched_other / max(1, len(jd_skills - core_skills)))
+def count_section_hits(resume_text: str) -> int:
+    """How many SECTION_HINTS_GOOD headers appear in the resume (stored as Section_Hits)."""
+    lower_resume = _normalize(resume_text)
+    return sum(1 for s in SECTION_HINTS_GOOD if s in lower_resume)
+
+class JDProfile:
+    """What scoring and recommendations need from one job description, computed once.
+
+    skills: canonical skills mentioned in the JD text
+    core: the skills that carry CORE_WEIGHT (CORE_SKILLS_PER_JOB entry, else all JD skills)
+    other: JD skills that are not core (only its size is used in the score)
+    recommend: sorted pool recommend_skills() suggests from
+    """
+    __slots__ = ("text", "skills", "core", "other", "n_core", "n_other", "recommend")
+
+    def __init__(self, jd_text: str = ""):
+        self.text = jd_text
+        self.skills = frozenset(_skills_from_text(jd_text) if jd_text else ())
+        self.core = frozenset(CORE_SKILLS_PER_JOB.get(jd_text, self.skills)) if self.skills else frozenset()
+        self.other = self.skills - self.core
+        self.n_core = max(1, len(self.core))
+        self.n_other = max(1, len(self.other))
+        if jd_text:
+            self.recommend = tuple(sorted(CORE_SKILLS_PER_JOB.get(jd_text, ())))
+        else:
+            self.recommend = tuple(sorted(CORE_FOUNDATION_SKILLS))
+
+    def __repr__(self):
+        return f"JDProfile({self.text!r})"
+
+
+# Free-text JDs seen by jd_profile(); the predefined ones are built below at import
+JD_PROFILE_CACHE_SIZE = 256
+
+@functools.lru_cache(maxsize=JD_PROFILE_CACHE_SIZE)
+def _custom_jd_profile(jd_text: str) -> JDProfile:
+    return JDProfile(jd_text)
+
+_JD_PROFILES = {jd: JDProfile(jd) for jd in [""] + list(CORE_SKILLS_PER_JOB)}
+
+def jd_profile(jd) -> JDProfile:
+    """Profile for a JD string (or pass a JDProfile through)."""
+    if isinstance(jd, JDProfile):
+        return jd
+    jd = jd or ""
+    profile = _JD_PROFILES.get(jd)
+    return profile if profile is not None else _custom_jd_profile(jd)
+
+def _jd_points(profile: JDProfile, resume_skills) -> int:
+    if profile.skills:
+        matched_core = len(resume_skills & profile.core)
+        # Not len(resume_skills & profile.other): a predefined core skill missing from the JD text counts as -1 here
+        matched_other = len(resume_skills & profile.skills) - matched_core
+
+        core_score = CORE_WEIGHT * (matched_core / profile.n_core)
+        other_score = OTHER_WEIGHT * (matched_other / profile.n_other)
         jd_points = round(core_score + other_score)
-        print(f"JD Skills: {jd_skills}, Core: {core_skills}, Matched Core: {matched_core}, Other: {matched_other}")  # Debug
+        log.debug("JD Skills: %s, Core: %s, Matched Core: %s, Other: %s", profile.skills, profile.core, matched_core, matched_other)
     else:
-        jd_points = min(90, len(resume_skills) * 3)  # Adjusted cap
-        print(f"No JD, Skills Count: {len(resume_skills)}, JD Points: {jd_points}")  # Debug
+        jd_points = min(NO_JD_POINTS_CAP, len(resume_skills) * NO_JD_POINTS_PER_SKILL)  # Adjusted cap
+        log.debug("No JD, Skills Count: %s, JD Points: %s", len(resume_skills), jd_points)
+    return jd_points
 
-    lower_resume = _normalize(resume_text)
-    struct_hits = sum(1 for s in SECTION_HINTS_GOOD if s in lower_resume)
-    struct_points = min(20, struct_hits * 5)
+def calculate_score(resume_text: str, jd_text="", resume_skills=None) -> int:
+    """Improved scoring system with core skill prioritization (jd_text: JD string or JDProfile)."""
+    return calculate_scores(resume_text, [jd_text], resume_skills)[0]
 
-    return int(min(100, jd_points + struct_points))
+def calculate_scores(resume_text: str, jds, resume_skills=None):
+    """calculate_score against several JDs; the resume-only parts are computed once."""
+    resume_skills = set(map(str.lower, resume_skills or []))
+
+    struct_hits = count_section_hits(resume_text)
+    struct_points = min(SECTION_POINTS_CAP, struct_hits * SECTION_POINTS)
+    log.debug("Structure Hits: %s, Struct Points: %s", struct_hits, struct_points)
 
-    print(f"Structure Hits: {struct_hits}, Struct Points: {struct_points}")  # Debug
+    skill_breadth = min(BREADTH_POINTS_CAP, len(resume_skills) * BREADTH_POINTS_PER_SKILL)  # NEW: 10% for skill count
+    log.debug("Skill Breadth Points: %s", skill_breadth)
 
-    skill_breadth = min(10, len(resume_skills) * 0.5)  # NEW: 10% for skill count
-    print(f"Skill Breadth Points: {skill_breadth}")  # Debug
+    return [int(min(100, _jd_points(jd_profile(jd), resume_skills) + struct_points + skill_breadth)) for jd in jds]
 
-    return int(min(100, jd_points + struct_points + skill_breadth))
+def get_user_level(score: int) -> str:
+    return "Advanced" if score >= 80 else "Intermediate" if score >= 50 else "Beginner"
 
-def recommend_skills(resume_skills, jd_text: str = ""):
-    """Recommend missing core skills only for the JD."""
+def recommend_skills(resume_skills, jd_text="") -> list:
+    """Recommend missing core skills only for the JD (jd_text: JD string or JDProfile)."""
     resume_skills = set(map(str.lower, resume_skills or []))
-    if jd_text:
-        core_skills = CORE_SKILLS_PER_JOB.get(jd_text, set())
-        missing = list(core_skills - resume_skills)
-        return missing[:12]
-
-    # Fallback suggestions based on current skills
-    suggestions = set()
-    core_foundation = {
-        "git","docker","ci/cd","testing","unit testing","sql","linux",
-        "aws","azure","gcp","rest","graphql","mysql","postgres","mongodb"
-    }
-    suggestions |= core_foundation
-    suggestions -= resume_skills
-    return list(sorted(suggestions))[:12]
+    # With a JD: its CORE_SKILLS_PER_JOB entry; without: CORE_FOUNDATION_SKILLS
+    return [s for s in jd_profile(jd_text).recommend if s not in resume_skills][:12]
+
+# Every field recommend_courses() can return (used for the /admin filter)
+PREDICTED_FIELDS = ["Data Science", "Web Development", "Android Development",
+                    "iOS Development", "UI/UX Design", "Software Engineering"]
 
 def recommend_courses(skills):
     sk = {s.lower() for s in skills}
@@ -257,5 +364,4 @@ def recommend_courses(skills):
         return "UI/UX Design", uiux_course
     else:
         return "Software Engineering", web_course
-        return "Software Engineering", web_course
 
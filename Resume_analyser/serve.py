@@ -0,0 +1,108 @@
+"""Production server: pre-fork gunicorn workers sharing one preloaded copy of the parsing models.
+
+The parent imports App and loads the spaCy model, skill tables, JD profiles and
+course lists once (App.preload). Garbage collection stays off while it does,
+and gc.freeze() runs before every fork, so the workers share those pages
+copy-on-write instead of each loading its own copy. Every worker then opens its
+own DB pool, SQLite stores, match index and upload threads (App.open_resources).
+Async job status and /metrics go through SQLite files all workers share, so any
+worker can answer them; each worker re-reads /api/top's ranking from MySQL every
+TOP_K_REFRESH seconds on a background thread.
+
+A worker is recycled after --max-requests requests (plus up to --max-requests-jitter,
+so they do not all restart at once). It stops accepting requests, finishes the
+ones in flight and its queued async uploads (within --graceful-timeout), then
+the parent forks a fresh one. SIGTERM stops the server the same way, and SIGHUP
+recycles every worker.
+
+Linux/macOS only (gunicorn does not run on Windows; use python App.py there):
+    python App.py migrate
+    python serve.py --workers 4 --bind 0.0.0.0:8000
+"""
+import argparse
+import gc
+import os
+import sys
+
+from dotenv import load_dotenv
+from gunicorn.app.base import BaseApplication
+
+
+def when_ready(server):
+    # Runs in the parent after load() and before the first fork. Freeze what preload built, then let the
+    # parent collect again: it keeps running (and allocating) for as long as the server does.
+    gc.freeze()
+    gc.enable()
+    server.log.info("Parsing models preloaded; forking %s workers", server.num_workers)
+
+
+def pre_fork(server, worker):
+    # Move everything allocated so far to the permanent generation: the workers' collections never touch
+    # (and so never copy) those pages. Respawned workers get whatever the parent allocated since.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    import App
+    App.open_resources()
+    server.log.info("Worker %s ready", worker.pid)
+
+
+def worker_exit(server, worker):
+    import App
+    App.close_resources()
+
+
+class Server(BaseApplication):
+    """gunicorn application that serves App.app with the hooks above."""
+
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+        for hook in (when_ready, pre_fork, post_fork, worker_exit):
+            self.cfg.set(hook.__name__, hook)
+
+    def load(self):
+        if self.cfg.preload_app:
+            gc.disable()  # no collections while the shared state is built: fewer freed holes in its pages
+        import App
+        App.preload()
+        return App.create_app(resources=False)
+
+
+def main(argv=None):
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Pre-fork production server for the resume analyser.")
+    parser.add_argument("--bind", default=os.getenv("WEB_BIND", "127.0.0.1:8000"))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", os.cpu_count() or 1)))
+    parser.add_argument("--threads", type=int, default=int(os.getenv("WEB_THREADS", "1")),
+                        help="request threads per worker (more than 1 uses gunicorn's gthread worker)")
+    parser.add_argument("--max-requests", type=int, default=int(os.getenv("WEB_MAX_REQUESTS", "1000")),
+                        help="recycle a worker after this many requests (0 = never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.getenv("WEB_MAX_REQUESTS_JITTER", "100")))
+    parser.add_argument("--timeout", type=int, default=int(os.getenv("WEB_TIMEOUT", "60")),
+                        help="restart a worker stuck on one request this long (seconds)")
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.getenv("WEB_GRACEFUL_TIMEOUT", "30")))
+    parser.add_argument("--no-preload", action="store_true",
+                        help="load the models in every worker instead of sharing the parent's copy")
+    args = parser.parse_args(argv)
+
+    Server({
+        "bind": args.bind,
+        "workers": args.workers,
+        "threads": args.threads,
+        "max_requests": args.max_requests,
+        "max_requests_jitter": args.max_requests_jitter,
+        "timeout": args.timeout,
+        "graceful_timeout": args.graceful_timeout,
+        "preload_app": not args.no_preload,
+    }).run()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""Normalized candidate skills (candidate_skill junction table).
+
+user_data keeps Skills / Recommended_Skills as comma-joined TEXT for display.
+Every skill is also written here as its own row, so "who knows docker and
+kubernetes" is an index lookup instead of a LIKE scan over every candidate.
+
+Backfill existing rows (safe to re-run):
+    python skill_index.py backfill
+"""
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from candidate_queries import ADMIN_COLUMNS, MAX_PAGE_SIZE
+from resume_parser import SKILL_VARIATIONS
+
+HAS = "has"
+RECOMMENDED = "recommended"
+
+INSERT_SKILL_SQL = "INSERT IGNORE INTO candidate_skill (Kind, Skill, Candidate_ID) VALUES (%s, %s, %s)"
+
+
+def normalize_skill(skill: str) -> str:
+    skill = " ".join(skill.lower().split())
+    return SKILL_VARIATIONS.get(skill, skill)
+
+
+def split_skills(text: Optional[str]) -> List[str]:
+    """Inverse of ", ".join(skills) as stored in user_data."""
+    return [s.strip() for s in (text or "").split(",") if s.strip()]
+
+
+def add_candidate_skills(cursor, candidate_id: int, skills: Iterable[str],
+                         recommended: Iterable[str] = ()) -> None:
+    """Index one candidate's skills (called right after its user_data INSERT)."""
+    rows = [(HAS, s, candidate_id) for s in set(skills)]
+    rows += [(RECOMMENDED, s, candidate_id) for s in set(recommended)]
+    if rows:
+        cursor.executemany(INSERT_SKILL_SQL, rows)
+
+
+def backfill(connection, start_id: int = 0, chunk: int = 1000) -> int:
+    """Index the TEXT skill columns of every user_data row with ID >= start_id.
+
+    Walks the table in ID order, one chunk at a time, and commits per chunk.
+    INSERT IGNORE makes re-running it harmless. Returns the number of rows read.
+    """
+    cursor = connection.cursor()
+    last_id = start_id - 1
+    done = 0
+    while True:
+        cursor.execute(
+            "SELECT ID, Skills, Recommended_Skills FROM user_data WHERE ID > %s ORDER BY ID LIMIT %s",
+            (last_id, chunk)
+        )
+        batch = cursor.fetchall()
+        if not batch:
+            return done
+        rows = []
+        for row_id, skills, recommended in batch:
+            rows += [(HAS, s, row_id) for s in set(split_skills(skills))]
+            rows += [(RECOMMENDED, s, row_id) for s in set(split_skills(recommended))]
+        if rows:
+            cursor.executemany(INSERT_SKILL_SQL, rows)
+        connection.commit()
+        done += len(batch)
+        last_id = batch[-1][0]
+
+
+def candidates_with_skills(cursor, skills: Iterable[str], match: str = "all", jd: str = "",
+                           after: Optional[Tuple[int, int]] = None,
+                           limit: int = 50) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Candidates having all (match="all") or any (match="any") of the skills.
+
+    Ranked by Resume_Score DESC, ID DESC with the same keyset cursor as /admin.
+    """
+    wanted = sorted({normalize_skill(s) for s in skills if s.strip()})
+    if not wanted:
+        return [], None
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    needed = len(wanted) if match == "all" else 1
+
+    sql = (
+        "SELECT " + ", ".join("u." + c for c in ADMIN_COLUMNS) + " FROM user_data u"
+        " JOIN (SELECT Candidate_ID FROM candidate_skill"
+        "       WHERE Kind=%s AND Skill IN (" + ", ".join(["%s"] * len(wanted)) + ")"
+        "       GROUP BY Candidate_ID HAVING COUNT(*) >= %s) m ON m.Candidate_ID = u.ID"
+    )
+    params: list = [HAS] + wanted + [needed]
+    conditions = []
+    if jd:
+        conditions.append("u.Job_Description=%s")
+        params.append(jd)
+    if after is not None:
+        conditions.append("u.Resume_Score <= %s AND (u.Resume_Score < %s OR u.ID < %s)")
+        params += [after[0], after[0], after[1]]
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY u.Resume_Score DESC, u.ID DESC LIMIT %s"
+    cursor.execute(sql, params + [limit + 1])
+
+    rows = [dict(zip(ADMIN_COLUMNS, row)) for row in cursor.fetchall()]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1]['Resume_Score']}:{rows[-1]['ID']}"
+    return rows, next_cursor
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        print(__doc__)
+        sys.exit(1)
+    from dotenv import load_dotenv
+    from db import connect_from_env, init_schema
+
+    load_dotenv()
+    conn = connect_from_env()
+    init_schema(conn)
+    print(f"Indexed skills for {backfill(conn)} candidates")
+    conn.close()
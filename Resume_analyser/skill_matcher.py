@@ -0,0 +1,64 @@
+import re
+from typing import Dict, Iterable, Mapping, Optional, Set, Tuple
+
+# Characters that count as part of a word when checking skill boundaries
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+
+# re.IGNORECASE lets "i" and "s" match these, so fold them to keep the same results
+_CASE_FOLD = str.maketrans({"ı": "i", "ſ": "s"})
+
+_END = ""  # trie key holding the canonical skills for a complete term
+
+
+class SkillMatcher:
+    """Find every skill term in a text in a single left-to-right pass.
+
+    Terms are stored in a character trie built once. The text is only walked
+    from positions that can start a word, so the cost depends on the text
+    length and the longest term, not on how many terms are in the vocabulary.
+    """
+
+    def __init__(self, terms: Iterable[Tuple[str, str]]):
+        # terms are (spelling to look for, canonical skill to report) pairs
+        self.trie: Dict[str, dict] = {}
+        self.size = 0
+        for term, canonical in terms:
+            node = self.trie
+            for ch in term.lower():
+                node = node.setdefault(ch, {})
+            node.setdefault(_END, set()).add(canonical)
+            self.size += 1
+
+        first_chars = "".join(sorted(ch for ch in self.trie if ch != _END))
+        # A match can only start where the previous char is not a word char
+        self._starts: Optional[re.Pattern] = (
+            re.compile(r"(?<![A-Za-z0-9])[" + re.escape(first_chars) + "]") if first_chars else None
+        )
+
+    @classmethod
+    def from_skills(cls, skills: Iterable[str], variations: Optional[Mapping[str, str]] = None) -> "SkillMatcher":
+        """Build a matcher from canonical skills plus variation -> canonical aliases."""
+        pairs = [(sk, sk) for sk in skills]
+        pairs += list((variations or {}).items())
+        return cls(pairs)
+
+    def find(self, text: str) -> Set[str]:
+        """Return the canonical skills whose terms appear in text as whole words."""
+        found: Set[str] = set()
+        if self._starts is None:
+            return found
+        text = text.lower().translate(_CASE_FOLD)
+        n = len(text)
+        root = self.trie
+        for m in self._starts.finditer(text):
+            node = root
+            i = m.start()
+            while i < n:
+                node = node.get(text[i])
+                if node is None:
+                    break
+                i += 1
+                hit = node.get(_END)
+                if hit and (i == n or text[i] not in _WORD_CHARS):
+                    found |= hit
+        return found
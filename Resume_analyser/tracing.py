@@ -0,0 +1,166 @@
+"""Per-stage timing for the upload pipeline, exported in Prometheus text format.
+
+    with stage("pdf_extract"):
+        ...
+
+Every stage() lands in the resume_stage_seconds histogram. Inside a
+request_trace() the stage times are also collected for that one upload.
+With TRACE_LOG=1 one JSON line per upload is logged to the
+"resume_analyser.trace" logger (stderr). Recording a stage costs a
+perf_counter pair and a bucket increment under a lock, so it stays on in
+production.
+"""
+import bisect
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds; spans cheap regex stages up to a slow PDF + NER
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+TRACE_LOG = os.getenv("TRACE_LOG", "0") == "1"
+
+trace_log = logging.getLogger("resume_analyser.trace")
+if TRACE_LOG and not trace_log.handlers:
+    trace_log.addHandler(logging.StreamHandler())
+    trace_log.setLevel(logging.INFO)
+    trace_log.propagate = False
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label value (Prometheus semantics)."""
+
+    def __init__(self, name: str, help_text: str, label: str, buckets: Tuple[float, ...] = BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label = label
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series: Dict[str, List[Any]] = {}  # label value -> [bucket counts..., sum, count]
+
+    def observe(self, label_value: str, seconds: float) -> None:
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            series[i] += 1
+            series[-2] += seconds
+            series[-1] += 1
+
+    def snapshot(self) -> Dict[str, List[Any]]:
+        with self._lock:
+            return {k: list(v) for k, v in self._series.items()}
+
+    def render(self, snapshot: Optional[Dict[str, List[Any]]] = None) -> List[str]:
+        """This histogram's series, or those of `snapshot` (e.g. several processes' summed)."""
+        if snapshot is None:
+            snapshot = self.snapshot()
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for value, series in sorted(snapshot.items()):
+            label = f'{self.label}="{_escape(value)}"'
+            running = 0
+            for bound, n in zip(self.buckets + (float("inf"),), series):
+                running += n
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{self.name}_bucket{{{label},le="{le}"}} {running}')
+            lines.append(f"{self.name}_sum{{{label}}} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{{{label}}} {series[-1]}")
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+STAGE_SECONDS = Histogram("resume_stage_seconds", "Time spent in each upload pipeline stage.", "stage")
+REQUEST_SECONDS = Histogram("resume_request_seconds", "End-to-end time per traced upload.", "kind")
+HISTOGRAMS = (STAGE_SECONDS, REQUEST_SECONDS)
+
+_local = threading.local()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the block as pipeline stage `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(name, elapsed)
+        stages = getattr(_local, "stages", None)
+        if stages is not None:
+            stages[name] = stages.get(name, 0.0) + elapsed
+
+
+@contextmanager
+def request_trace(kind: str, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """Collect this thread's stage times for one upload; logs it when TRACE_LOG=1.
+
+    The yielded dict can be given more fields (e.g. outcome) before the block ends.
+    """
+    record: Dict[str, Any] = dict(fields, kind=kind)
+    previous: Optional[Dict[str, float]] = getattr(_local, "stages", None)
+    _local.stages = {}
+    start = time.perf_counter()
+    try:
+        yield record
+    except Exception as e:
+        record.setdefault("error", str(e))
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        REQUEST_SECONDS.observe(kind, elapsed)
+        if TRACE_LOG:
+            record["total_ms"] = round(elapsed * 1000, 3)
+            record["stages_ms"] = {k: round(v * 1000, 3) for k, v in _local.stages.items()}
+            trace_log.info(json.dumps(record, default=str))
+        _local.stages = previous
+
+
+def snapshot() -> Dict[str, Dict[str, List[Any]]]:
+    """Every histogram's series by histogram name, for merging with other processes'."""
+    return {h.name: h.snapshot() for h in HISTOGRAMS}
+
+
+def merge_snapshots(snapshots: Iterable[Dict[str, Dict[str, List[Any]]]]) -> Dict[str, Dict[str, List[Any]]]:
+    """Sum snapshot() results bucket by bucket."""
+    merged: Dict[str, Dict[str, List[Any]]] = {}
+    for snap in snapshots:
+        for name, series in snap.items():
+            into = merged.setdefault(name, {})
+            for value, counts in series.items():
+                if value in into:
+                    into[value] = [a + b for a, b in zip(into[value], counts)]
+                else:
+                    into[value] = list(counts)
+    return merged
+
+
+def render_prometheus(gauges: Optional[Dict[str, float]] = None,
+                      histograms: Optional[Dict[str, Dict[str, List[Any]]]] = None,
+                      worker_gauges: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    """Both histograms plus any extra gauges, in Prometheus text exposition format.
+
+    `histograms` (snapshot() form) replaces this process's series. `worker_gauges`
+    maps a worker id to its gauges, rendered with a worker="<id>" label.
+    """
+    histograms = histograms if histograms is not None else snapshot()
+    lines = []
+    for h in HISTOGRAMS:
+        lines += h.render(histograms.get(h.name, {}))
+    for name, value in sorted((gauges or {}).items()):
+        lines += [f"# TYPE {name} gauge", f"{name} {value}"]
+    by_name: Dict[str, List[Tuple[str, float]]] = {}
+    for worker, values in sorted((worker_gauges or {}).items()):
+        for name, value in values.items():
+            by_name.setdefault(name, []).append((worker, value))
+    for name, samples in sorted(by_name.items()):
+        lines.append(f"# TYPE {name} gauge")
+        lines += [f'{name}{{worker="{_escape(worker)}"}} {value}' for worker, value in samples]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,86 @@
+"""/metrics for every server worker, not just the one that answers the scrape.
+
+Each worker process publishes its stage histograms (tracing.snapshot()) and
+its gauges to one SQLite file every `interval` seconds and before it answers
+/metrics. collect() sums the histograms of all workers and returns the gauges
+of those that published recently, one set per worker. A worker that exits
+(recycled after --max-requests) folds its histograms into the "exited" row,
+so the counts stay monotonic across restarts of single workers.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+from tracing import merge_snapshots, snapshot
+
+EXITED = "exited"
+
+
+class WorkerMetrics:
+    def __init__(self, path: str = "metrics.sqlite3", gauges: Callable[[], Dict[str, float]] = dict,
+                 interval: float = 5.0):
+        self.path = path
+        self.gauges = gauges
+        self.interval = interval
+        self.worker = str(os.getpid())
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._db = sqlite3.connect(path, check_same_thread=False, timeout=30)  # shared by the server's worker processes
+        self._db.execute("""
+        CREATE TABLE IF NOT EXISTS worker_metrics (
+            worker TEXT PRIMARY KEY,
+            histograms TEXT NOT NULL,
+            gauges TEXT,
+            updated_at REAL NOT NULL
+        )
+        """)
+        self._db.commit()
+        self._thread = threading.Thread(target=self._publish_loop, name="metrics-publisher", daemon=True)
+        self._thread.start()
+
+    def publish(self) -> None:
+        """Write this worker's current histograms and gauges."""
+        histograms, gauges = json.dumps(snapshot()), json.dumps(self.gauges())
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO worker_metrics (worker, histograms, gauges, updated_at) VALUES (?, ?, ?, ?)",
+                (self.worker, histograms, gauges, time.time())
+            )
+            self._db.commit()
+
+    def collect(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Dict[str, float]]]:
+        """(histograms summed over every worker, {worker: gauges} of the live ones)."""
+        with self._lock:
+            rows = self._db.execute("SELECT worker, histograms, gauges, updated_at FROM worker_metrics").fetchall()
+        # Workers killed without close() stop publishing: their counts stay, their gauges go stale
+        live_after = time.time() - 3 * self.interval
+        histograms = merge_snapshots(json.loads(row[1]) for row in rows)
+        gauges = {worker: json.loads(g) for worker, _, g, updated_at in rows if g is not None and updated_at >= live_after}
+        return histograms, gauges
+
+    def close(self) -> None:
+        """Stop publishing and fold this worker's histograms into the "exited" row."""
+        self._stop.set()
+        self._thread.join()
+        mine = snapshot()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")  # other workers may be exiting at the same time
+            row = self._db.execute("SELECT histograms FROM worker_metrics WHERE worker=?", (EXITED,)).fetchone()
+            merged = merge_snapshots([json.loads(row[0]), mine] if row else [mine])
+            self._db.execute(
+                "INSERT OR REPLACE INTO worker_metrics (worker, histograms, gauges, updated_at) VALUES (?, ?, NULL, ?)",
+                (EXITED, json.dumps(merged), time.time())
+            )
+            self._db.execute("DELETE FROM worker_metrics WHERE worker=?", (self.worker,))
+            self._db.commit()
+        self._db.close()
+
+    def _publish_loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.publish()
+            except sqlite3.Error:
+                pass  # busy past the timeout: the next round publishes the same counts